@@ -22,6 +22,21 @@ from src.config import get_config
 # 获取全局配置对象
 config = get_config()
 
+
+
+@st.cache_resource
+def _preload_kb_configs():
+    """
+    启动时并发预加载所有知识库配置，避免首次使用时逐个读取
+
+    Streamlit每次rerun都会重新执行本脚本，使用cache_resource保证每个进程只预加载一次，
+    配置文件缺失的知识库不会在每次rerun时重复加载并记录失败。
+    """
+    config.preload_kb_configs()
+
+
+_preload_kb_configs()
+
 # ===== 从配置中提取应用参数 =====
 # 说明：这些变量从config.ini中读取，环境变量可以覆盖INI配置
 APP_NAME = config.app_name  # 应用名称
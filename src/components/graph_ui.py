@@ -6,6 +6,7 @@
 核心组件：
 - render_graph_controls：图谱控制面板（视图类型、布局算法、节点/边过滤）
 - render_network_graph：网络图渲染（Pyvis）
+- compute_graph_stats：计算图谱统计（按图内容指纹缓存）
 - render_graph_stats：图谱统计（节点数、边数、密度、连通分量、直径）
 - render_node_details：节点详情（ID、标签、类型、属性、度数）
 - render_edge_details：边详情（源、目标、关系类型、描述）
@@ -23,10 +24,13 @@
 import streamlit as st
 from typing import Optional, Dict, Any
 import networkx as nx
+import hashlib
 from pyvis.network import Network
 import tempfile
 from pathlib import Path
 
+from src.models.graph import fast_connected_components, DIAMETER_MAX_NODES
+
 
 def render_graph_controls() -> Dict[str, Any]:
     """
@@ -55,76 +59,119 @@ def render_graph_controls() -> Dict[str, Any]:
         }
 
 
-def render_network_graph(graph: nx.Graph, title: str = "知识图谱") -> None:
+def _graph_content_sha1(graph: nx.Graph) -> str:
+    """计算图内容（节点/边及其全部属性）的SHA1指纹，用作缓存键"""
+    hasher = hashlib.sha1()
+    for node_id, attrs in graph.nodes(data=True):
+        hasher.update(repr((node_id, sorted(attrs.items()))).encode('utf-8'))
+    hasher.update(b'|')
+    for source, target, attrs in graph.edges(data=True):
+        hasher.update(repr((source, target, sorted(attrs.items()))).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _build_network_html(content_sha1: str, _graph: nx.Graph) -> str:
     """
-    使用Pyvis渲染网络图
+    构建Pyvis网络并生成HTML（按内容指纹缓存，_graph 不参与缓存键哈希）
 
     Args:
-        graph: NetworkX图对象
-        title: 图谱标题
-    """
-    try:
-        # 检查图是否为空
-        if graph.number_of_nodes() == 0:
-            st.warning("🔍 图谱为空，请先添加政策数据或调整筛选条件")
-            st.info("""
-            可能的原因：
-            - 数据库中没有政策数据
-            - 筛选条件过于严格
-            - 数据加载失败
-            
-            建议：
-            1. 检查是否有政策数据
-            2. 调整节点类型和关系类型筛选
-            3. 查看错误日志
-            """)
-            return
+        content_sha1: 图内容指纹
+        _graph: NetworkX图对象
 
-        # 创建Pyvis网络
-        net = Network(
-            height="600px",
-            width="100%",
-            directed=False
-        )
+    Returns:
+        完整的HTML字符串
+    """
+    # 创建Pyvis网络
+    net = Network(
+        height="600px",
+        width="100%",
+        directed=False
+    )
 
-        # 添加节点和边
-        net.from_nx(graph)
+    # 批量添加节点（一次 add_nodes 调用，属性按列表传入）
+    node_data = list(_graph.nodes(data=True))
+    net.add_nodes(
+        [node_id for node_id, _ in node_data],
+        label=[str(attrs.get('label', node_id)) for node_id, attrs in node_data],
+        title=[str(attrs.get('title', attrs.get('label', node_id))) for node_id, attrs in node_data],
+        color=[attrs.get('color', '#97c2fc') for _, attrs in node_data],
+        size=[attrs.get('size', 10) for _, attrs in node_data]
+    )
+    # 其余节点属性（type等）与 from_nx 一样原样传给vis.js
+    for options, (_, attrs) in zip(net.nodes, node_data):
+        for key, value in attrs.items():
+            options.setdefault(key, value)
+
+    # 批量添加边：NetworkX的边已去重，直接写入边列表，跳过 add_edge 的逐条重复检查；
+    # 边属性（label、relation_type等）原样传入，label显示在边上，同时作为悬停提示
+    net.edges.extend(
+        {'title': attrs.get('label', ''), **attrs, 'from': source, 'to': target,
+         'width': attrs.get('width', attrs.get('weight', 1))}
+        for source, target, attrs in _graph.edges(data=True)
+    )
 
-        # 配置物理引擎（使用 set_options 方法）
-        net.set_options("""
-        {
-            "physics": {
+    # 配置物理引擎和渲染选项（使用 set_options 方法）
+    # 直线边 + 拖拽时隐藏节点/边，可显著降低大图的前端重绘开销
+    net.set_options("""
+    {
+        "physics": {
+            "enabled": true,
+            "stabilization": {
                 "enabled": true,
-                "stabilization": {
-                    "enabled": true,
-                    "iterations": 100
-                }
+                "iterations": 100
             }
+        },
+        "interaction": {
+            "hideEdgesOnDrag": true,
+            "hideNodesOnDrag": true,
+            "tooltipDelay": 200
+        },
+        "edges": {
+            "smooth": false
         }
-        """)
+    }
+    """)
 
-        # 保存为HTML
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-            net.save_graph(f.name)
-            temp_path = f.name
+    # 直接在内存中生成HTML，无需临时文件
+    return net.generate_html(notebook=False)
 
-        # 在Streamlit中显示
-        try:
-            with open(temp_path, 'r', encoding='utf-8') as f:
-                html_string = f.read()
-            
-            # 使用 Streamlit 的 HTML 组件显示
-            import streamlit.components.v1 as components
-            components.html(html_string, height=650, scrolling=True)
-        finally:
-            # 清理临时文件
-            try:
-                Path(temp_path).unlink()
-            except:
-                pass
 
+def render_network_graph(graph: nx.Graph, title: str = "知识图谱") -> None:
+    """
+    使用Pyvis渲染网络图
+
+    Args:
+        graph: NetworkX图对象
+        title: 图谱标题
+    """
+    # 检查图是否为空
+    if graph.number_of_nodes() == 0:
+        st.warning("🔍 图谱为空，请先添加政策数据或调整筛选条件")
+        st.info("""
+        可能的原因：
+        - 数据库中没有政策数据
+        - 筛选条件过于严格
+        - 数据加载失败
+        
+        建议：
+        1. 检查是否有政策数据
+        2. 调整节点类型和关系类型筛选
+        3. 查看错误日志
+        """)
+        return
+
+    # 按图内容指纹缓存生成的HTML：图未变化时跳过Pyvis构建与HTML生成，
+    # 传给前端的HTML也保持一致，iframe不会被重新加载
+    # 仅包裹Pyvis构建/HTML生成；失败时异常不会被 st.cache_data 缓存
+    try:
+        html_string = _build_network_html(_graph_content_sha1(graph), graph)
     except Exception as e:
         st.error(f"图谱渲染失败: {str(e)}")
+        return
+
+    import streamlit.components.v1 as components
+    components.html(html_string, height=650, scrolling=True)
 
 
 def render_network_graph_from_data(graph_data: dict, title: str = "知识图谱", 
@@ -310,6 +357,55 @@ def render_network_graph_from_data(graph_data: dict, title: str = "知识图谱"
         st.error(traceback.format_exc())
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def _compute_graph_stats_cached(content_sha1: str, _graph: nx.Graph) -> Dict[str, Any]:
+    """按图内容指纹缓存的统计计算（_graph 不参与缓存键哈希）"""
+    node_count = _graph.number_of_nodes()
+    edge_count = _graph.number_of_edges()
+
+    if node_count == 0:
+        return {
+            'node_count': 0,
+            'edge_count': 0,
+            'density': 0,
+            'number_of_connected_components': 0,
+            'diameter': None
+        }
+
+    num_components = sum(1 for _ in fast_connected_components(_graph))
+
+    diameter = None
+    if 1 < node_count < DIAMETER_MAX_NODES and num_components == 1:
+        try:
+            diameter = nx.diameter(_graph)
+        except (nx.NetworkXError, nx.NetworkXNoPath):
+            diameter = None
+
+    return {
+        'node_count': node_count,
+        'edge_count': edge_count,
+        'density': nx.density(_graph),
+        'number_of_connected_components': num_components,
+        'diameter': diameter
+    }
+
+
+def compute_graph_stats(graph: nx.Graph) -> Dict[str, Any]:
+    """
+    计算图谱统计信息（供 render_graph_stats 使用）
+
+    结果按图内容SHA1指纹缓存（与HTML缓存共用 _graph_content_sha1），图未变化时重复渲染不再重新计算；
+    直径仅在节点数小于 DIAMETER_MAX_NODES 时计算。
+
+    Args:
+        graph: NetworkX无向图
+
+    Returns:
+        统计数据
+    """
+    return _compute_graph_stats_cached(_graph_content_sha1(graph), graph)
+
+
 def render_graph_stats(stats: Dict[str, Any]) -> None:
     """
     渲染图谱统计信息
@@ -362,12 +458,16 @@ def render_graph_stats(stats: Dict[str, Any]) -> None:
             st.success("✅ 图谱正常")
 
 
-def render_node_details(node: Dict[str, Any]) -> None:
+def render_node_details(node: Dict[str, Any], degree: Optional[int] = None) -> None:
     """
     渲染节点详情
 
+    批量渲染多个节点时，调用方应先用 dict(graph.degree()) 一次性计算所有度数，
+    再逐个传入 degree，避免每个节点单独查询。
+
     Args:
         node: 节点数据
+        degree: 预先计算好的节点度数（None时回退到node中的degree字段）
     """
     with st.expander(f"📍 节点详情: {node.get('label', 'N/A')}", expanded=False):
         col1, col2 = st.columns(2)
@@ -378,14 +478,15 @@ def render_node_details(node: Dict[str, Any]) -> None:
             st.write(f"**类型**: {node.get('type', '未知')}")
 
         with col2:
-            st.write(f"**度数**: {node.get('degree', 'N/A')}")
+            if degree is None:
+                degree = node.get('degree', 'N/A')
+            st.write(f"**度数**: {degree}")
 
-            # 显示其他属性
+            # 显示其他属性（单个JSON组件，避免每个属性生成一个组件）
             attributes = node.get('attributes', {})
             if attributes:
                 st.write("**属性**:")
-                for key, value in attributes.items():
-                    st.caption(f"  {key}: {value}")
+                st.json(attributes, expanded=False)
 
 
 def render_edge_details(edge: Dict[str, Any]) -> None:
@@ -157,10 +157,14 @@ def render_policy_detail(policy: Dict[str, Any]) -> None:
 
     # 时效性分析
     with st.expander("⏱️ 时效性分析"):
+        result = None
         try:
             checker = get_validity_checker()
             result = checker.check_policy(policy['id'])
+        except Exception as e:
+            st.warning(f"时效性分析失败: {str(e)}")
 
+        if result is not None:
             col1, col2 = st.columns(2)
             with col1:
                 st.write(f"**状态：** {result.get('status', 'unknown')}")
@@ -173,9 +177,6 @@ def render_policy_detail(policy: Dict[str, Any]) -> None:
 
             st.info(result.get('message', '无法获取时效信息'))
 
-        except Exception as e:
-            st.warning(f"时效性分析失败: {str(e)}")
-
     # 政策内容
     with st.expander("📄 完整内容", expanded=False):
         content = policy.get('content', '')
@@ -199,26 +200,26 @@ def render_policy_detail(policy: Dict[str, Any]) -> None:
 
     # 相关政策
     with st.expander("🔗 相关政策"):
+        relations = None
         try:
             dao = get_policy_dao()
             relations = dao.get_policy_relations(policy['id'], as_source=True)
-
-            if relations:
-                for relation in relations:
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.write(f"➡️ {relation.get('target_title', 'N/A')}")
-                        st.caption(f"关系: {relation.get('relation_type', 'N/A')}")
-                    with col2:
-                        if st.button("查看", key=f"related_{relation['target_policy_id']}"):
-                            st.session_state.selected_policy = relation['target_policy_id']
-                            st.rerun()
-            else:
-                st.info("暂无相关政策")
-
         except Exception as e:
             st.warning(f"获取相关政策失败: {str(e)}")
 
+        if relations:
+            for relation in relations:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.write(f"➡️ {relation.get('target_title', 'N/A')}")
+                    st.caption(f"关系: {relation.get('relation_type', 'N/A')}")
+                with col2:
+                    if st.button("查看", key=f"related_{relation['target_policy_id']}"):
+                        st.session_state.selected_policy = relation['target_policy_id']
+                        st.rerun()
+        elif relations is not None:
+            st.info("暂无相关政策")
+
 
 def render_policy_list(policies: list, columns: int = 1) -> None:
     """
@@ -20,10 +20,26 @@
 """
 import streamlit as st
 from typing import Optional, Dict, Any, List, Tuple, Set
-import networkx as nx
-from pyvis.network import Network
-import tempfile
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import cache, lru_cache
+import html
+import json
+import weakref
 from pathlib import Path
+import networkx as nx
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Aho–Corasick多模式匹配（可选依赖，未安装时包含匹配使用n-gram索引）
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.info("pyahocorasick未安装，实体包含匹配使用n-gram索引")
 
 
 def render_search_bar(placeholder: str = "搜索政策关键词...") -> str:
@@ -111,6 +127,184 @@ def render_advanced_search_panel() -> Dict[str, Any]:
         }
 
 
+# 结果卡片中说明文字的样式（与 st.caption 的视觉效果一致）
+_CAPTION_STYLE = "color: rgba(49, 51, 63, 0.6); font-size: 0.875rem; margin-bottom: 0.5rem;"
+
+
+def _build_result_card_html(idx: int, result: Dict[str, Any]) -> str:
+    """
+    生成搜索结果卡片静态内容的HTML（标题、元数据、摘要、标签）
+
+    所有字段均经过 html.escape 转义。
+
+    Args:
+        idx: 结果序号
+        result: 搜索结果字典
+
+    Returns:
+        HTML字符串
+    """
+    parts = [f"<h3>{idx}. {html.escape(str(result.get('title', '未知标题')))}</h3>"]
+
+    # 元数据
+    meta_info = []
+    if result.get('document_number'):
+        meta_info.append(f"📄 {html.escape(str(result['document_number']))}")
+    if result.get('issuing_authority'):
+        meta_info.append(f"🏛️ {html.escape(str(result['issuing_authority']))}")
+    if result.get('publish_date'):
+        meta_info.append(f"📅 {html.escape(str(result['publish_date']))}")
+
+    if meta_info:
+        parts.append(f"<p style='{_CAPTION_STYLE}'>{' | '.join(meta_info)}</p>")
+
+    # 摘要
+    summary = result.get('summary', result.get('content', ''))
+    if isinstance(summary, str):
+        summary = summary[:200] + '...' if len(summary) > 200 else summary
+        parts.append(f"<p>{html.escape(summary)}</p>")
+
+    # 标签
+    tag_list = result.get('tags')
+    if tag_list and isinstance(tag_list, list):
+        tag_str = " ".join(
+            f"🔹 {html.escape(str(tag.get('name', 'Tag') if isinstance(tag, dict) else tag))}"
+            for tag in tag_list[:3]
+        )
+        parts.append(f"<p style='{_CAPTION_STYLE}'>{tag_str}</p>")
+
+    return "".join(parts)
+
+
+def _render_result_card(idx: int, result: Dict[str, Any], full_graph, norm_index) -> None:
+    """
+    渲染单个搜索结果卡片（含按需加载的知识图谱）
+
+    在支持 st.fragment 的Streamlit版本中作为片段运行：卡片内的交互只重跑该卡片，
+    页面其他控件变化也不会影响卡片内部状态。
+
+    Args:
+        idx: 结果序号
+        result: 搜索结果字典
+        full_graph: 完整的PolicyGraph对象
+        norm_index: 节点规范化索引
+    """
+    with st.container():
+        col1, col2 = st.columns([5, 1])
+
+        with col1:
+            # 标题、元数据、摘要、标签合并为一次 markdown 输出
+            st.markdown(_build_result_card_html(idx, result), unsafe_allow_html=True)
+
+        with col2:
+            # 相关度分数（如果有）
+            if result.get('score'):
+                st.metric("相关度", f"{result['score']:.1%}")
+
+            # 查看按钮
+            if result.get('id'):
+                if st.button("查看", key=f"view_{result['id']}", use_container_width=True):
+                    st.session_state.selected_policy = result['id']
+                    # 片段内的交互只重跑片段本身，这里触发整页重跑以打开详情
+                    st.rerun()
+        
+        # 嵌入式知识图谱（按需加载）
+        if full_graph and full_graph.get_node_count() > 0:
+            _render_embedded_graph(result, full_graph, norm_index, f"showg_{result.get('id', idx)}")
+
+
+if hasattr(st, "fragment"):
+    _render_result_card = st.fragment(_render_result_card)
+
+
+def _build_result_preview_html(result: Dict[str, Any]) -> str:
+    """
+    生成搜索历史中结果预览的HTML（发布机关、发布日期、摘要）
+
+    所有字段均经过 html.escape 转义。
+
+    Args:
+        result: 搜索结果字典
+
+    Returns:
+        HTML字符串
+    """
+    parts = []
+    if result.get('issuing_authority'):
+        parts.append(f"<p style='{_CAPTION_STYLE}'>🏛️ {html.escape(str(result['issuing_authority']))}</p>")
+    if result.get('publish_date'):
+        parts.append(f"<p style='{_CAPTION_STYLE}'>📅 {html.escape(str(result['publish_date']))}</p>")
+
+    summary = result.get('summary', result.get('content', ''))
+    if summary and isinstance(summary, str):
+        summary = summary[:200] + '...' if len(summary) > 200 else summary
+        parts.append(f"<p>{html.escape(summary)}</p>")
+
+    return "".join(parts)
+
+
+def _render_embedded_graph(result: Dict[str, Any], full_graph, norm_index, show_key: str) -> None:
+    """
+    渲染按需加载的嵌入式知识图谱
+
+    expander折叠时其内容仍会执行，因此用按钮+session_state控制，只有点击后才做匹配与渲染。
+
+    Args:
+        result: 搜索结果字典
+        full_graph: 完整的PolicyGraph对象
+        norm_index: 节点规范化索引（None则按图谱版本自动获取）
+        show_key: 记录是否已展开图谱的session_state键（页面内唯一）
+    """
+    if not st.session_state.get(show_key) and st.button("🔗 显示知识图谱", key=f"btn_{show_key}"):
+        st.session_state[show_key] = True
+
+    if st.session_state.get(show_key):
+        with st.expander("🔗 知识图谱", expanded=True):
+            # 提取实体、匹配节点并构建子图（按政策和图谱版本缓存）
+            entities, matched_node_ids, subgraph = _match_and_subgraph(
+                result, full_graph.version, full_graph, norm_index
+            )
+
+            if entities:
+                if matched_node_ids:
+                    st.caption(f"✅ 匹配到 {len(matched_node_ids)} 个实体节点")
+
+                    if subgraph.get_node_count() > 0:
+                        st.caption(f"📊 图谱包含 {subgraph.get_node_count()} 个节点，{len(subgraph.edges)} 条边")
+
+                        # 渲染高亮图谱
+                        render_highlighted_graph(subgraph, matched_node_ids)
+                    else:
+                        st.warning("暂无图谱数据")
+                else:
+                    st.info("暂无匹配的图谱节点")
+            else:
+                st.info("未提取到实体信息")
+
+
+def render_result_preview(result: Dict[str, Any], full_graph, key: str) -> None:
+    """
+    渲染搜索历史中的单条结果预览（元数据与摘要合并为一次输出，知识图谱按需加载）
+
+    在支持 st.fragment 的Streamlit版本中作为片段运行，展开图谱只重跑该预览。
+
+    Args:
+        result: 搜索结果字典
+        full_graph: 完整的PolicyGraph对象（None或空图时不显示图谱）
+        key: 该预览在页面内的唯一标识（用于控件和session_state键）
+    """
+    preview_html = _build_result_preview_html(result)
+    if preview_html:
+        st.markdown(preview_html, unsafe_allow_html=True)
+
+    if full_graph and full_graph.get_node_count() > 0:
+        _render_embedded_graph(result, full_graph, None, f"showg_{key}")
+
+
+if hasattr(st, "fragment"):
+    render_result_preview = st.fragment(render_result_preview)
+
+
 def render_search_results(results: List[Dict[str, Any]], total: int,
                          page: int = 1, page_size: int = 10, full_graph=None) -> Tuple[int, int]:
     """
@@ -142,80 +336,18 @@ def render_search_results(results: List[Dict[str, Any]], total: int,
 
     st.divider()
 
+    # 整页结果共用一份节点规范化索引
+    norm_index = None
+    if full_graph and full_graph.get_node_count() > 0:
+        norm_index = _get_norm_index(full_graph)
+
     # 显示结果
     for idx, result in enumerate(results, start=1):
         # 确保result是字典
         if not isinstance(result, dict):
             continue
             
-        with st.container():
-            col1, col2 = st.columns([5, 1])
-
-            with col1:
-                st.subheader(f"{idx}. {result.get('title', '未知标题')}")
-
-                # 摘要和元数据
-                meta_info = []
-                if result.get('document_number'):
-                    meta_info.append(f"📄 {result['document_number']}")
-                if result.get('issuing_authority'):
-                    meta_info.append(f"🏛️ {result['issuing_authority']}")
-                if result.get('publish_date'):
-                    meta_info.append(f"📅 {result['publish_date']}")
-
-                if meta_info:
-                    st.caption(" | ".join(meta_info))
-
-                # 摘要
-                summary = result.get('summary', result.get('content', ''))
-                if isinstance(summary, str):
-                    summary = summary[:200] + '...' if len(summary) > 200 else summary
-                    st.write(summary)
-
-                # 标签
-                if result.get('tags'):
-                    tag_list = result['tags']
-                    if isinstance(tag_list, list):
-                        tag_str = " ".join([f"🔹 {tag.get('name', 'Tag') if isinstance(tag, dict) else tag}" for tag in tag_list[:3]])
-                        st.caption(tag_str)
-
-            with col2:
-                # 相关度分数（如果有）
-                if result.get('score'):
-                    st.metric("相关度", f"{result['score']:.1%}")
-
-                # 查看按钮
-                if result.get('id'):
-                    if st.button("查看", key=f"view_{result['id']}", use_container_width=True):
-                        st.session_state.selected_policy = result['id']
-            
-            # 嵌入式知识图谱
-            if full_graph and full_graph.get_node_count() > 0:
-                with st.expander("🔗 知识图谱", expanded=False):
-                    # 提取实体
-                    entities = extract_entities_from_policy(result)
-                    
-                    if entities:
-                        # 模糊匹配到节点
-                        matched_node_ids = fuzzy_match_entities_to_nodes(entities, full_graph)
-                        
-                        if matched_node_ids:
-                            st.caption(f"✅ 匹配到 {len(matched_node_ids)} 个实体节点")
-                            
-                            # 构建子图
-                            subgraph = build_subgraph_for_entities(full_graph, matched_node_ids)
-                            
-                            if subgraph.get_node_count() > 0:
-                                st.caption(f"📊 图谱包含 {subgraph.get_node_count()} 个节点，{len(subgraph.edges)} 条边")
-                                
-                                # 渲染高亮图谱
-                                render_highlighted_graph(subgraph, matched_node_ids)
-                            else:
-                                st.warning("暂无图谱数据")
-                        else:
-                            st.info("暂无图谱数据")
-                    else:
-                        st.info("未提取到实体信息")
+        _render_result_card(idx, result, full_graph, norm_index)
 
         st.divider()
 
@@ -249,74 +381,93 @@ def render_search_filters_sidebar() -> Dict[str, Any]:
     """
     在侧边栏渲染搜索过滤器
 
+    过滤控件放在表单中，勾选/选择时不会触发页面重跑，点击"应用过滤"后统一生效；
+    生效的过滤条件保存在 st.session_state.filters 中。
+
     Returns:
         过滤条件字典，包含policy_type, region, status, date_from, date_to
     """
-    filters = {
-        "policy_type": None,
-        "region": None,
-        "status": None,
-        "date_from": None,
-        "date_to": None
-    }
-
     with st.sidebar:
         st.subheader("📊 搜索过滤")
 
-        # 政策类型
-        st.write("**政策类型**")
-        selected_types = []
-        if st.checkbox("特别国债", key="type_special_bonds"):
-            selected_types.append('special_bonds')
-        if st.checkbox("特许经营", key="type_franchise"):
-            selected_types.append('franchise')
-        if st.checkbox("数据资产", key="type_data_assets"):
-            selected_types.append('data_assets')
-        
-        if selected_types:
-            filters['policy_type'] = selected_types[0]  # 取第一个作为主要过滤
-
-        st.divider()
-
-        # 地区过滤
-        st.write("**地区**")
-        regions = st.multiselect(
-            "选择地区",
-            ["全国", "北京", "上海", "广东", "浙江"],
-            key="region_filter",
-            label_visibility="collapsed"
-        )
-        if regions:
-            filters['region'] = regions[0]  # 取第一个作为主要过滤
-
-        st.divider()
-
-        # 状态过滤
-        st.write("**状态**")
-        statuses = []
-        if st.checkbox("有效", value=True, key="status_active"):
-            statuses.append('active')
-        if st.checkbox("失效", key="status_expired"):
-            statuses.append('expired')
-        if st.checkbox("即将失效", key="status_expiring"):
-            statuses.append('expiring_soon')
+        with st.form("search_filters"):
+            # 政策类型
+            st.write("**政策类型**")
+            type_special_bonds = st.checkbox("特别国债", key="type_special_bonds")
+            type_franchise = st.checkbox("特许经营", key="type_franchise")
+            type_data_assets = st.checkbox("数据资产", key="type_data_assets")
+
+            st.divider()
+
+            # 地区过滤
+            st.write("**地区**")
+            regions = st.multiselect(
+                "选择地区",
+                ["全国", "北京", "上海", "广东", "浙江"],
+                key="region_filter",
+                label_visibility="collapsed"
+            )
 
-        if statuses:
-            filters['status'] = statuses[0]  # 取第一个作为主要过滤
+            st.divider()
+
+            # 状态过滤
+            st.write("**状态**")
+            status_active = st.checkbox("有效", value=True, key="status_active")
+            status_expired = st.checkbox("失效", key="status_expired")
+            status_expiring = st.checkbox("即将失效", key="status_expiring")
+
+            st.divider()
+
+            # 日期范围
+            st.write("**发布日期**")
+            date_range = None
+            try:
+                date_range = st.date_input("选择日期范围", value=[], key="date_range")
+            except Exception:
+                pass
+
+            submitted = st.form_submit_button("应用过滤", use_container_width=True)
+
+        # 仅在提交表单（或首次渲染）时重新计算过滤条件
+        if submitted or "filters" not in st.session_state:
+            filters = {
+                "policy_type": None,
+                "region": None,
+                "status": None,
+                "date_from": None,
+                "date_to": None
+            }
 
-        st.divider()
+            selected_types = [
+                policy_type for policy_type, checked in (
+                    ('special_bonds', type_special_bonds),
+                    ('franchise', type_franchise),
+                    ('data_assets', type_data_assets)
+                ) if checked
+            ]
+            if selected_types:
+                filters['policy_type'] = selected_types[0]  # 取第一个作为主要过滤
+
+            if regions:
+                filters['region'] = regions[0]  # 取第一个作为主要过滤
+
+            statuses = [
+                status for status, checked in (
+                    ('active', status_active),
+                    ('expired', status_expired),
+                    ('expiring_soon', status_expiring)
+                ) if checked
+            ]
+            if statuses:
+                filters['status'] = statuses[0]  # 取第一个作为主要过滤
 
-        # 日期范围
-        st.write("**发布日期**")
-        try:
-            date_range = st.date_input("选择日期范围", value=[], key="date_range")
             if isinstance(date_range, (list, tuple)) and len(date_range) >= 2:
                 filters['date_from'] = date_range[0]
                 filters['date_to'] = date_range[1]
-        except Exception:
-            pass
 
-        return filters
+            st.session_state.filters = filters
+
+        return st.session_state.filters
 
 
 def render_search_stats(results: List[Dict[str, Any]]) -> None:
@@ -388,14 +539,182 @@ def extract_entities_from_policy(policy: Dict[str, Any]) -> List[str]:
                 elif isinstance(tag, str):
                     entities.append(tag)
     
-    return entities
+    # 去除空值和重复实体（保持顺序），避免重复匹配
+    return list(dict.fromkeys(e for e in entities if e))
+
+
+# 实体/标签匹配时移除的常见前缀（tuple可直接传给 str.startswith）
+_PREFIXES = ("中华人民共和国", "国家", "省", "市", "自治区")
+
+
+@lru_cache(maxsize=4096)
+def _clean_prefix(text: str) -> str:
+    """移除常见前缀（结果按文本缓存，重复的标签/实体不再重复处理）"""
+    while text.startswith(_PREFIXES):
+        for prefix in _PREFIXES:
+            if text.startswith(prefix):
+                text = text[len(prefix):]
+                break
+    return text
+
+
+# 包含匹配候选索引使用的n-gram长度
+_NGRAM_SIZE = 3
+
+
+@dataclass
+class _NormIndex:
+    """图谱节点的规范化索引"""
+    rows: List[Tuple[str, str, str]]  # [(node_id, label_lower, label_cleaned), ...]
+    labels: Dict[str, str]  # node_id -> label_lower
+    exact_map: Dict[str, List[str]]  # label_lower -> [node_id]
+    cleaned_map: Dict[str, List[str]]  # label_cleaned -> [node_id]
+    substr_index: Dict[str, List[str]]  # label_lower的3-gram -> [node_id]
+    short_labels: List[Tuple[str, str]]  # 长度不足3的标签 [(node_id, label_lower)]
+    label_automaton: Any = None  # 非空标签的Aho–Corasick自动机（label_lower -> [node_id]）
+
+
+# 图谱对象 -> (图谱版本号, 规范化索引)；图对象被回收时条目自动释放
+_norm_index_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_norm_index(graph) -> _NormIndex:
+    """
+    获取图谱节点的规范化索引
+
+    除 (node_id, label_lower, label_cleaned) 列表外，还包含精确/去前缀标签的
+    哈希表和标签3-gram倒排索引，用于将包含匹配限定在候选节点上。
+    索引按图对象缓存，图谱版本号变化（节点/边增删、清空）时重新构建。
+
+    Args:
+        graph: PolicyGraph对象
+
+    Returns:
+        规范化索引
+    """
+    version = graph.version
+    cached = _norm_index_cache.get(graph)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    rows = []
+    labels = {}
+    exact_map = defaultdict(list)
+    cleaned_map = defaultdict(list)
+    substr_index = defaultdict(list)
+    short_labels = []
+
+    for node_id, node in graph.nodes.items():
+        label_lower = node.label.lower()
+        label_cleaned = _clean_prefix(node.label).lower()
+        rows.append((node_id, label_lower, label_cleaned))
+        labels[node_id] = label_lower
+        exact_map[label_lower].append(node_id)
+        cleaned_map[label_cleaned].append(node_id)
+
+        if len(label_lower) < _NGRAM_SIZE:
+            short_labels.append((node_id, label_lower))
+        else:
+            for gram in {label_lower[i:i + _NGRAM_SIZE]
+                         for i in range(len(label_lower) - _NGRAM_SIZE + 1)}:
+                substr_index[gram].append(node_id)
+
+    # 空自动机无法扫描，图中没有非空标签时保持为None（退回n-gram索引）
+    label_automaton = None
+    if AHOCORASICK_AVAILABLE and any(exact_map.keys()):
+        label_automaton = ahocorasick.Automaton()
+        for label_lower, node_ids in exact_map.items():
+            if label_lower:
+                label_automaton.add_word(label_lower, node_ids)
+        label_automaton.make_automaton()
+
+    index = _NormIndex(
+        rows=rows,
+        labels=labels,
+        exact_map=dict(exact_map),
+        cleaned_map=dict(cleaned_map),
+        substr_index=dict(substr_index),
+        short_labels=short_labels,
+        label_automaton=label_automaton
+    )
+    _norm_index_cache[graph] = (version, index)
+    return index
+
+
+def _containment_match_ngram(entity_lower: str, index: _NormIndex, matched_node_ids: Set[str]) -> None:
+    """
+    使用3-gram倒排索引进行包含匹配（实体包含于标签或标签包含于实体）
+
+    Args:
+        entity_lower: 小写实体
+        index: 节点规范化索引
+        matched_node_ids: 已匹配节点ID集合（原地更新）
+    """
+    if len(entity_lower) >= _NGRAM_SIZE:
+        # 实体包含于标签，或标签（长度>=3）包含于实体时，二者必有共同的3-gram，
+        # 因此只需校验实体3-gram命中的候选节点
+        candidates = set()
+        for i in range(len(entity_lower) - _NGRAM_SIZE + 1):
+            candidates.update(index.substr_index.get(entity_lower[i:i + _NGRAM_SIZE], ()))
+        candidates -= matched_node_ids
+        
+        for node_id in candidates:
+            label_lower = index.labels[node_id]
+            if entity_lower in label_lower or label_lower in entity_lower:
+                matched_node_ids.add(node_id)
+        
+        # 短标签不在n-gram索引中，单独检查
+        for node_id, label_lower in index.short_labels:
+            if node_id not in matched_node_ids and label_lower in entity_lower:
+                matched_node_ids.add(node_id)
+    else:
+        # 短实体无法使用n-gram索引，退回逐个比较
+        for node_id, label_lower, _ in index.rows:
+            if node_id in matched_node_ids:
+                continue
+            if entity_lower in label_lower or label_lower in entity_lower:
+                matched_node_ids.add(node_id)
+
+
+def _containment_match_automaton(entities_lower: List[str], index: _NormIndex,
+                                 matched_node_ids: Set[str]) -> None:
+    """
+    使用Aho–Corasick自动机批量进行包含匹配
+
+    标签包含于实体：用按图缓存的标签自动机逐个扫描实体；
+    实体包含于标签：用本批实体构建自动机，对每个标签只扫描一遍。
+
+    Args:
+        entities_lower: 待匹配的小写实体列表
+        index: 节点规范化索引（label_automaton 不为空）
+        matched_node_ids: 已匹配节点ID集合（原地更新）
+    """
+    # 标签包含于实体（空标签包含于任意实体）
+    for entity_lower in entities_lower:
+        for _, node_ids in index.label_automaton.iter(entity_lower):
+            matched_node_ids.update(node_ids)
+    matched_node_ids.update(index.exact_map.get('', ()))
+    
+    # 实体包含于标签
+    entity_automaton = ahocorasick.Automaton()
+    for entity_lower in set(entities_lower):
+        entity_automaton.add_word(entity_lower, entity_lower)
+    entity_automaton.make_automaton()
+    
+    for node_id, label_lower, _ in index.rows:
+        if node_id in matched_node_ids:
+            continue
+        for _ in entity_automaton.iter(label_lower):
+            matched_node_ids.add(node_id)
+            break
 
 
-def fuzzy_match_entities_to_nodes(entities: List[str], graph) -> List[str]:
+def fuzzy_match_entities_to_nodes(entities: List[str], graph,
+                                  norm_index: Optional[_NormIndex] = None) -> List[str]:
     """
     使用模糊匹配将实体映射到图谱节点ID
     
-    三级匹配策略：
+    三级匹配策略（按顺序尝试，某级命中后该实体不再尝试后续策略）：
     1. 精确匹配
     2. 去前缀匹配
     3. 包含匹配
@@ -403,50 +722,45 @@ def fuzzy_match_entities_to_nodes(entities: List[str], graph) -> List[str]:
     Args:
         entities: 实体名称列表
         graph: PolicyGraph对象
+        norm_index: 预先构建的节点规范化索引（见 _get_norm_index，None则自动获取）
     
     Returns:
         匹配到的节点ID列表
     """
     matched_node_ids = set()
     
-    # 前缀清理列表
-    prefixes_to_remove = ["中华人民共和国", "国家", "省", "市", "自治区"]
+    # 节点标签的规范化索引（按图缓存），避免每个实体/每个结果都重复处理所有节点
+    index = norm_index if norm_index is not None else _get_norm_index(graph)
     
-    def clean_prefix(text: str) -> str:
-        """移除常见前缀"""
-        for prefix in prefixes_to_remove:
-            if text.startswith(prefix):
-                text = text[len(prefix):]
-        return text
+    # 需要进行包含匹配的实体
+    pending = []
     
-    # 遍历每个实体
-    for entity in entities:
-        if not entity:
+    # 遍历每个实体（去除空值和重复实体）
+    for entity in dict.fromkeys(e for e in entities if e):
+        entity_lower = entity.lower()
+        entity_cleaned = _clean_prefix(entity).lower()
+        
+        # 策略1：精确匹配（命中则跳过后续策略）
+        exact_ids = index.exact_map.get(entity_lower)
+        if exact_ids:
+            matched_node_ids.update(exact_ids)
             continue
         
-        entity_lower = entity.lower()
-        entity_cleaned = clean_prefix(entity).lower()
+        # 策略2：去前缀匹配（命中则跳过包含匹配）
+        cleaned_ids = index.cleaned_map.get(entity_cleaned)
+        if cleaned_ids:
+            matched_node_ids.update(cleaned_ids)
+            continue
         
-        # 遍历图谱中所有节点
-        for node_id, node in graph.nodes.items():
-            label = node.label
-            label_lower = label.lower()
-            label_cleaned = clean_prefix(label).lower()
-            
-            # 策略1：精确匹配
-            if entity_lower == label_lower:
-                matched_node_ids.add(node_id)
-                continue
-            
-            # 策略2：去前缀匹配
-            if entity_cleaned == label_cleaned:
-                matched_node_ids.add(node_id)
-                continue
-            
-            # 策略3：包含匹配
-            if entity_lower in label_lower or label_lower in entity_lower:
-                matched_node_ids.add(node_id)
-                continue
+        # 策略3：包含匹配（仅在前两种策略均未命中时执行，收集后批量处理）
+        pending.append(entity_lower)
+    
+    if pending:
+        if index.label_automaton is not None:
+            _containment_match_automaton(pending, index, matched_node_ids)
+        else:
+            for entity_lower in pending:
+                _containment_match_ngram(entity_lower, index, matched_node_ids)
     
     return list(matched_node_ids)
 
@@ -482,23 +796,27 @@ def build_subgraph_for_entities(graph, entity_node_ids: List[str], max_nodes: in
         if node:
             subgraph.add_node(node)
     
-    # 2. 收集1跳邻居
-    neighbors = set()
-    for entity_id in entity_node_ids:
-        if entity_id in nx_graph:
-            neighbors.update(nx_graph.neighbors(entity_id))
-    
-    # 移除已经在实体节点中的
-    neighbors = neighbors - set(entity_node_ids)
+    # 2. 收集1跳邻居（直接合并邻接字典的键），并移除已经在实体节点中的
+    entity_set = set(entity_node_ids)
+    adj = nx_graph.adj
+    neighbors = set().union(*(adj[e] for e in entity_set if e in adj)) - entity_set
     
     # 3. 如果邻居数量+实体数量 > max_nodes，需要筛选
     remaining_slots = max_nodes - len(entity_node_ids)
     
     if len(neighbors) > remaining_slots:
-        # 按度数排序邻居（高度数优先）
-        neighbor_degrees = [(n, nx_graph.degree(n)) for n in neighbors]
-        neighbor_degrees.sort(key=lambda x: x[1], reverse=True)
-        neighbors = [n for n, _ in neighbor_degrees[:remaining_slots]]
+        # 取度数最高的邻居（高度数优先），argpartition只做部分排序
+        if remaining_slots <= 0:
+            neighbors = []
+        else:
+            neighbor_ids = np.array(list(neighbors), dtype=object)
+            degrees = np.fromiter(
+                (nx_graph.degree(n) for n in neighbor_ids),
+                dtype=np.int64,
+                count=len(neighbor_ids)
+            )
+            top_idx = np.argpartition(-degrees, remaining_slots - 1)[:remaining_slots]
+            neighbors = neighbor_ids[top_idx].tolist()
     
     # 4. 添加邻居节点
     for neighbor_id in neighbors:
@@ -507,13 +825,117 @@ def build_subgraph_for_entities(graph, entity_node_ids: List[str], max_nodes: in
             subgraph.add_node(node)
     
     # 5. 添加边（只添加子图中存在的边）
-    for edge in graph.edges:
-        if edge.source_id in subgraph.nodes and edge.target_id in subgraph.nodes:
-            subgraph.add_edge(edge)
+    # 只遍历保留节点作为源的边，避免扫描完整图谱的全部边；每条边只按源节点登记一次，无需额外去重
+    keep_set = set(subgraph.nodes)
+    for node_id in keep_set:
+        for edge in graph.get_edges_from(node_id):
+            if edge.target_id in keep_set:
+                subgraph.add_edge(edge)
     
     return subgraph
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def _match_and_subgraph(policy: Dict[str, Any], graph_version: int,
+                        _graph, _norm_index=None) -> Tuple[List[str], List[str], Any]:
+    """
+    提取政策实体、匹配图谱节点并构建子图（结果按政策内容和图谱版本缓存）
+
+    Streamlit每次交互都会重跑脚本，缓存后未变化的结果卡片不再重复匹配与建图。
+    _graph/_norm_index 不参与缓存键哈希，由 graph_version 标识图谱内容。
+
+    Args:
+        policy: 政策字典对象
+        graph_version: 图谱版本号（PolicyGraph.version，进程内全局唯一，内容变化后改变）
+        _graph: 完整的PolicyGraph对象
+        _norm_index: 预先构建的节点规范化索引
+
+    Returns:
+        (实体列表, 匹配到的节点ID列表, 子图PolicyGraph或None)
+    """
+    entities = extract_entities_from_policy(policy)
+    if not entities:
+        return entities, [], None
+
+    matched_node_ids = fuzzy_match_entities_to_nodes(entities, _graph, _norm_index)
+    if not matched_node_ids:
+        return entities, [], None
+
+    subgraph = build_subgraph_for_entities(_graph, matched_node_ids)
+    return entities, matched_node_ids, subgraph
+
+
+# 高亮图谱HTML模板（vis.js从CDN加载，{{DATA}} 处注入节点/边/选项JSON）
+_GRAPH_TEMPLATE_PATH = Path(__file__).parent / "assets" / "graph_template.html"
+
+
+@cache
+def _load_graph_template() -> str:
+    """读取高亮图谱HTML模板（进程内只读取一次）"""
+    return _GRAPH_TEMPLATE_PATH.read_text(encoding='utf-8')
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _build_graph_html(nodes_tuple: Tuple[Tuple[str, str, str], ...],
+                      edges_tuple: Tuple[Tuple[str, str, str], ...],
+                      highlight_tuple: Tuple[str, ...]) -> str:
+    """
+    生成高亮图谱的HTML（按节点/边/高亮集合缓存，重跑脚本时不再重复生成）
+    
+    不经过Pyvis生成整页HTML，只将节点/边数据序列化为JSON注入静态vis.js模板。
+    
+    Args:
+        nodes_tuple: ((node_id, label, node_type), ...)
+        edges_tuple: ((source_id, target_id, title), ...)
+        highlight_tuple: 高亮节点ID
+    
+    Returns:
+        HTML字符串
+    """
+    highlighted_set = set(highlight_tuple)
+    
+    nodes = []
+    for node_id, label, node_type in nodes_tuple:
+        is_highlighted = node_id in highlighted_set
+        nodes.append({
+            'id': node_id,
+            'label': label,
+            'color': "#FF8C00" if is_highlighted else "#4169E1",  # 橙色/蓝色
+            'size': 30 if is_highlighted else 15,  # 大/小
+            'title': f"{node_type}: {label}"
+        })
+    
+    edges = [
+        {'from': source_id, 'to': target_id, 'title': title}
+        for source_id, target_id, title in edges_tuple
+    ]
+    
+    # 设置物理引擎：小图直接关闭物理模拟，较大的图按节点数设置稳定迭代次数
+    node_count = len(nodes_tuple)
+    if node_count <= 8:
+        physics = {"enabled": False}
+    else:
+        physics = {
+            "enabled": True,
+            "stabilization": {
+                "iterations": min(100, 10 * node_count)
+            }
+        }
+    
+    options = {
+        "nodes": {"shape": "dot", "font": {"color": "white"}},
+        "edges": {"color": "#888888"},
+        "physics": physics
+    }
+    
+    # 转义 "</"，避免数据中的 "</script>" 提前结束脚本标签
+    data = json.dumps(
+        {'nodes': nodes, 'edges': edges, 'options': options},
+        ensure_ascii=False
+    ).replace("</", "<\\/")
+    return _load_graph_template().replace("{{DATA}}", data)
+
+
 def render_highlighted_graph(subgraph, highlighted_node_ids: List[str]) -> None:
     """
     渲染高亮图谱
@@ -537,67 +959,21 @@ def render_highlighted_graph(subgraph, highlighted_node_ids: List[str]) -> None:
     • 图谱最多显示50个节点，优先展示实体节点及其直接关联
     """)
     
-    # 创建Pyvis网络图
-    net = Network(
-        height="500px",
-        width="100%",
-        bgcolor="#222222",
-        font_color="white",
-        directed=False
-    )
-    
-    # 添加节点
-    highlighted_set = set(highlighted_node_ids)
-    
-    for node_id, node in subgraph.nodes.items():
-        is_highlighted = node_id in highlighted_set
-        
-        # 设置节点样式
-        color = "#FF8C00" if is_highlighted else "#4169E1"  # 橙色/蓝色
-        size = 30 if is_highlighted else 15  # 大/小
-        
-        net.add_node(
-            node_id,
-            label=node.label,
-            color=color,
-            size=size,
-            title=f"{node.node_type.value}: {node.label}"
-        )
-    
-    # 添加边
-    for edge in subgraph.edges:
-        net.add_edge(
-            edge.source_id,
-            edge.target_id,
-            title=edge.label or edge.relation_type.value,
-            color="#888888"
-        )
+    # 规范化为可哈希的元组，作为HTML缓存键
+    nodes_tuple = tuple(sorted(
+        (node_id, node.label, node.node_type.value)
+        for node_id, node in subgraph.nodes.items()
+    ))
+    edges_tuple = tuple(sorted(
+        (edge.source_id, edge.target_id, edge.label or edge.relation_type.value)
+        for edge in subgraph.edges
+    ))
+    highlight_tuple = tuple(sorted(set(highlighted_node_ids)))
     
-    # 设置物理引擎
-    net.set_options("""
-    {
-        "physics": {
-            "enabled": true,
-            "stabilization": {
-                "iterations": 100
-            }
-        }
-    }
-    """)
-    
-    # 保存并显示
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.html', mode='w', encoding='utf-8') as f:
-            html_path = f.name
-            net.save_graph(html_path)
-        
-        with open(html_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        st.components.v1.html(html_content, height=520, scrolling=True)
-        
-        # 清理临时文件
-        Path(html_path).unlink(missing_ok=True)
-        
+        html_content = _build_graph_html(nodes_tuple, edges_tuple, highlight_tuple)
     except Exception as e:
-        st.error(f"图谱渲染失败: {str(e)}")
\ No newline at end of file
+        st.error(f"图谱渲染失败: {str(e)}")
+        return
+    
+    st.components.v1.html(html_content, height=520, scrolling=True)
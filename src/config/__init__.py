@@ -2,18 +2,20 @@
 配置管理模块
 从config/config.ini读取应用配置
 """
-from src.config.config_loader import ConfigLoader
+from functools import cache
 
-# 全局配置加载器单例
-_config_loader = None
+from src.config.config_loader import ConfigLoader
 
 
+@cache
 def get_config():
-    """获取全局配置加载器"""
-    global _config_loader
-    if _config_loader is None:
-        _config_loader = ConfigLoader()
-    return _config_loader
+    """获取全局配置加载器（首次调用时创建，之后直接返回同一实例）"""
+    return ConfigLoader()
+
+
+def reset_config():
+    """丢弃全局配置加载器，下次 get_config() 时重新创建（主要用于测试）"""
+    get_config.cache_clear()
 
 
-__all__ = ["get_config", "ConfigLoader"]
+__all__ = ["get_config", "reset_config", "ConfigLoader"]
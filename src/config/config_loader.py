@@ -2,55 +2,346 @@
 配置加载器 - 从config.ini和知识库配置文件读取配置
 """
 import configparser
+import copy
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录（导入时计算一次）
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 配置项不存在（或类型转换失败）时在缓存中的占位值
+_MISSING = object()
+
+# 缓存中尚无该键时 dict.get 的默认值（避免未命中时抛出KeyError）
+_NOT_CACHED = object()
+
+# 布尔配置值的取值映射（与 ConfigParser.BOOLEAN_STATES 一致）
+_BOOL = {
+    "1": True, "yes": True, "true": True, "on": True,
+    "0": False, "no": False, "false": False, "off": False,
+}
+
+# 允许上传的文件扩展名对应的MIME类型（只读）
+_MIME_TYPES: Mapping[str, str] = MappingProxyType({
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "txt": "text/plain"
+})
+
+
+# 配置值类型转换函数
+_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": lambda raw: _BOOL[raw.strip().lower()],
+    "list": lambda raw: [item.strip() for item in raw.split(",")],
+}
+
+# 组合配置字典的声明式定义：属性名 -> (section, {输出键: (option, 类型, 默认值)})
+_SCHEMAS: Dict[str, Tuple[str, Dict[str, Tuple[str, str, Any]]]] = {
+    "ragflow_search_config": ("RAGFLOW", {
+        "top_k": ("search_top_k", "int", 10),
+        "score_threshold": ("search_score_threshold", "float", 0.5),
+        "search_type": ("search_type", "str", "hybrid"),
+    }),
+    "ragflow_qa_config": ("RAGFLOW", {
+        "max_tokens": ("qa_max_tokens", "int", 2000),
+        "temperature": ("qa_temperature", "float", 0.1),
+        "top_p": ("qa_top_p", "float", 0.9),
+    }),
+    "ragflow_document_config": ("RAGFLOW", {
+        "chunk_size": ("document_chunk_size", "int", 800),
+        "chunk_overlap": ("document_chunk_overlap", "int", 100),
+        "smart_chunking": ("document_smart_chunking", "bool", True),
+        "pdf_parser": ("ragflow_pdf_parser", "str", "deepdoc"),
+        "auto_metadata": ("ragflow_auto_metadata", "bool", True),
+        "metadata_extraction": ("ragflow_metadata_extraction", "bool", True),
+        "table_recognition": ("ragflow_table_recognition", "bool", True),
+        "formula_recognition": ("ragflow_formula_recognition", "bool", False),
+        "ocr_enabled": ("ragflow_ocr_enabled", "bool", True),
+    }),
+    "ragflow_advanced_config": ("RAGFLOW", {
+        "max_tokens": ("ragflow_max_tokens", "int", 2048),
+        "similarity_threshold": ("ragflow_similarity_threshold", "float", 0.3),
+        "max_clusters": ("ragflow_max_clusters", "int", 50),
+        "random_seed": ("ragflow_random_seed", "int", 42),
+        "retrieval_mode": ("ragflow_retrieval_mode", "str", "general"),
+        "entity_normalization": ("ragflow_entity_normalization", "bool", True),
+        "graph_retrieval": ("ragflow_graph_retrieval", "bool", True),
+    }),
+    "whisper_transcribe_config": ("WHISPER", {
+        "task": ("transcribe_task", "str", "transcribe"),
+        "language": ("transcribe_language", "str", "zh"),
+        "word_timestamps": ("word_timestamps", "bool", False),
+    }),
+    "whisper_audio_config": ("WHISPER", {
+        "sample_rate": ("audio_sample_rate", "int", 16000),
+        "channels": ("audio_channels", "int", 1),
+        "normalize": ("audio_normalize", "bool", True),
+        "remove_silence": ("audio_remove_silence", "bool", False),
+        "max_duration": ("audio_max_duration", "int", 300),
+    }),
+    "whisper_file_config": ("WHISPER", {
+        "max_file_size": ("audio_max_file_size", "int", 52428800),
+        "supported_formats": ("audio_supported_formats", "list", [".wav", ".mp3", ".m4a", ".flac", ".ogg"]),
+    }),
+    "whisper_model_config": ("WHISPER", {
+        "model": ("whisper_model", "str", "base"),
+        "device": ("whisper_device", "str", "cpu"),
+        "compute_type": ("whisper_compute_type", "str", "float32"),
+    }),
+    "sqlite_config": ("DATABASE", {
+        "check_same_thread": ("sqlite_check_same_thread", "bool", False),
+        "timeout": ("sqlite_timeout", "float", 10.0),
+    }),
+    "connection_pool_config": ("DATABASE", {
+        "pool_size": ("pool_size", "int", 5),
+        "max_overflow": ("max_overflow", "int", 10),
+        "pool_recycle": ("pool_recycle", "int", 3600),
+    }),
+    "pyvis_config": ("GRAPH", {
+        "height": ("pyvis_height", "str", "750px"),
+        "width": ("pyvis_width", "str", "100%"),
+        "bgcolor": ("pyvis_bgcolor", "str", "#222222"),
+        "font_color": ("pyvis_font_color", "str", "white"),
+        "font_size": ("pyvis_font_size", "int", 14),
+        "physics_enabled": ("pyvis_physics_enabled", "bool", True),
+        "stabilization_iterations": ("pyvis_stabilization_iterations", "int", 200),
+    }),
+}
+
+# 知识库配置文件的声明式定义：[(section, {输出键: (option, 类型, 默认值)})]
+_KB_SCHEMA: List[Tuple[str, Dict[str, Tuple[str, str, Any]]]] = [
+    ("KNOWLEDGE_BASE", {
+        "kb_description": ("description", "str", ""),
+        "kb_language": ("language", "str", "Chinese"),
+    }),
+    ("DOCUMENT_PROCESSING", {
+        "chunk_size": ("chunk_size", "int", 800),
+        "chunk_overlap": ("chunk_overlap", "int", 100),
+        "chunk_method": ("chunk_method", "str", "naive"),
+        "pdf_parser": ("pdf_parser", "str", "deepdoc"),
+        "auto_metadata": ("auto_metadata", "bool", True),
+        "table_recognition": ("table_recognition", "bool", True),
+        "formula_recognition": ("formula_recognition", "bool", False),
+        "ocr_enabled": ("ocr_enabled", "bool", True),
+        "layout_recognize": ("layout_recognize", "str", "deepdoc"),
+    }),
+    ("RETRIEVAL", {
+        "similarity_threshold": ("similarity_threshold", "float", 0.3),
+        "max_tokens": ("max_tokens", "int", 2048),
+        "graph_retrieval": ("graph_retrieval", "bool", True),
+        "entity_normalization": ("entity_normalization", "bool", True),
+        "max_clusters": ("max_clusters", "int", 50),
+    }),
+    ("QA", {
+        "qa_max_tokens": ("max_tokens", "int", 2000),
+        "qa_temperature": ("temperature", "float", 0.1),
+        "qa_top_p": ("top_p", "float", 0.9),
+    }),
+]
+
+
+def _convert_fields(section: str, fields: Dict[str, Tuple[str, str, Any]],
+                    lookup: Callable[[str, str], Optional[str]]) -> dict:
+    """
+    按声明读取并转换一组配置项
+
+    Args:
+        section: 配置段名称
+        fields: {输出键: (option, 类型, 默认值)}
+        lookup: 读取原始字符串的函数，配置项不存在时返回None
+
+    Returns:
+        配置字典，配置项不存在或转换失败时使用默认值
+    """
+    result = {}
+    for key, (option, type_tag, default) in fields.items():
+        raw = lookup(section, option)
+        try:
+            result[key] = _CONVERTERS[type_tag](raw) if raw is not None else copy.copy(default)
+        except (ValueError, KeyError):
+            result[key] = copy.copy(default)
+    return result
+
+# KNOWLEDGE_BASES中不属于知识库名称的配置键
+_KB_EXCLUDED_KEYS = frozenset({"default_kb", "knowledgebase_config_dir", "prompts_dir"})
 
 
 class ConfigLoader:
     """配置加载器类"""
 
+    # 实例状态使用固定槽位；保留 __dict__ 供 cached_property 缓存组合配置
+    __slots__ = (
+        "config_path", "project_root", "_parser", "_loaded", "_flat", "_env",
+        "_value_cache", "_list_cache", "_kb_configs", "_kb_lock", "_kb_full_config", "_prompt_cache",
+        "__dict__", "__weakref__",
+    )
+
+    # 进程内已确认存在的目录，后续实例无需再次stat
+    _created_dirs: Set[Path] = set()
+
+    # 可覆盖config.ini配置的环境变量
+    _ENV_KEYS = (
+        "RAGFLOW_HOST", "RAGFLOW_PORT", "RAGFLOW_API_KEY",
+        "WHISPER_HOST", "WHISPER_PORT", "DEEPSEEK_API_KEY",
+    )
+
+    # 已解析的ini文件缓存：(路径, st_mtime_ns, st_size) -> ConfigParser
+    _PARSED_CACHE: Dict[Tuple[str, int, int], configparser.ConfigParser] = {}
+    # 保护 _PARSED_CACHE（预加载知识库配置时多个线程并发读写）
+    _PARSED_CACHE_LOCK = threading.Lock()
+
     def __init__(self):
-        """初始化配置加载器"""
-        self.config = configparser.ConfigParser()
+        """初始化配置加载器（config.ini的解析与目录创建均延迟到首次使用时）"""
         self.config_path = self._find_config_file()
 
-        if self.config_path and self.config_path.exists():
-            self.config.read(self.config_path, encoding='utf-8')
-        else:
+        if not (self.config_path and self.config_path.exists()):
             raise FileNotFoundError(
                 "config.ini 文件不存在。请复制 config/config.ini.template 为 config/config.ini"
             )
 
-        # 初始化项目路径
-        self.project_root = Path(__file__).parent.parent.parent
-        self.data_dir = self.project_root / "data"
-        self.logs_dir = self.project_root / "logs"
+        # 底层ConfigParser，首次访问 config 属性时才读取文件
+        self._parser: Optional[configparser.ConfigParser] = None
+        self._loaded = False
 
-        # 创建必要的目录
-        self._ensure_directories()
+        # 初始化项目路径
+        self.project_root = _PROJECT_ROOT
         
         # 知识库配置缓存
         self._kb_configs = {}
+        self._kb_lock = threading.Lock()
+
+        # 知识库完整配置缓存：kb_name -> (配置字典, 提示词文件名)
+        self._kb_full_config: Dict[str, Tuple[Dict, str]] = {}
+
+        # 提示词文件内容缓存：文件名 -> (st_mtime_ns, st_size, 内容)
+        self._prompt_cache: Dict[str, Tuple[int, int, str]] = {}
+
+        # 扁平配置字典：(section, option) -> 原始字符串
+        self._flat: Dict[Tuple[str, str], str] = {}
+
+        # 环境变量覆盖项快照
+        self._env = self._snapshot_env()
+
+        # 已转换配置值缓存：(类型, section, option) -> 值
+        self._value_cache: Dict[Tuple[str, str, str], Any] = {}
+
+        # 列表配置缓存：(section, option, 分隔符) -> 元组（配置项不存在时为None）
+        self._list_cache: Dict[Tuple[str, str, str], Optional[Tuple[str, ...]]] = {}
+
+    @classmethod
+    def _snapshot_env(cls) -> Dict[str, Optional[str]]:
+        """读取一次可覆盖配置的环境变量"""
+        return {key: os.environ.get(key) for key in cls._ENV_KEYS}
+
+    def _ensure_loaded(self):
+        """首次使用时读取config.ini"""
+        if not self._loaded:
+            self._parser = self._read_parsed(self.config_path)
+            self._flatten()
+            self._loaded = True
+
+    @classmethod
+    def _read_parsed(cls, path: Path, force: bool = False) -> configparser.ConfigParser:
+        """
+        读取ini文件，文件未变化（mtime和大小一致）时复用进程内已解析的结果
+
+        Args:
+            path: ini文件路径
+            force: 是否忽略缓存强制重新解析
+
+        Returns:
+            解析后的ConfigParser
+        """
+        st = os.stat(path)
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        if not force:
+            with cls._PARSED_CACHE_LOCK:
+                cached = cls._PARSED_CACHE.get(key)
+            if cached is not None:
+                return cached
+
+        # 解析在锁外进行，不同文件可并发解析
+        parser = configparser.ConfigParser()
+        parser.read(path, encoding='utf-8')
+
+        with cls._PARSED_CACHE_LOCK:
+            # 同一文件只保留最新版本的解析结果
+            for stale in [k for k in cls._PARSED_CACHE if k[0] == key[0]]:
+                del cls._PARSED_CACHE[stale]
+            cls._PARSED_CACHE[key] = parser
+        return parser
+
+    @property
+    def config(self) -> configparser.ConfigParser:
+        """底层ConfigParser（首次访问时读取config.ini）"""
+        self._ensure_loaded()
+        return self._parser
+
+    @cached_property
+    def data_dir(self) -> Path:
+        """数据目录（首次访问时创建必要的目录）"""
+        self._ensure_directories()
+        return self.project_root / "data"
+
+    @cached_property
+    def logs_dir(self) -> Path:
+        """日志目录（首次访问时创建必要的目录）"""
+        self._ensure_directories()
+        return self.project_root / "logs"
 
     def _find_config_file(self) -> Path:
         """查找config.ini文件"""
         # 优先从项目根目录的config目录查找
-        project_root = Path(__file__).parent.parent.parent
-        config_file = project_root / "config" / "config.ini"
+        config_file = _PROJECT_ROOT / "config" / "config.ini"
         return config_file
 
     def _ensure_directories(self):
-        """确保必要的目录存在"""
+        """确保必要的目录存在（已确认存在的目录在进程内不再stat/mkdir，已初始化的目录布局只检查哨兵文件）"""
+        data_dir = self.project_root / "data"
+        # data目录本身由子目录的 parents=True 一并创建
         dirs = [
-            self.data_dir,
-            self.data_dir / "database",
-            self.data_dir / "uploads",
-            self.data_dir / "graphs",
-            self.logs_dir,
+            data_dir / "database",
+            data_dir / "uploads",
+            data_dir / "graphs",
+            self.project_root / "logs",
         ]
-        for dir_path in dirs:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        pending = [dir_path for dir_path in dirs if dir_path not in ConfigLoader._created_dirs]
+        if not pending:
+            return
+
+        # 之前的进程已完成目录初始化
+        sentinel = data_dir / ".initialized"
+        if sentinel.exists():
+            ConfigLoader._created_dirs.update(dirs)
+            return
+
+        all_created = True
+        for dir_path in pending:
+            try:
+                if not dir_path.is_dir():
+                    dir_path.mkdir(parents=True, exist_ok=True)
+                ConfigLoader._created_dirs.add(dir_path)
+            except OSError as e:
+                all_created = False
+                logger.warning("创建目录 %s 失败: %s", dir_path, e)
+
+        if all_created:
+            try:
+                sentinel.touch()
+            except OSError as e:
+                logger.warning("创建目录初始化标记 %s 失败: %s", sentinel, e)
 
     def _load_kb_config(self, kb_name: str) -> Optional[configparser.ConfigParser]:
         """加载知识库专用配置文件"""
@@ -64,355 +355,376 @@ class ConfigLoader:
             config_path = self.project_root / kb_config_dir / config_filename
             
             if config_path.exists():
-                kb_config = configparser.ConfigParser()
-                kb_config.read(config_path, encoding='utf-8')
-                self._kb_configs[kb_name] = kb_config
-                return kb_config
+                kb_config = self._read_parsed(config_path)
+                with self._kb_lock:
+                    return self._kb_configs.setdefault(kb_name, kb_config)
             else:
-                print(f"Warning: 知识库配置文件 {config_path} 不存在")
+                logger.warning("知识库配置文件 %s 不存在", config_path)
                 return None
                 
         except Exception as e:
-            print(f"Error: 加载知识库配置 {kb_name} 失败: {e}")
+            logger.error("加载知识库配置 %s 失败: %s", kb_name, e)
             return None
 
+    def _flatten(self):
+        """将已解析的配置展开为 (section, option) -> 原始字符串 的扁平字典"""
+        parser = self._parser
+        self._flat = {
+            (section, option): value
+            for section in parser.sections()
+            for option, value in parser.items(section, raw=True)
+        }
+
+    def preload_kb_configs(self, names: Optional[List[str]] = None):
+        """
+        并发预加载知识库配置文件
+
+        Args:
+            names: 知识库名称列表，默认为所有可用知识库
+        """
+        if names is None:
+            names = self.get_available_kb_names()
+        names = [name for name in names if name not in self._kb_configs]
+        if not names:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(8, len(names))) as executor:
+            list(executor.map(self._load_kb_config, names))
+
+    def _lookup(self, type_tag: str, section: str, option: str, convert: Callable):
+        """读取、转换并缓存配置值，配置项不存在或转换失败时缓存 _MISSING"""
+        key = (type_tag, section, option)
+        value = self._value_cache.get(key, _NOT_CACHED)
+        if value is not _NOT_CACHED:
+            return value
+
+        raw = self.get(section, option)
+        try:
+            value = _MISSING if raw is None else convert(raw)
+        except (ValueError, KeyError):
+            value = _MISSING
+        self._value_cache[key] = value
+        return value
+
+    def _materialize(self, schema_name: str) -> dict:
+        """
+        按 _SCHEMAS 中的声明一次性读取并转换一组配置
+
+        Args:
+            schema_name: _SCHEMAS 中的定义名称
+
+        Returns:
+            配置字典，配置项不存在或转换失败时使用默认值
+        """
+        section, fields = _SCHEMAS[schema_name]
+        self._ensure_loaded()
+        flat = self._flat
+        return _convert_fields(section, fields, lambda section, option: flat.get((section, option)))
+
     def get(self, section: str, option: str, fallback=None):
         """获取配置值"""
-        try:
-            return self.config.get(section, option)
-        except (configparser.NoSectionError, configparser.NoOptionError):
-            return fallback
+        if not self._loaded:
+            self._ensure_loaded()
+        return self._flat.get((section, option.lower()), fallback)
 
     def get_int(self, section: str, option: str, fallback=None):
         """获取整数配置值"""
-        try:
-            return self.config.getint(section, option)
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            return fallback
+        value = self._lookup("int", section, option, int)
+        return fallback if value is _MISSING else value
 
     def get_float(self, section: str, option: str, fallback=None):
         """获取浮点数配置值"""
-        try:
-            return self.config.getfloat(section, option)
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            return fallback
+        value = self._lookup("float", section, option, float)
+        return fallback if value is _MISSING else value
 
     def get_bool(self, section: str, option: str, fallback=False):
         """获取布尔值配置"""
-        try:
-            return self.config.getboolean(section, option)
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            return fallback
+        value = self._lookup("bool", section, option, lambda raw: _BOOL[raw.strip().lower()])
+        return fallback if value is _MISSING else value
 
     def get_list(self, section: str, option: str, fallback=None, separator=","):
         """获取列表配置值（逗号分隔）"""
-        value = self.get(section, option)
-        if value is None:
+        key = (section, option, separator)
+        items = self._list_cache.get(key, _NOT_CACHED)
+        if items is _NOT_CACHED:
+            value = self.get(section, option)
+            items = None if value is None else tuple(item.strip() for item in value.split(separator))
+            self._list_cache[key] = items
+        if items is None:
             return fallback if fallback is not None else []
-        return [item.strip() for item in value.split(separator)]
+        return list(items)
+
+    def reload(self):
+        """重新读取config.ini及环境变量，并清空所有已缓存的配置值"""
+        self._parser = self._read_parsed(self.config_path, force=True)
+        self._flatten()
+        self._loaded = True
+        self._env = self._snapshot_env()
+        self._value_cache.clear()
+        self._list_cache.clear()
+        self._kb_configs.clear()
+        self._kb_full_config.clear()
+        self._prompt_cache.clear()
+
+        # 清除 cached_property 缓存的组合配置及环境变量覆盖项
+        for name, attr in vars(type(self)).items():
+            if isinstance(attr, cached_property):
+                self.__dict__.pop(name, None)
 
     # ===== APP 配置 =====
-    @property
+    @cached_property
     def app_name(self) -> str:
         return self.get("APP", "name", "政策库知识库+知识图谱系统")
 
-    @property
+    @cached_property
     def app_description(self) -> str:
         return self.get("APP", "description", "专项债、特许经营、数据资产政策知识库")
 
-    @property
+    @cached_property
     def app_icon(self) -> str:
         return self.get("APP", "icon", "📋")
 
-    @property
+    @cached_property
     def app_layout(self) -> str:
         return self.get("APP", "layout", "wide")
 
-    @property
+    @cached_property
     def app_debug(self) -> bool:
         return self.get_bool("APP", "debug", False)
 
-    @property
+    @cached_property
     def llm_provider(self) -> str:
         """大模型提供商：qwen 或 openai"""
         return self.get("APP", "provider", "qwen").lower()
 
-    @property
+    @cached_property
     def default_language(self) -> str:
         return self.get("APP", "default_language", "zh")
 
-    @property
-    def supported_languages(self) -> list:
-        return self.get_list("APP", "supported_languages", ["zh", "en"])
+    @cached_property
+    def supported_languages(self) -> tuple:
+        """支持的语言（不可变元组）"""
+        return tuple(self.get_list("APP", "supported_languages", ["zh", "en"]))
 
-    @property
+    @cached_property
     def search_results_per_page(self) -> int:
         return self.get_int("APP", "search_results_per_page", 10)
 
-    @property
+    @cached_property
     def max_search_results(self) -> int:
         return self.get_int("APP", "max_search_results", 100)
 
-    @property
+    @cached_property
     def graph_max_nodes(self) -> int:
         return self.get_int("APP", "graph_max_nodes", 200)
 
-    @property
+    @cached_property
     def graph_max_edges(self) -> int:
         return self.get_int("APP", "graph_max_edges", 500)
 
-    @property
+    @cached_property
     def default_graph_layout(self) -> str:
         return self.get("APP", "default_graph_layout", "force_directed")
 
-    @property
+    @cached_property
     def expiration_warning_days(self) -> int:
         return self.get_int("APP", "expiration_warning_days", 30)
 
-    @property
+    @cached_property
     def max_upload_size(self) -> int:
         return self.get_int("APP", "max_upload_size", 52428800)  # 50MB
 
-    @property
+    @cached_property
     def allowed_file_types(self) -> dict:
         """获取允许的文件类型"""
         extensions = self.get_list("APP", "allowed_file_types", ["pdf", "docx", "xlsx", "txt"])
-        mime_types = {
-            "pdf": "application/pdf",
-            "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "txt": "text/plain"
-        }
-        return {ext: mime_types.get(ext, "") for ext in extensions}
+        return {ext: _MIME_TYPES.get(ext, "") for ext in extensions}
 
     # ===== RAGFLOW 配置 =====
-    @property
+    @cached_property
     def ragflow_host(self) -> str:
-        return os.getenv("RAGFLOW_HOST") or self.get("RAGFLOW", "host", "localhost")
+        return self._env.get("RAGFLOW_HOST") or self.get("RAGFLOW", "host", "localhost")
 
-    @property
+    @cached_property
     def ragflow_port(self) -> int:
-        port = os.getenv("RAGFLOW_PORT") or self.get("RAGFLOW", "port")
+        port = self._env.get("RAGFLOW_PORT") or self.get("RAGFLOW", "port")
         return int(port) if port else 9380
 
-    @property
+    @cached_property
     def ragflow_base_url(self) -> str:
         return f"http://{self.ragflow_host}:{self.ragflow_port}"
 
-    @property
+    @cached_property
     def ragflow_api_key(self) -> str:
         """获取RAGFlow API Key（支持环境变量覆盖）"""
-        return os.getenv("RAGFLOW_API_KEY") or self.get("RAGFLOW", "api_key", "")
+        return self._env.get("RAGFLOW_API_KEY") or self.get("RAGFLOW", "api_key", "")
 
-    @property
+    @cached_property
     def ragflow_web_url(self) -> str:
         """获取RAGFlow Web界面URL"""
         return self.get("RAGFLOW", "web_url", self.ragflow_base_url)
 
-    @property
+    @cached_property
     def ragflow_timeout(self) -> int:
         return self.get_int("RAGFLOW", "timeout", 30)
 
-    @property
+    @cached_property
     def ragflow_retry_times(self) -> int:
         return self.get_int("RAGFLOW", "retry_times", 3)
 
-    @property
+    @cached_property
     def ragflow_retry_delay(self) -> int:
         return self.get_int("RAGFLOW", "retry_delay", 1)
 
-    @property
+    @cached_property
     def ragflow_search_config(self) -> dict:
-        return {
-            "top_k": self.get_int("RAGFLOW", "search_top_k", 10),
-            "score_threshold": self.get_float("RAGFLOW", "search_score_threshold", 0.5),
-            "search_type": self.get("RAGFLOW", "search_type", "hybrid"),
-        }
+        return self._materialize("ragflow_search_config")
 
-    @property
+    @cached_property
     def ragflow_qa_config(self) -> dict:
-        return {
-            "max_tokens": self.get_int("RAGFLOW", "qa_max_tokens", 2000),
-            "temperature": self.get_float("RAGFLOW", "qa_temperature", 0.1),
-            "top_p": self.get_float("RAGFLOW", "qa_top_p", 0.9),
-        }
+        return self._materialize("ragflow_qa_config")
 
-    @property
+    @cached_property
     def ragflow_document_config(self) -> dict:
         """获取RAGFlow文档处理和元数据配置"""
-        return {
-            'chunk_size': self.config.getint('RAGFLOW', 'document_chunk_size', fallback=800),
-            'chunk_overlap': self.config.getint('RAGFLOW', 'document_chunk_overlap', fallback=100),
-            'smart_chunking': self.config.getboolean('RAGFLOW', 'document_smart_chunking', fallback=True),
-            'pdf_parser': self.config.get('RAGFLOW', 'ragflow_pdf_parser', fallback='deepdoc'),
-            'auto_metadata': self.config.getboolean('RAGFLOW', 'ragflow_auto_metadata', fallback=True),
-            'metadata_extraction': self.config.getboolean('RAGFLOW', 'ragflow_metadata_extraction', fallback=True),
-            'table_recognition': self.config.getboolean('RAGFLOW', 'ragflow_table_recognition', fallback=True),
-            'formula_recognition': self.config.getboolean('RAGFLOW', 'ragflow_formula_recognition', fallback=False),
-            'ocr_enabled': self.config.getboolean('RAGFLOW', 'ragflow_ocr_enabled', fallback=True)
-        }
+        return self._materialize("ragflow_document_config")
 
-    @property
+    @cached_property
     def ragflow_advanced_config(self) -> dict:
         """获取RAGFlow高级配置"""
-        return {
-            'max_tokens': self.config.getint('RAGFLOW', 'ragflow_max_tokens', fallback=2048),
-            'similarity_threshold': self.config.getfloat('RAGFLOW', 'ragflow_similarity_threshold', fallback=0.3),
-            'max_clusters': self.config.getint('RAGFLOW', 'ragflow_max_clusters', fallback=50),
-            'random_seed': self.config.getint('RAGFLOW', 'ragflow_random_seed', fallback=42),
-            'retrieval_mode': self.config.get('RAGFLOW', 'ragflow_retrieval_mode', fallback='general'),
-            'entity_normalization': self.config.getboolean('RAGFLOW', 'ragflow_entity_normalization', fallback=True),
-            'graph_retrieval': self.config.getboolean('RAGFLOW', 'ragflow_graph_retrieval', fallback=True)
-        }
+        return self._materialize("ragflow_advanced_config")
 
-    @property
+    @cached_property
     def ragflow_kb_config(self) -> dict:
         return {
             "name": self.get("RAGFLOW", "kb_name", "policy_demo_kb"),
             "description": self.get("RAGFLOW", "kb_description", "政策知识库 - 专项债/特许经营/数据资产"),
         }
 
-    @property
+    @cached_property
     def ragflow_kb_name(self) -> str:
         """获取RAGFlow知识库名称"""
         return self.get("RAGFLOW", "kb_name", "policy_demo_kb")
 
-    @property
+    @cached_property
     def deepseek_api_key(self) -> str:
-        return os.getenv("DEEPSEEK_API_KEY") or self.get("RAGFLOW", "deepseek_api_key", "")
+        return self._env.get("DEEPSEEK_API_KEY") or self.get("RAGFLOW", "deepseek_api_key", "")
 
     # ===== WHISPER 配置 =====
-    @property
+    @cached_property
     def whisper_host(self) -> str:
-        return os.getenv("WHISPER_HOST") or self.get("WHISPER", "host", "localhost")
+        return self._env.get("WHISPER_HOST") or self.get("WHISPER", "host", "localhost")
 
-    @property
+    @cached_property
     def whisper_port(self) -> int:
-        port = os.getenv("WHISPER_PORT") or self.get("WHISPER", "port")
+        port = self._env.get("WHISPER_PORT") or self.get("WHISPER", "port")
         return int(port) if port else 9000
 
-    @property
+    @cached_property
     def whisper_base_url(self) -> str:
         return f"http://{self.whisper_host}:{self.whisper_port}"
 
-    @property
+    @cached_property
     def whisper_timeout(self) -> int:
         return self.get_int("WHISPER", "timeout", 60)
 
-    @property
+    @cached_property
     def whisper_retry_times(self) -> int:
         return self.get_int("WHISPER", "retry_times", 3)
 
-    @property
+    @cached_property
     def whisper_retry_delay(self) -> int:
         return self.get_int("WHISPER", "retry_delay", 1)
 
-    @property
+    @cached_property
     def whisper_transcribe_config(self) -> dict:
-        return {
-            "task": self.get("WHISPER", "transcribe_task", "transcribe"),
-            "language": self.get("WHISPER", "transcribe_language", "zh"),
-            "word_timestamps": self.get_bool("WHISPER", "word_timestamps", False),
-        }
+        return self._materialize("whisper_transcribe_config")
 
-    @property
+    @cached_property
     def whisper_audio_config(self) -> dict:
-        return {
-            "sample_rate": self.get_int("WHISPER", "audio_sample_rate", 16000),
-            "channels": self.get_int("WHISPER", "audio_channels", 1),
-            "normalize": self.get_bool("WHISPER", "audio_normalize", True),
-            "remove_silence": self.get_bool("WHISPER", "audio_remove_silence", False),
-            "max_duration": self.get_int("WHISPER", "audio_max_duration", 300),
-        }
+        return self._materialize("whisper_audio_config")
 
-    @property
+    @cached_property
     def whisper_file_config(self) -> dict:
-        return {
-            "max_file_size": self.get_int("WHISPER", "audio_max_file_size", 52428800),
-            "supported_formats": self.get_list("WHISPER", "audio_supported_formats", [".wav", ".mp3", ".m4a", ".flac", ".ogg"]),
-        }
+        return self._materialize("whisper_file_config")
 
-    @property
+    @cached_property
     def whisper_model_config(self) -> dict:
-        return {
-            "model": self.get("WHISPER", "whisper_model", "base"),
-            "device": self.get("WHISPER", "whisper_device", "cpu"),
-            "compute_type": self.get("WHISPER", "whisper_compute_type", "float32"),
-        }
+        return self._materialize("whisper_model_config")
 
     # ===== DATABASE 配置 =====
-    @property
+    @cached_property
     def db_type(self) -> str:
         return self.get("DATABASE", "type", "sqlite")
 
-    @property
+    @cached_property
     def sqlite_path(self) -> Path:
         sqlite_file = self.get("DATABASE", "sqlite_path", "data/database/policy.db")
         if not Path(sqlite_file).is_absolute():
             return self.project_root / sqlite_file
         return Path(sqlite_file)
 
-    @property
-    def sqlite_config(self) -> dict:
-        return {
-            "database": str(self.sqlite_path),
-            "check_same_thread": self.get_bool("DATABASE", "sqlite_check_same_thread", False),
-            "timeout": self.get_float("DATABASE", "sqlite_timeout", 10.0),
-        }
+    @cached_property
+    def sqlite_path_str(self) -> str:
+        """数据库文件路径（字符串形式）"""
+        return str(self.sqlite_path)
 
-    @property
-    def connection_pool_config(self) -> dict:
-        return {
-            "pool_size": self.get_int("DATABASE", "pool_size", 5),
-            "max_overflow": self.get_int("DATABASE", "max_overflow", 10),
-            "pool_recycle": self.get_int("DATABASE", "pool_recycle", 3600),
-        }
+    @cached_property
+    def sqlite_config(self) -> Mapping[str, Any]:
+        """SQLite连接参数（只读，需要修改时请使用 dict(config.sqlite_config)）"""
+        return MappingProxyType({"database": self.sqlite_path_str, **self._materialize("sqlite_config")})
 
-    @property
+    @cached_property
+    def connection_pool_config(self) -> Mapping[str, Any]:
+        """连接池参数（只读，需要修改时请使用 dict(config.connection_pool_config)）"""
+        return MappingProxyType(self._materialize("connection_pool_config"))
+
+    @cached_property
     def auto_create_tables(self) -> bool:
         return self.get_bool("DATABASE", "auto_create_tables", True)
 
-    @property
+    @cached_property
     def auto_init_tags(self) -> bool:
         return self.get_bool("DATABASE", "auto_init_tags", True)
 
-    @property
+    @cached_property
     def query_timeout(self) -> int:
         return self.get_int("DATABASE", "query_timeout", 30)
 
-    @property
+    @cached_property
     def batch_size(self) -> int:
         return self.get_int("DATABASE", "batch_size", 100)
 
     # ===== GRAPH 配置 =====
-    @property
+    @cached_property
     def graphs_dir(self) -> Path:
         graph_dir = self.get("GRAPH", "graph_storage_dir", "data/graphs")
         if not Path(graph_dir).is_absolute():
             return self.project_root / graph_dir
         return Path(graph_dir)
 
-    @property
+    @cached_property
     def is_directed(self) -> bool:
         return self.get_bool("GRAPH", "is_directed", False)
 
-    @property
+    @cached_property
     def pyvis_config(self) -> dict:
+        values = self._materialize("pyvis_config")
         return {
-            "height": self.get("GRAPH", "pyvis_height", "750px"),
-            "width": self.get("GRAPH", "pyvis_width", "100%"),
-            "bgcolor": self.get("GRAPH", "pyvis_bgcolor", "#222222"),
-            "font_color": self.get("GRAPH", "pyvis_font_color", "white"),
-            "font_size": self.get_int("GRAPH", "pyvis_font_size", 14),
+            "height": values["height"],
+            "width": values["width"],
+            "bgcolor": values["bgcolor"],
+            "font_color": values["font_color"],
+            "font_size": values["font_size"],
             "physics": {
-                "enabled": self.get_bool("GRAPH", "pyvis_physics_enabled", True),
+                "enabled": values["physics_enabled"],
                 "stabilization": {
-                    "iterations": self.get_int("GRAPH", "pyvis_stabilization_iterations", 200)
+                    "iterations": values["stabilization_iterations"]
                 }
             }
         }
 
-    @property
+    @cached_property
     def graph_limits(self) -> dict:
         return {
             "max_nodes": self.get_int("GRAPH", "max_nodes", 200),
@@ -420,46 +732,47 @@ class ConfigLoader:
             "max_node_label_length": self.get_int("GRAPH", "max_node_label_length", 20),
         }
 
-    @property
-    def graph_export_formats(self) -> list:
-        return self.get_list("GRAPH", "export_formats", ["html", "json", "svg"])
+    @cached_property
+    def graph_export_formats(self) -> tuple:
+        """图谱导出格式（不可变元组）"""
+        return tuple(self.get_list("GRAPH", "export_formats", ["html", "json", "svg"]))
 
-    @property
+    @cached_property
     def graph_save_html(self) -> bool:
         return self.get_bool("GRAPH", "save_html", True)
 
     # ===== LOGGING 配置 =====
-    @property
+    @cached_property
     def logs_dir_path(self) -> Path:
         log_dir = self.get("LOGGING", "log_dir", "logs")
         if not Path(log_dir).is_absolute():
             return self.project_root / log_dir
         return Path(log_dir)
 
-    @property
+    @cached_property
     def log_level(self) -> str:
         return self.get("LOGGING", "log_level", "INFO")
 
-    @property
+    @cached_property
     def log_format(self) -> str:
         return self.get("LOGGING", "log_format", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
-    @property
+    @cached_property
     def rotating_max_bytes(self) -> int:
         return self.get_int("LOGGING", "rotating_max_bytes", 10485760)  # 10MB
 
-    @property
+    @cached_property
     def rotating_backup_count(self) -> int:
         return self.get_int("LOGGING", "rotating_backup_count", 5)
     
     # ==================== 知识库配置系统 ====================
     
-    @property
+    @cached_property
     def default_kb_name(self) -> str:
         """获取默认知识库名称"""
         return self.get("KNOWLEDGE_BASES", "default_kb", "policy_demo_kb")
     
-    @property
+    @cached_property
     def prompts_dir(self) -> Path:
         """获取提示词目录路径"""
         prompts_dir = self.get("KNOWLEDGE_BASES", "prompts_dir", "config/prompts")
@@ -472,169 +785,119 @@ class ConfigLoader:
             kb_name: 知识库名称，默认使用default_kb
             
         Returns:
-            知识库配置字典
+            知识库配置字典（每次返回新的副本，调用方可自由修改）
         """
         if kb_name is None:
             kb_name = self.default_kb_name
+
+        cached = self._kb_full_config.get(kb_name)
+        if cached is not None:
+            # 缓存的配置不含提示词（提示词文件可能被修改，按文件状态读取）
+            config, prompt_file = cached
+            return dict(config, system_prompt=self._load_prompt_file(prompt_file))
             
         kb_config = self._load_kb_config(kb_name)
         if not kb_config:
             return {}
             
         try:
-            # 构建完整配置
-            config = {}
-            
-            # 基本信息
-            config.update({
-                "kb_name": kb_config.get("KNOWLEDGE_BASE", "name", fallback=kb_name),
-                "kb_description": kb_config.get("KNOWLEDGE_BASE", "description", fallback=""),
-                "kb_language": kb_config.get("KNOWLEDGE_BASE", "language", fallback="Chinese"),
-            })
-            
-            # 文档处理配置
-            config.update({
-                "chunk_size": kb_config.getint("DOCUMENT_PROCESSING", "chunk_size", fallback=800),
-                "chunk_overlap": kb_config.getint("DOCUMENT_PROCESSING", "chunk_overlap", fallback=100),
-                "chunk_method": kb_config.get("DOCUMENT_PROCESSING", "chunk_method", fallback="naive"),
-                "pdf_parser": kb_config.get("DOCUMENT_PROCESSING", "pdf_parser", fallback="deepdoc"),
-                "auto_metadata": kb_config.getboolean("DOCUMENT_PROCESSING", "auto_metadata", fallback=True),
-                "table_recognition": kb_config.getboolean("DOCUMENT_PROCESSING", "table_recognition", fallback=True),
-                "formula_recognition": kb_config.getboolean("DOCUMENT_PROCESSING", "formula_recognition", fallback=False),
-                "ocr_enabled": kb_config.getboolean("DOCUMENT_PROCESSING", "ocr_enabled", fallback=True),
-                "layout_recognize": kb_config.get("DOCUMENT_PROCESSING", "layout_recognize", fallback="deepdoc"),
-            })
-            
-            # 检索配置
-            config.update({
-                "similarity_threshold": kb_config.getfloat("RETRIEVAL", "similarity_threshold", fallback=0.3),
-                "max_tokens": kb_config.getint("RETRIEVAL", "max_tokens", fallback=2048),
-                "graph_retrieval": kb_config.getboolean("RETRIEVAL", "graph_retrieval", fallback=True),
-                "entity_normalization": kb_config.getboolean("RETRIEVAL", "entity_normalization", fallback=True),
-                "max_clusters": kb_config.getint("RETRIEVAL", "max_clusters", fallback=50),
-            })
-            
-            # 问答配置
-            config.update({
-                "qa_max_tokens": kb_config.getint("QA", "max_tokens", fallback=2000),
-                "qa_temperature": kb_config.getfloat("QA", "temperature", fallback=0.1),
-                "qa_top_p": kb_config.getfloat("QA", "top_p", fallback=0.9),
-            })
+            # 构建完整配置（按 _KB_SCHEMA 逐段读取并转换）
+            lookup = lambda section, option: kb_config.get(section, option, raw=True, fallback=None)
+            config = {"kb_name": kb_config.get("KNOWLEDGE_BASE", "name", fallback=kb_name)}
+            for section, fields in _KB_SCHEMA:
+                config.update(_convert_fields(section, fields, lookup))
             
             # 提示词配置
             prompt_file = kb_config.get("QA", "system_prompt_file", fallback=f"{kb_name}.txt")
-            config["system_prompt"] = self._load_prompt_file(prompt_file)
             
-            return config
+            self._kb_full_config[kb_name] = (config, prompt_file)
+            return dict(config, system_prompt=self._load_prompt_file(prompt_file))
             
         except Exception as e:
-            print(f"Error: 解析知识库配置 {kb_name} 失败: {e}")
+            logger.error("解析知识库配置 %s 失败: %s", kb_name, e)
             return {}
     
     def _load_prompt_file(self, filename: str) -> str:
-        """加载提示词文件内容"""
+        """加载提示词文件内容（文件未变化时直接返回缓存内容）"""
+        default_prompt = "你是一个专业的智能助手，请基于提供的文档内容准确回答用户问题。"
+        file_path = self.prompts_dir / filename
         try:
-            file_path = self.prompts_dir / filename
-            if file_path.exists():
-                return file_path.read_text(encoding='utf-8')
-            else:
-                print(f"Warning: 提示词文件 {file_path} 不存在")
-                return "你是一个专业的智能助手，请基于提供的文档内容准确回答用户问题。"
+            st = os.stat(file_path)
+            cached = self._prompt_cache.get(filename)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                return cached[2]
+
+            content = file_path.read_text(encoding='utf-8')
+            self._prompt_cache[filename] = (st.st_mtime_ns, st.st_size, content)
+            return content
+        except FileNotFoundError:
+            logger.warning("提示词文件 %s 不存在", file_path)
+            return default_prompt
         except Exception as e:
-            print(f"Error: 读取提示词文件 {filename} 失败: {e}")
-            return "你是一个专业的智能助手，请基于提供的文档内容准确回答用户问题。"
+            logger.error("读取提示词文件 %s 失败: %s", filename, e)
+            return default_prompt
     
+    @cached_property
+    def available_kb_names(self) -> list:
+        """所有可用的知识库名称（KNOWLEDGE_BASES中除默认项和目录项外的配置键）"""
+        if not self.config.has_section("KNOWLEDGE_BASES"):
+            return []
+        return [key for key, _ in self.config.items("KNOWLEDGE_BASES")
+                if key not in _KB_EXCLUDED_KEYS
+                and not key.startswith("default") and not key.endswith("_dir")]
+
     def get_available_kb_names(self) -> list:
         """获取所有可用的知识库名称"""
-        kb_names = []
-        if self.config.has_section("KNOWLEDGE_BASES"):
-            for key, value in self.config.items("KNOWLEDGE_BASES"):
-                if key.endswith("_kb") or key not in ["default_kb", "knowledgebase_config_dir", "prompts_dir"]:
-                    if not key.startswith("default") and not key.endswith("_dir"):
-                        kb_names.append(key)
-        return kb_names
-    
-    # ==================== RAGFlow连接配置 ====================
-    
-    @property
-    def ragflow_host(self) -> str:
-        return os.getenv("RAGFLOW_HOST") or self.get("RAGFLOW", "host", "localhost")
-    
-    @property  
-    def ragflow_port(self) -> int:
-        port = os.getenv("RAGFLOW_PORT") or self.get("RAGFLOW", "port")
-        if port:
-            return int(port)
-        return 9380
-    
-    @property
-    def ragflow_base_url(self) -> str:
-        return f"http://{self.ragflow_host}:{self.ragflow_port}"
-    
-    @property
-    def ragflow_api_key(self) -> str:
-        return os.getenv("RAGFLOW_API_KEY") or self.get("RAGFLOW", "api_key", "")
-    
-    @property
-    def ragflow_timeout(self) -> int:
-        return self.get_int("RAGFLOW", "timeout", 30)
-    
-    @property
-    def ragflow_retry_times(self) -> int:
-        return self.get_int("RAGFLOW", "retry_times", 3)
-    
-    @property
-    def ragflow_retry_delay(self) -> int:
-        return self.get_int("RAGFLOW", "retry_delay", 1)
+        return list(self.available_kb_names)
     
     # ===== QWEN配置 =====
-    @property
+    @cached_property
     def qwen_api_key(self) -> str:
         """Qwen API密钥"""
         return self.get('QWEN', 'api_key', '')
     
-    @property
+    @cached_property
     def qwen_model(self) -> str:
         """Qwen模型名称"""
         return self.get('QWEN', 'model', 'qwen-plus')
     
-    @property
+    @cached_property
     def qwen_temperature(self) -> float:
         """Qwen温度参数"""
         return self.get_float('QWEN', 'temperature', 0.1)
     
-    @property
+    @cached_property
     def qwen_max_tokens(self) -> int:
         """Qwen最大token数"""
         return self.get_int('QWEN', 'max_tokens', 2000)
     
-    @property
+    @cached_property
     def entity_prompt_file(self) -> str:
         """实体提取提示词文件路径"""
         return self.get('APP', 'entity_prompt_file', 'config/prompts/entity_extraction.txt')
 
     # ===== OPENAI配置 =====
-    @property
+    @cached_property
     def openai_base_url(self) -> str:
         """OpenAI 兼容接口地址"""
         return self.get('OPENAI', 'base_url', 'https://api.openai.com/v1')
 
-    @property
+    @cached_property
     def openai_api_key(self) -> str:
         """OpenAI API密钥"""
         return self.get('OPENAI', 'api_key', '')
 
-    @property
+    @cached_property
     def openai_model(self) -> str:
         """OpenAI 模型名称"""
         return self.get('OPENAI', 'model', 'gpt-4o-mini')
 
-    @property
+    @cached_property
     def openai_temperature(self) -> float:
         """OpenAI 温度参数"""
         return self.get_float('OPENAI', 'temperature', 0.1)
 
-    @property
+    @cached_property
     def openai_max_tokens(self) -> int:
         """OpenAI 最大token数"""
         return self.get_int('OPENAI', 'max_tokens', 500)
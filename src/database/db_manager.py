@@ -26,11 +26,18 @@
     # 执行更新
     affected_rows = db.execute_update("UPDATE policies SET status = ? WHERE id = ?", ("active", 1))
 """
+import os
+import re
+import queue
+import atexit
 import sqlite3
 import logging
+import threading
+import weakref
 from pathlib import Path
-from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from contextlib import closing, contextmanager
+from functools import cache
+from typing import List, Dict, Any, FrozenSet, Set, Tuple
 
 # ===== 导入新的配置系统 =====
 # 说明：使用ConfigLoader替代旧的config.database_config
@@ -40,7 +47,7 @@ from src.config import get_config
 # 说明：从ConfigLoader读取数据库相关的配置参数
 config = get_config()
 
-DATABASE_FILE = str(config.sqlite_path)  # 数据库文件路径
+DATABASE_FILE = config.sqlite_path_str  # 数据库文件路径
 DATABASE_DIR = config.sqlite_path.parent  # 数据库目录
 SQLITE_CONFIG = config.sqlite_config  # SQLite连接配置
 AUTO_CREATE_TABLES = config.auto_create_tables  # 是否自动创建表
@@ -50,15 +57,125 @@ DB_LOG_LEVEL = config.log_level  # 数据库日志级别
 logger = logging.getLogger(__name__)
 logger.setLevel(DB_LOG_LEVEL)
 
+# 连接参数（来自[DATABASE]配置）
+_SQLITE_TIMEOUT = SQLITE_CONFIG.get("timeout", 10.0)
+_SQLITE_CHECK_SAME_THREAD = SQLITE_CONFIG.get("check_same_thread", False)
+
+# 只读连接池大小（WAL模式下多个读连接可与写连接并发）
+_READER_POOL_SIZE = os.cpu_count() or 4
+
+# 建表脚本路径（导入时计算一次）
+_SCHEMA_FILE = Path(__file__).parent / "schema.sql"
+
+# schema.sql中创建的表/索引名称
+_SCHEMA_OBJECT_RE = re.compile(r"CREATE\s+(?:TABLE|INDEX)\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+@cache
+def _load_schema() -> Tuple[str, FrozenSet[str]]:
+    """读取建表脚本及其中定义的表/索引名称（进程内只读取一次）"""
+    sql_script = _SCHEMA_FILE.read_text(encoding='utf-8')
+    return sql_script, frozenset(_SCHEMA_OBJECT_RE.findall(sql_script))
+
+# ===== 常用SQL语句 =====
+# 初始化标签的插入语句
+_SQL_INSERT_TAG = """
+    INSERT OR IGNORE INTO tags
+    (name, level, parent_id, policy_type, description, display_order)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# 当前所有表名
+_SQL_LIST_TABLES = "SELECT name FROM sqlite_master WHERE type='table'"
+# 当前所有表和索引名
+_SQL_LIST_SCHEMA_OBJECTS = "SELECT name FROM sqlite_master WHERE type IN ('table', 'index')"
+# 当前连接最后插入的行ID
+_SQL_LAST_INSERT_ID = "SELECT last_insert_rowid()"
+
+
+# 存活的数据库管理器（弱引用，不延长实例生命周期），进程退出时统一关闭其连接
+_live_managers: "weakref.WeakSet[DatabaseManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_managers():
+    """进程退出时关闭所有存活数据库管理器的连接"""
+    for manager in list(_live_managers):
+        manager.close_all()
+
+
+def _release_thread_connection(manager_ref: "weakref.ReferenceType[DatabaseManager]",
+                               conn: sqlite3.Connection):
+    """
+    关闭已结束线程的持久连接
+
+    Args:
+        manager_ref: 数据库管理器的弱引用
+        conn: 线程持有的连接
+    """
+    manager = manager_ref()
+    if manager is not None:
+        manager._close_connection(conn)
+        return
+    try:
+        conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"关闭数据库连接失败: {e}")
+
+
+class _ThreadConnection:
+    """线程持有的持久连接（线程结束、线程局部数据被回收时由finalizer关闭连接）"""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
 
 class DatabaseManager:
     """数据库管理器"""
 
+    # 进程内已确认建表完成的数据库文件
+    _schema_ready: Set[str] = set()
+
     def __init__(self):
-        """初始化数据库管理器"""
+        """初始化数据库管理器（只记录路径，建目录/建表/初始化标签延迟到首次使用连接时）"""
+        # 数据库文件路径（字符串形式直接传给 sqlite3.connect，避免每次连接时转换）
+        self._db_file_str = DATABASE_FILE
         self.db_file = Path(DATABASE_FILE)
-        self._ensure_db_dir()
-        self._init_database()
+
+        # 每个线程复用一个持久连接，线程结束时关闭，进程退出时关闭剩余连接
+        self._tls = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
+        _live_managers.add(self)
+
+        # 只读连接池（按需创建，最多 _READER_POOL_SIZE 个，池空时等待归还）
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._reader_count = 0
+        self._readers_lock = threading.Lock()
+
+        # 已知存在的表名
+        self._tables: Set[str] = set()
+
+        # 延迟初始化状态
+        self._ready = False
+        self._initializing = False
+        self._init_lock = threading.RLock()
+
+    def ensure_ready(self):
+        """确保数据库目录、表结构和初始标签已就绪（只执行一次）"""
+        if self._ready:
+            return
+        with self._init_lock:
+            # 初始化过程中本线程再次获取连接时直接返回
+            if self._ready or self._initializing:
+                return
+            self._initializing = True
+            try:
+                self._ensure_db_dir()
+                self._init_database()
+                self._ready = True
+            finally:
+                self._initializing = False
 
     def _ensure_db_dir(self):
         """确保数据库目录存在"""
@@ -67,9 +184,11 @@ class DatabaseManager:
 
     def _init_database(self):
         """初始化数据库"""
-        if not self.db_file.exists():
+        # 数据库文件由 sqlite3.connect 首次连接时自动创建，这里只用一次stat判断是否为新库
+        try:
+            os.stat(self.db_file)
+        except FileNotFoundError:
             logger.info("创建新数据库...")
-            self.db_file.touch()
 
         if AUTO_CREATE_TABLES:
             self._create_tables()
@@ -79,23 +198,27 @@ class DatabaseManager:
         logger.info(f"数据库初始化完成: {self.db_file}")
 
     def _create_tables(self):
-        """从schema.sql创建表"""
-        schema_file = Path(__file__).parent / "schema.sql"
-
-        if not schema_file.exists():
-            logger.error(f"Schema文件不存在: {schema_file}")
+        """从schema.sql创建表（schema中的表和索引均已存在时跳过）"""
+        if self._db_file_str in DatabaseManager._schema_ready:
             return
 
         try:
-            with open(schema_file, 'r', encoding='utf-8') as f:
-                sql_script = f.read()
+            sql_script, object_names = _load_schema()
+        except FileNotFoundError:
+            logger.error(f"Schema文件不存在: {_SCHEMA_FILE}")
+            return
 
-            conn = sqlite3.connect(str(self.db_file))
-            cursor = conn.cursor()
-            cursor.executescript(sql_script)
-            conn.commit()
-            conn.close()
-            logger.info("数据库表创建成功")
+        try:
+            with closing(sqlite3.connect(self._db_file_str)) as conn, conn:
+                existing = {row[0] for row in conn.execute(_SQL_LIST_SCHEMA_OBJECTS)}
+                if object_names <= existing:
+                    logger.info("数据库表已存在，跳过创建")
+                else:
+                    conn.executescript(sql_script)
+                    # 新建索引后更新统计信息，便于查询规划器选择索引
+                    conn.execute("ANALYZE")
+                    logger.info("数据库表创建成功")
+            DatabaseManager._schema_ready.add(self._db_file_str)
         except Exception as e:
             logger.error(f"创建表失败: {e}")
             raise
@@ -103,27 +226,14 @@ class DatabaseManager:
     def _init_tags(self):
         """初始化标签体系"""
         tags_data = self._get_initial_tags()
+        rows = [
+            (t['name'], t['level'], t['parent_id'], t['policy_type'], t['description'], t['display_order'])
+            for t in tags_data
+        ]
 
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                for tag_info in tags_data:
-                    cursor.execute(
-                        """
-                        INSERT OR IGNORE INTO tags
-                        (name, level, parent_id, policy_type, description, display_order)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            tag_info['name'],
-                            tag_info['level'],
-                            tag_info['parent_id'],
-                            tag_info['policy_type'],
-                            tag_info['description'],
-                            tag_info['display_order']
-                        )
-                    )
-                conn.commit()
+            with self.get_connection() as conn, self._transaction(conn):
+                conn.executemany(_SQL_INSERT_TAG, rows)
             logger.info("标签体系初始化成功")
         except Exception as e:
             logger.error(f"初始化标签体系失败: {e}")
@@ -154,15 +264,126 @@ class DatabaseManager:
             {'name': '价值管理', 'level': 2, 'parent_id': 11, 'policy_type': 'data_assets', 'description': '价值管理', 'display_order': 4},
         ]
 
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        创建新连接并设置WAL等连接级参数
+
+        Args:
+            read_only: 是否为只读连接（PRAGMA query_only）
+        """
+        # 只读连接在线程间借还，必须允许跨线程使用
+        check_same_thread = False if read_only else _SQLITE_CHECK_SAME_THREAD
+        conn = sqlite3.connect(self._db_file_str, check_same_thread=check_same_thread,
+                               timeout=_SQLITE_TIMEOUT, isolation_level=None, cached_statements=128)
+        conn.row_factory = sqlite3.Row  # 返回类似字典的行
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        if read_only:
+            conn.execute("PRAGMA query_only=1")
+        with self._connections_lock:
+            self._connections.add(conn)
+        return conn
+
+    def _close_connection(self, conn: sqlite3.Connection):
+        """关闭连接并从连接集合中移除"""
+        with self._connections_lock:
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"关闭数据库连接失败: {e}")
+
     @contextmanager
     def get_connection(self):
-        """获取数据库连接上下文管理器"""
-        conn = sqlite3.connect(str(self.db_file), check_same_thread=False, timeout=10.0)
-        conn.row_factory = sqlite3.Row  # 返回类似字典的行
+        """
+        获取当前线程的持久数据库连接（自动提交模式，退出上下文时不关闭）
+
+        Streamlit每次rerun都在新线程中执行，连接随线程局部数据回收而关闭，不会累积。
+        """
+        if not self._ready:
+            self.ensure_ready()
+        holder = getattr(self._tls, "holder", None)
+        if holder is None:
+            conn = self._connect()
+            holder = _ThreadConnection(conn)
+            # finalizer只弱引用管理器，避免线程连接反过来让管理器常驻
+            weakref.finalize(holder, _release_thread_connection, weakref.ref(self), conn)
+            self._tls.holder = holder
+        yield holder.conn
+
+    @contextmanager
+    def get_reader_connection(self):
+        """
+        从只读连接池借用一个连接，退出上下文时归还
+
+        池中连接均已借出且数量已达上限时最多等待 _SQLITE_TIMEOUT 秒，超时抛出
+        sqlite3.OperationalError。借出期间连接池被 close_all 重置时，连接不再归还。
+        """
+        if not self._ready:
+            self.ensure_ready()
+        with self._readers_lock:
+            pool = self._readers
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            with self._readers_lock:
+                can_create = pool is self._readers and self._reader_count < _READER_POOL_SIZE
+                if can_create:
+                    self._reader_count += 1
+            if can_create:
+                try:
+                    conn = self._connect(read_only=True)
+                except BaseException:
+                    with self._readers_lock:
+                        if pool is self._readers:
+                            self._reader_count -= 1
+                    raise
+            else:
+                try:
+                    conn = pool.get(timeout=_SQLITE_TIMEOUT)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"等待只读数据库连接超时（{_SQLITE_TIMEOUT}秒）") from None
         try:
             yield conn
         finally:
-            conn.close()
+            # 只归还到借出时的连接池；连接池已被重置时连接已由close_all关闭
+            with self._readers_lock:
+                if pool is self._readers:
+                    pool.put(conn)
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection):
+        """
+        在自动提交模式的连接上显式开启写事务（BEGIN IMMEDIATE），批量写入只提交一次
+
+        Args:
+            conn: 数据库连接
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close_all(self):
+        """关闭所有线程的持久连接"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"关闭数据库连接失败: {e}")
+        self._tls = threading.local()
+        with self._readers_lock:
+            self._readers = queue.Queue()
+            self._reader_count = 0
 
     def execute_query(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
         """执行查询"""
@@ -175,6 +396,15 @@ class DatabaseManager:
             logger.error(f"查询执行失败: {e}")
             raise
 
+    def execute_query_ro(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """在只读连接池上执行查询（可与写操作并发）"""
+        try:
+            with self.get_reader_connection() as conn:
+                return conn.execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"查询执行失败: {e}")
+            raise
+
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """执行更新（INSERT/UPDATE/DELETE）"""
         try:
@@ -182,50 +412,80 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 conn.commit()
+                if query.lstrip()[:4].upper() == "DROP":
+                    # 表结构变化，清空已知表名缓存
+                    self._tables = set()
                 return cursor.rowcount
         except Exception as e:
             logger.error(f"更新执行失败: {e}")
             raise
 
-    def execute_many(self, query: str, params_list: List[tuple]) -> int:
-        """批量执行更新"""
+    def execute_insert(self, query: str, params: tuple = ()) -> int:
+        """执行INSERT并返回新行ID（取自同一游标的lastrowid）"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.executemany(query, params_list)
+                cursor.execute(query, params)
                 conn.commit()
+                return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"插入执行失败: {e}")
+            raise
+
+    def execute_many(self, query: str, params_list: List[tuple]) -> int:
+        """批量执行更新"""
+        try:
+            with self.get_connection() as conn, self._transaction(conn):
+                cursor = conn.executemany(query, params_list)
                 return cursor.rowcount
         except Exception as e:
             logger.error(f"批量更新执行失败: {e}")
             raise
 
-    def get_last_insert_id(self) -> int:
-        """获取最后插入的ID"""
+    def execute_scalar(self, query: str, params: tuple = ()) -> Any:
+        """执行查询并返回第一行第一列的值（无结果时返回None）"""
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT last_insert_rowid()")
-                return cursor.fetchone()[0]
+                row = conn.execute(query, params).fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logger.error(f"标量查询执行失败: {e}")
+            raise
+
+    def get_last_insert_id(self) -> int:
+        """获取当前线程连接上最后插入的ID（已不推荐使用，请使用 execute_insert 的返回值）"""
+        try:
+            return self.execute_scalar(_SQL_LAST_INSERT_ID)
         except Exception as e:
             logger.error(f"获取最后插入ID失败: {e}")
             raise
 
+    def _load_tables(self) -> Set[str]:
+        """从sqlite_master读取当前所有表名"""
+        rows = self.execute_query(_SQL_LIST_TABLES)
+        self._tables = {row[0] for row in rows}
+        return self._tables
+
     def table_exists(self, table_name: str) -> bool:
-        """检查表是否存在"""
+        """检查表是否存在（已知存在的表直接命中缓存，未命中时重新读取表名）"""
+        if table_name in self._tables:
+            return True
         try:
-            query = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
-            result = self.execute_query(query, (table_name,))
-            return len(result) > 0
+            return table_name in self._load_tables()
         except Exception as e:
             logger.error(f"检查表存在性失败: {e}")
             return False
 
+    def _check_table(self, table_name: str):
+        """校验表名为数据库中已存在的表，防止拼接SQL时注入"""
+        if not self.table_exists(table_name):
+            raise ValueError(f"未知的表: {table_name}")
+
     def get_table_count(self, table_name: str) -> int:
         """获取表中的记录数"""
         try:
-            query = f"SELECT COUNT(*) FROM {table_name}"
-            result = self.execute_query(query)
-            return result[0][0] if result else 0
+            self._check_table(table_name)
+            return self.execute_scalar(f"SELECT COUNT(*) FROM {table_name}") or 0
         except Exception as e:
             logger.error(f"获取表记录数失败: {e}")
             return 0
@@ -233,8 +493,8 @@ class DatabaseManager:
     def delete_all(self, table_name: str) -> int:
         """删除表中所有记录"""
         try:
-            query = f"DELETE FROM {table_name}"
-            return self.execute_update(query)
+            self._check_table(table_name)
+            return self.execute_update(f"DELETE FROM {table_name}")
         except Exception as e:
             logger.error(f"删除表记录失败: {e}")
             raise
@@ -243,10 +503,13 @@ class DatabaseManager:
         """备份数据库"""
         try:
             backup_file = self.db_file.parent / f"{self.db_file.stem}_backup.db"
-            with self.get_connection() as conn:
-                backup_conn = sqlite3.connect(str(backup_file))
-                conn.backup(backup_conn)
-                backup_conn.close()
+            with self.get_connection() as conn, \
+                    closing(sqlite3.connect(str(backup_file), isolation_level=None)) as backup_conn:
+                # 备份文件是一次性完整写入，无需回滚日志和同步刷盘
+                backup_conn.execute("PRAGMA journal_mode=OFF")
+                backup_conn.execute("PRAGMA synchronous=OFF")
+                # 分批复制页面，期间释放源库的读锁，减少对其他连接的阻塞
+                conn.backup(backup_conn, pages=64, progress=_log_backup_progress)
             logger.info(f"数据库备份成功: {backup_file}")
             return True
         except Exception as e:
@@ -254,13 +517,12 @@ class DatabaseManager:
             return False
 
 
-# 全局数据库管理器实例
-_db_manager: Optional[DatabaseManager] = None
+def _log_backup_progress(status: int, remaining: int, total: int):
+    """备份进度回调"""
+    logger.debug(f"数据库备份进度: {total - remaining}/{total} 页")
 
 
+@cache
 def get_db_manager() -> DatabaseManager:
-    """获取全局数据库管理器实例"""
-    global _db_manager
-    if _db_manager is None:
-        _db_manager = DatabaseManager()
-    return _db_manager
+    """获取全局数据库管理器实例（首次调用时创建，之后直接返回同一实例）"""
+    return DatabaseManager()
@@ -3,14 +3,166 @@
 提供图谱在SQLite中的存储和查询功能
 """
 import json
+import re
 import sqlite3
 import logging
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# orjson为可选依赖，序列化大图谱时比标准库json快数倍
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson未安装，图谱序列化使用标准库json")
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """将图谱数据序列化为JSON字符串（保留非ASCII字符）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _loads(text) -> Dict[str, Any]:
+    """将JSON字符串反序列化为图谱数据"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+# 等待其他连接释放写锁的最长时间（秒）
+_BUSY_TIMEOUT = 30
+
+# 每个连接需要设置的PRAGMA（journal_mode=WAL在数据库文件上持久生效，只需在建表时设置一次）
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-65536;"
+    "PRAGMA mmap_size=268435456;"
+    f"PRAGMA busy_timeout={_BUSY_TIMEOUT * 1000};"
+)
+
+# SQLite 3.45+ 支持JSONB：以预解析的二进制格式存储图谱，读取时用json()还原为文本
+JSONB_AVAILABLE = sqlite3.sqlite_version_info >= (3, 45, 0)
+# 写入/读取graph_data列时使用的SQL表达式
+_GRAPH_DATA_IN = "jsonb(?)" if JSONB_AVAILABLE else "?"
+_GRAPH_DATA_OUT = "json(graph_data)" if JSONB_AVAILABLE else "graph_data"
+
+# SQLite 3.25+ 支持窗口函数，增量合并可直接在SQL中完成
+SQL_MERGE_AVAILABLE = sqlite3.sqlite_version_info >= (3, 25, 0)
+# 增量合并：最新图谱与新图谱按节点id、边(from, to)去重，新数据覆盖旧数据，保持首次出现的顺序
+_SQL_MERGE_GRAPHS = """
+WITH latest AS (
+    SELECT graph_data AS g FROM knowledge_graph ORDER BY id DESC LIMIT 1
+),
+nodes AS (
+    SELECT e.value AS v, json_extract(e.value, '$.id') AS k, 0 AS src, e.key AS pos
+    FROM latest, json_each(latest.g, '$.nodes') AS e
+    UNION ALL
+    SELECT value, json_extract(value, '$.id'), 1, key FROM json_each(?1, '$.nodes')
+),
+ranked_nodes AS (
+    SELECT v,
+           ROW_NUMBER() OVER (PARTITION BY k ORDER BY src DESC, pos DESC) AS rn,
+           MIN(src * 4294967296 + pos) OVER (PARTITION BY k) AS ord
+    FROM nodes
+),
+edges AS (
+    SELECT e.value AS v, json_extract(e.value, '$.from') AS f, json_extract(e.value, '$.to') AS t,
+           0 AS src, e.key AS pos
+    FROM latest, json_each(latest.g, '$.edges') AS e
+    UNION ALL
+    SELECT value, json_extract(value, '$.from'), json_extract(value, '$.to'), 1, key
+    FROM json_each(?1, '$.edges')
+),
+ranked_edges AS (
+    SELECT v,
+           ROW_NUMBER() OVER (PARTITION BY f, t ORDER BY src DESC, pos DESC) AS rn,
+           MIN(src * 4294967296 + pos) OVER (PARTITION BY f, t) AS ord
+    FROM edges
+),
+merged_nodes AS (
+    SELECT json_group_array(json(v)) AS arr, COUNT(*) AS n
+    FROM (SELECT v FROM ranked_nodes WHERE rn = 1 ORDER BY ord)
+),
+merged_edges AS (
+    SELECT json_group_array(json(v)) AS arr, COUNT(*) AS n
+    FROM (SELECT v FROM ranked_edges WHERE rn = 1 ORDER BY ord)
+)
+SELECT json_object('nodes', json(merged_nodes.arr), 'edges', json(merged_edges.arr)),
+       merged_nodes.n, merged_edges.n
+FROM merged_nodes, merged_edges
+WHERE EXISTS (SELECT 1 FROM latest)
+"""
+
+# 节点去重：按去除文件后缀的label保留首个节点，边映射到保留节点后按(from, to, type)去重
+_SQL_DEDUP_GRAPH = """
+WITH g AS (
+    SELECT graph_data AS data FROM knowledge_graph WHERE id = ?1
+),
+nodes AS (
+    SELECT e.key AS pos, e.value AS v, json_extract(e.value, '$.id') AS node_id,
+           trim(replace(replace(coalesce(json_extract(e.value, '$.label'), ''), '.pdf', ''), '.docx', ''),
+                char(32, 9, 10, 11, 12, 13, 12288)) AS norm
+    FROM g, json_each(g.data, '$.nodes') AS e
+),
+ranked_nodes AS (
+    SELECT pos, v, node_id, norm,
+           ROW_NUMBER() OVER (PARTITION BY norm ORDER BY pos) AS rn,
+           FIRST_VALUE(node_id) OVER (PARTITION BY norm ORDER BY pos) AS kept_id
+    FROM nodes
+),
+id_map AS (
+    SELECT old_id, kept_id FROM (
+        SELECT node_id AS old_id, kept_id,
+               ROW_NUMBER() OVER (PARTITION BY node_id ORDER BY pos DESC) AS rn
+        FROM ranked_nodes
+    )
+    WHERE rn = 1
+),
+edges AS (
+    SELECT e.key AS pos, e.value AS v, f.kept_id AS from_id, t.kept_id AS to_id,
+           coalesce(json_extract(e.value, '$.type'), '') AS edge_type
+    FROM g, json_each(g.data, '$.edges') AS e
+    JOIN id_map AS f ON f.old_id = json_extract(e.value, '$.from')
+    JOIN id_map AS t ON t.old_id = json_extract(e.value, '$.to')
+    WHERE f.kept_id IS NOT NULL AND f.kept_id NOT IN ('', 0)
+      AND t.kept_id IS NOT NULL AND t.kept_id NOT IN ('', 0)
+),
+ranked_edges AS (
+    SELECT pos, v, from_id, to_id,
+           ROW_NUMBER() OVER (PARTITION BY from_id, to_id, edge_type ORDER BY pos) AS rn
+    FROM edges
+)
+SELECT json_set(
+           g.data,
+           '$.nodes', json((
+               SELECT json_group_array(json_set(
+                   v, '$.label', norm,
+                   '$.title', replace(replace(coalesce(json_extract(v, '$.title'), ''), '.pdf', ''), '.docx', '')))
+               FROM (SELECT v, norm FROM ranked_nodes WHERE rn = 1 ORDER BY pos)
+           )),
+           '$.edges', json((
+               SELECT json_group_array(json_set(v, '$.from', from_id, '$.to', to_id))
+               FROM (SELECT v, from_id, to_id FROM ranked_edges WHERE rn = 1 ORDER BY pos)
+           ))
+       ),
+       (SELECT COUNT(*) FROM ranked_nodes WHERE rn = 1),
+       (SELECT COUNT(*) FROM ranked_edges WHERE rn = 1),
+       json_array_length(g.data, '$.nodes'),
+       json_array_length(g.data, '$.edges')
+FROM g
+"""
+
+# 更新时间（本地时间，由SQLite生成，无需在Python中构造datetime）
+_SQL_NOW = "datetime('now', 'localtime')"
+
+# 节点label/title中需要去除的文件后缀
+_SUFFIX_RE = re.compile(r'\.(?:pdf|docx)')
+
 
 class GraphDAO:
     """知识图谱数据访问类"""
@@ -24,23 +176,44 @@ class GraphDAO:
         self.db_path = db_path
         self._init_table()
     
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接并应用连接级PRAGMA
+        
+        Returns:
+            数据库连接
+        """
+        # 自动提交模式，由各方法显式 BEGIN IMMEDIATE / COMMIT 控制事务
+        conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+    
     def _init_table(self):
         """创建知识图谱表"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
+            # 启用WAL模式，读操作不再被写操作阻塞
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             cursor.execute("""
             CREATE TABLE IF NOT EXISTS knowledge_graph (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                graph_data TEXT NOT NULL,
+                graph_data BLOB NOT NULL,
                 node_count INTEGER DEFAULT 0,
                 edge_count INTEGER DEFAULT 0,
+                deduplicated INTEGER NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
             """)
             
+            # 兼容旧表：补充去重标记列（图谱写入后清零，去重完成后置1）
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(knowledge_graph)")}
+            if 'deduplicated' not in columns:
+                cursor.execute(
+                    "ALTER TABLE knowledge_graph ADD COLUMN deduplicated INTEGER NOT NULL DEFAULT 0")
+            
             conn.commit()
             conn.close()
             logger.info("知识图谱表初始化成功")
@@ -59,41 +232,79 @@ class GraphDAO:
             图谱ID
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = self._connect()
+            try:
+                # 读取、合并、写入在同一连接的同一写事务内完成
+                conn.execute("BEGIN IMMEDIATE")
+                graph_id, node_count, edge_count = self._save_graph_conn(conn, graph_data, is_incremental)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
             
-            if is_incremental:
-                # 增量更新：合并现有图谱
-                existing = self.load_graph()
+            logger.info(f"图谱保存成功: {node_count}个节点, {edge_count}条边 (增量={is_incremental})")
+            return graph_id
+            
+        except Exception as e:
+            logger.error(f"图谱保存失败: {e}")
+            raise
+    
+    def _save_graph_conn(self, conn: sqlite3.Connection, graph_data: Dict[str, Any],
+                         is_incremental: bool) -> Tuple[int, int, int]:
+        """在已打开的连接上保存图谱（由调用方负责事务）
+        
+        Args:
+            conn: 数据库连接
+            graph_data: 图谱数据
+            is_incremental: 是否增量更新
+            
+        Returns:
+            (图谱ID, 节点数, 边数)
+        """
+        latest_id = None
+        merged = None
+        if is_incremental:
+            # 增量更新：合并现有图谱
+            if SQL_MERGE_AVAILABLE:
+                merged = self._merge_graphs_sql(conn, _dumps(graph_data))
+            else:
+                existing = self._load_graph_conn(conn)
                 if existing:
                     graph_data = self._merge_graphs(existing, graph_data)
-            else:
-                # 全量更新：删除旧数据
-                cursor.execute("DELETE FROM knowledge_graph")
-            
+        else:
+            row = conn.execute(
+                "SELECT id FROM knowledge_graph ORDER BY id DESC LIMIT 1").fetchone()
+            latest_id = row[0] if row else None
+        
+        if merged:
+            graph_json, node_count, edge_count = merged
+        else:
             # 统计节点和边
             node_count = len(graph_data.get('nodes', []))
             edge_count = len(graph_data.get('edges', []))
             
             # 转换为JSON
-            graph_json = json.dumps(graph_data, ensure_ascii=False)
-            
+            graph_json = _dumps(graph_data)
+        
+        if latest_id is None:
             # 插入新数据
-            cursor.execute("""
+            cursor = conn.execute(f"""
             INSERT INTO knowledge_graph (graph_data, node_count, edge_count, updated_at)
-            VALUES (?, ?, ?, ?)
-            """, (graph_json, node_count, edge_count, datetime.now()))
-            
-            graph_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"图谱保存成功: {node_count}个节点, {edge_count}条边 (增量={is_incremental})")
-            return graph_id
-            
-        except Exception as e:
-            logger.error(f"图谱保存失败: {e}")
-            raise
+            VALUES ({_GRAPH_DATA_IN}, ?, ?, {_SQL_NOW})
+            """, (graph_json, node_count, edge_count))
+            return cursor.lastrowid, node_count, edge_count
+        
+        # 全量更新：原地覆盖最新记录并删除其余历史记录，避免整表删除再插入
+        conn.execute(f"""
+        UPDATE knowledge_graph
+        SET graph_data = {_GRAPH_DATA_IN}, node_count = ?, edge_count = ?, deduplicated = 0,
+            created_at = CURRENT_TIMESTAMP, updated_at = {_SQL_NOW}
+        WHERE id = ?
+        """, (graph_json, node_count, edge_count, latest_id))
+        conn.execute("DELETE FROM knowledge_graph WHERE id != ?", (latest_id,))
+        return latest_id, node_count, edge_count
     
     def load_graph(self) -> Optional[Dict[str, Any]]:
         """从数据库加载最新的图谱
@@ -102,19 +313,13 @@ class GraphDAO:
             图谱数据字典，如果不存在返回None
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-            SELECT graph_data FROM knowledge_graph 
-            ORDER BY updated_at DESC LIMIT 1
-            """)
-            
-            result = cursor.fetchone()
-            conn.close()
+            conn = self._connect()
+            try:
+                graph_data = self._load_graph_conn(conn)
+            finally:
+                conn.close()
             
-            if result:
-                graph_data = json.loads(result[0])
+            if graph_data is not None:
                 logger.debug(f"图谱加载成功: {len(graph_data.get('nodes', []))}个节点")
                 return graph_data
             
@@ -125,6 +330,22 @@ class GraphDAO:
             logger.error(f"图谱加载失败: {e}")
             return None
     
+    @staticmethod
+    def _load_graph_conn(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        """在已打开的连接上读取最新的图谱
+        
+        Args:
+            conn: 数据库连接
+            
+        Returns:
+            图谱数据字典，如果不存在返回None
+        """
+        result = conn.execute(f"""
+        SELECT {_GRAPH_DATA_OUT} FROM knowledge_graph 
+        ORDER BY id DESC LIMIT 1
+        """).fetchone()
+        return _loads(result[0]) if result else None
+    
     def remove_duplicate_nodes(self) -> Dict[str, int]:
         """
         清理图谱中重复的节点（基于label）
@@ -133,94 +354,139 @@ class GraphDAO:
             清理结果：{'removed_nodes': 数量, 'removed_edges': 数量}
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 获取最新图谱
-            cursor.execute("""
-            SELECT id, graph_data FROM knowledge_graph 
-            ORDER BY updated_at DESC LIMIT 1
-            """)
-            
-            result = cursor.fetchone()
-            if not result:
+            conn = self._connect()
+            try:
+                # 读取后写入：事务开始时即获取写锁，避免并发写入时升级锁失败
+                conn.execute("BEGIN IMMEDIATE")
+                result = self._remove_duplicate_nodes_conn(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
                 conn.close()
-                return {'removed_nodes': 0, 'removed_edges': 0}
-            
-            graph_id, graph_json = result
-            graph_data = json.loads(graph_json)
+            return result
             
-            # 去重节点（保留第一个出现的）
-            seen_labels = {}
-            old_to_new_id = {}  # 旧ID到新ID的映射
-            unique_nodes = []
-            
-            for node in graph_data.get('nodes', []):
-                label = node.get('label', '')
-                node_id = node.get('id')
-                
-                # 规范化label（去除文件后缀）
-                normalized_label = label.replace('.pdf', '').replace('.docx', '').strip()
-                
-                if normalized_label not in seen_labels:
-                    # 第一次见到这个label，保留（并更新label去掉后缀）
-                    node['label'] = normalized_label
-                    node['title'] = node.get('title', '').replace('.pdf', '').replace('.docx', '')
-                    seen_labels[normalized_label] = node_id
-                    old_to_new_id[node_id] = node_id
-                    unique_nodes.append(node)
-                else:
-                    # 重复节点，记录ID映射
-                    old_to_new_id[node_id] = seen_labels[normalized_label]
+        except Exception as e:
+            logger.error(f"清理重复节点失败: {e}")
+            return {'removed_nodes': 0, 'removed_edges': 0, 'error': str(e)}
+    
+    def _remove_duplicate_nodes_conn(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """在已打开的连接上清理重复节点（由调用方负责事务）
+        
+        Args:
+            conn: 数据库连接
             
-            # 更新边，使用新的节点ID映射
-            unique_edges = []
-            valid_node_ids = set(seen_labels.values())
+        Returns:
+            清理结果：{'removed_nodes': 数量, 'removed_edges': 数量}
+        """
+        cursor = conn.cursor()
+        
+        # 获取最新图谱；自上次去重后未写入过的图谱无需再解析
+        cursor.execute("""
+        SELECT id, deduplicated FROM knowledge_graph 
+        ORDER BY id DESC LIMIT 1
+        """)
+        
+        result = cursor.fetchone()
+        if not result or result[1]:
+            return {'removed_nodes': 0, 'removed_edges': 0}
+        
+        graph_id = result[0]
+        if SQL_MERGE_AVAILABLE:
+            # 在SQLite中完成去重，Python只接触最终的JSON文本
+            graph_json, node_count, edge_count, total_nodes, total_edges = cursor.execute(
+                _SQL_DEDUP_GRAPH, (graph_id,)).fetchone()
+        else:
+            graph_json = cursor.execute(
+                f"SELECT {_GRAPH_DATA_OUT} FROM knowledge_graph WHERE id = ?", (graph_id,)).fetchone()[0]
+            graph_json, node_count, edge_count, total_nodes, total_edges = \
+                self._deduplicate_graph(_loads(graph_json))
+        
+        removed_nodes = total_nodes - node_count
+        removed_edges = total_edges - edge_count
+        
+        if removed_nodes > 0 or removed_edges > 0:
+            # 更新数据库
+            cursor.execute(f"""
+            UPDATE knowledge_graph 
+            SET graph_data = {_GRAPH_DATA_IN}, node_count = ?, edge_count = ?, deduplicated = 1,
+                updated_at = {_SQL_NOW}
+            WHERE id = ?
+            """, (graph_json, node_count, edge_count, graph_id))
+            logger.info(f"清理完成: 删除{removed_nodes}个重复节点, {removed_edges}条无效边")
+        else:
+            cursor.execute("UPDATE knowledge_graph SET deduplicated = 1 WHERE id = ?", (graph_id,))
+        
+        return {'removed_nodes': removed_nodes, 'removed_edges': removed_edges}
+    
+    @staticmethod
+    def _deduplicate_graph(graph_data: Dict[str, Any]) -> Tuple[str, int, int, int, int]:
+        """在Python中对图谱去重（SQLite不支持窗口函数时使用）
+        
+        Args:
+            graph_data: 图谱数据
             
-            for edge in graph_data.get('edges', []):
-                from_id = old_to_new_id.get(edge.get('from'))
-                to_id = old_to_new_id.get(edge.get('to'))
-                
-                # 只保留有效的边
-                if from_id and to_id and from_id in valid_node_ids and to_id in valid_node_ids:
+        Returns:
+            (去重后的图谱JSON, 保留节点数, 保留边数, 原节点数, 原边数)
+        """
+        # 去重节点（保留第一个出现的）
+        label_to_id = {}  # 规范化label到保留节点ID的映射
+        old_to_new_id = {}  # 旧ID到新ID的映射
+        unique_nodes = []
+        
+        # 循环内频繁调用的方法提前绑定到局部变量
+        strip_suffix = _SUFFIX_RE.sub
+        get_kept_id = label_to_id.get
+        append_node = unique_nodes.append
+        
+        for node in graph_data.get('nodes', []):
+            node_id = node.get('id')
+            
+            # 规范化label（去除文件后缀）
+            normalized_label = strip_suffix('', node.get('label', '')).strip()
+            
+            kept_id = get_kept_id(normalized_label)
+            if kept_id is None:
+                # 第一次见到这个label，保留（并更新label去掉后缀）
+                node['label'] = normalized_label
+                node['title'] = strip_suffix('', node.get('title', ''))
+                label_to_id[normalized_label] = node_id
+                old_to_new_id[node_id] = node_id
+                append_node(node)
+            else:
+                # 重复节点，记录ID映射
+                old_to_new_id[node_id] = kept_id
+        
+        # 更新边，使用新的节点ID映射
+        unique_edges = []
+        kept_ids = frozenset(label_to_id.values())
+        seen_edges = set()
+        
+        get_new_id = old_to_new_id.get
+        mark_seen = seen_edges.add
+        append_edge = unique_edges.append
+        
+        for edge in graph_data.get('edges', []):
+            from_id = get_new_id(edge.get('from'))
+            to_id = get_new_id(edge.get('to'))
+            
+            # 只保留有效的边
+            if from_id and to_id and from_id in kept_ids and to_id in kept_ids:
+                # 避免重复边
+                edge_key = (from_id, to_id, edge.get('type', ''))
+                if edge_key not in seen_edges:
+                    mark_seen(edge_key)
                     # 更新边的节点ID
                     edge['from'] = from_id
                     edge['to'] = to_id
-                    
-                    # 避免重复边
-                    edge_key = f"{from_id}->{to_id}-{edge.get('type', '')}"
-                    if edge_key not in seen_labels:
-                        seen_labels[edge_key] = True
-                        unique_edges.append(edge)
-            
-            removed_nodes = len(graph_data['nodes']) - len(unique_nodes)
-            removed_edges = len(graph_data['edges']) - len(unique_edges)
-            
-            if removed_nodes > 0 or removed_edges > 0:
-                # 更新数据库
-                graph_data['nodes'] = unique_nodes
-                graph_data['edges'] = unique_edges
-                
-                cursor.execute("""
-                UPDATE knowledge_graph 
-                SET graph_data = ?, node_count = ?, edge_count = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """, (
-                    json.dumps(graph_data, ensure_ascii=False),
-                    len(unique_nodes),
-                    len(unique_edges),
-                    graph_id
-                ))
-                
-                conn.commit()
-                logger.info(f"清理完成: 删除{removed_nodes}个重复节点, {removed_edges}条无效边")
-            
-            conn.close()
-            return {'removed_nodes': removed_nodes, 'removed_edges': removed_edges}
-            
-        except Exception as e:
-            logger.error(f"清理重复节点失败: {e}")
-            return {'removed_nodes': 0, 'removed_edges': 0, 'error': str(e)}
+                    append_edge(edge)
+        
+        total_nodes = len(graph_data['nodes'])
+        total_edges = len(graph_data['edges'])
+        graph_data['nodes'] = unique_nodes
+        graph_data['edges'] = unique_edges
+        return _dumps(graph_data), len(unique_nodes), len(unique_edges), total_nodes, total_edges
     
     def get_stats(self) -> Dict[str, Any]:
         """获取图谱统计信息
@@ -229,13 +495,13 @@ class GraphDAO:
             统计信息字典
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute("""
             SELECT node_count, edge_count, updated_at, created_at
             FROM knowledge_graph 
-            ORDER BY updated_at DESC LIMIT 1
+            ORDER BY id DESC LIMIT 1
             """)
             
             result = cursor.fetchone()
@@ -260,7 +526,24 @@ class GraphDAO:
             logger.error(f"获取图谱统计失败: {e}")
             return {}
     
-    def _merge_graphs(self, existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _merge_graphs_sql(conn: sqlite3.Connection, new_json: str) -> Optional[Tuple[str, int, int]]:
+        """在SQLite中将新图谱合并到最新图谱（不在Python中解析现有图谱）
+        
+        Args:
+            conn: 数据库连接
+            new_json: 新图谱JSON
+            
+        Returns:
+            (合并后的图谱JSON, 节点数, 边数)，没有现有图谱时返回None
+        """
+        row = conn.execute(_SQL_MERGE_GRAPHS, (new_json,)).fetchone()
+        if row:
+            logger.info(f"图谱合并完成: {row[1]}个节点, {row[2]}条边")
+        return row
+    
+    @staticmethod
+    def _merge_graphs(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
         """合并两个图谱（增量更新时使用）
         
         Args:
@@ -270,19 +553,17 @@ class GraphDAO:
         Returns:
             合并后的图谱
         """
-        # 合并节点（基于id去重）
-        existing_nodes = {node['id']: node for node in existing.get('nodes', [])}
-        new_nodes = {node['id']: node for node in new.get('nodes', [])}
-        existing_nodes.update(new_nodes)
+        # 合并节点（基于id去重，新数据覆盖旧数据）
+        merged_nodes = {node['id']: node for node in existing.get('nodes', ())}
+        merged_nodes |= {node['id']: node for node in new.get('nodes', ())}
         
-        # 合并边（基于 from-to 去重）
-        existing_edges = {(edge['from'], edge['to']): edge for edge in existing.get('edges', [])}
-        new_edges = {(edge['from'], edge['to']): edge for edge in new.get('edges', [])}
-        existing_edges.update(new_edges)
+        # 合并边（基于 from-to 去重，与_SQL_MERGE_GRAPHS保持一致）
+        merged_edges = {(edge['from'], edge['to']): edge for edge in existing.get('edges', ())}
+        merged_edges |= {(edge['from'], edge['to']): edge for edge in new.get('edges', ())}
         
         merged = {
-            'nodes': list(existing_nodes.values()),
-            'edges': list(existing_edges.values())
+            'nodes': list(merged_nodes.values()),
+            'edges': list(merged_edges.values())
         }
         
         logger.info(f"图谱合并完成: {len(merged['nodes'])}个节点, {len(merged['edges'])}条边")
@@ -291,7 +572,7 @@ class GraphDAO:
     def clear_graph(self):
         """清空所有图谱数据"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             cursor.execute("DELETE FROM knowledge_graph")
             conn.commit()
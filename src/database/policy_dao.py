@@ -7,12 +7,12 @@
 - PolicyDAO：政策数据访问对象
 
 核心方法：
-- 政策操作：create_policy, get_policy_by_id, get_policies, update_policy, delete_policy
+- 政策操作：create_policy, get_policy_by_id, get_policies, get_policies_json, update_policy, delete_policy
 - RAGFlow集成：get_policy_by_ragflow_id, update_policy
-- 标签操作：add_policy_tag, get_policy_tags, get_or_create_tag
-- 关系操作：add_policy_relation, get_policy_relations
-- 日志操作：log_processing, get_processing_logs
-- 统计操作：get_stats, count_policies
+- 标签操作：add_policy_tag, add_policy_tags_bulk, get_policy_tags, get_or_create_tag
+- 关系操作：add_policy_relation, add_policy_relations_bulk, get_policy_relations
+- 日志操作：log_processing, log_processing_bulk, get_processing_logs
+- 统计操作：get_stats, get_stats_json, count_policies
 
 使用示例：
     from src.database.policy_dao import get_policy_dao
@@ -36,22 +36,136 @@
     # 获取统计
     stats = dao.get_stats()
 """
+import json
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Tuple
 from datetime import datetime, date
 
 from src.database.db_manager import get_db_manager
 
 logger = logging.getLogger(__name__)
 
+# 政策统计（总数、按类型、按状态），由SQLite直接生成JSON
+_SQL_STATS_JSON = """
+SELECT json_object(
+    'total', (SELECT COUNT(*) FROM policies),
+    'by_type', (SELECT json_group_object(coalesce(policy_type, 'null'), c)
+                FROM (SELECT policy_type, COUNT(*) AS c FROM policies GROUP BY policy_type)),
+    'by_status', (SELECT json_group_object(coalesce(status, 'null'), c)
+                  FROM (SELECT status, COUNT(*) AS c FROM policies GROUP BY status))
+)
+"""
+
+# 统计信息（按类型/状态分组为 [值, 数量] 数组，NULL值保留为JSON null，供 get_stats 还原为None键）
+_SQL_STATS_PAIRS = """
+SELECT json_object(
+    'total', (SELECT COUNT(*) FROM policies),
+    'by_type', (SELECT json_group_array(json_array(policy_type, c))
+                FROM (SELECT policy_type, COUNT(*) AS c FROM policies GROUP BY policy_type)),
+    'by_status', (SELECT json_group_array(json_array(status, c))
+                  FROM (SELECT status, COUNT(*) AS c FROM policies GROUP BY status))
+)
+"""
+
+# 处理日志写入语句
+_SQL_LOG_PROCESSING = """
+INSERT INTO processing_logs
+(policy_id, action, status, message, error_detail, duration_ms)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# policies表的全部列
+POLICY_COLUMNS = (
+    "id", "title", "document_number", "issuing_authority", "publish_date", "effective_date",
+    "expiration_date", "policy_type", "region", "content", "summary", "status", "file_path",
+    "ragflow_doc_id", "created_at", "updated_at"
+)
+# 列表查询默认返回的列（不含体积较大的政策全文content）
+_LIST_COLUMNS = tuple(column for column in POLICY_COLUMNS if column != "content")
+_POLICY_COLUMN_SET = frozenset(POLICY_COLUMNS)
+
+# 列表/计数查询缓存的最大条目数与有效期（秒）
+_QUERY_CACHE_SIZE = 256
+_QUERY_CACHE_TTL = 60.0
+
+# 政策标签写入语句
+_SQL_ADD_POLICY_TAG = """
+INSERT OR REPLACE INTO policy_tags (policy_id, tag_id, confidence, source)
+VALUES (?, ?, ?, ?)
+"""
+# 政策关系写入语句
+_SQL_ADD_POLICY_RELATION = """
+INSERT OR REPLACE INTO policy_relations
+(source_policy_id, target_policy_id, relation_type, description, confidence)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+
+@lru_cache(maxsize=64)
+def _build_update_sql(keys: Tuple[str, ...]) -> str:
+    """根据待更新字段生成UPDATE语句
+    
+    Args:
+        keys: 排序后的字段名
+        
+    Returns:
+        UPDATE语句
+    """
+    set_clauses = [f"{key} = ?" for key in keys]
+    set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+    return f"UPDATE policies SET {', '.join(set_clauses)} WHERE id = ?"
+
 
 class PolicyDAO:
     """政策数据访问对象"""
 
+    # 列表/计数查询缓存（所有实例共享）：键包含数据版本号，政策写操作后版本号递增，旧条目随之失效
+    _query_cache: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+    _version = 0
+    _cache_lock = threading.Lock()
+
     def __init__(self):
         """初始化DAO"""
         self.db = get_db_manager()
 
+    def _cached_query(self, query: str, params: tuple) -> list:
+        """执行只读查询，命中缓存时直接返回缓存结果
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果行列表
+        """
+        cls = PolicyDAO
+        key = (self.db.db_file, cls._version, query, params)
+        now = time.monotonic()
+        with cls._cache_lock:
+            entry = cls._query_cache.get(key)
+            if entry is not None and now - entry[0] < _QUERY_CACHE_TTL:
+                cls._query_cache.move_to_end(key)
+                return entry[1]
+
+        rows = self.db.execute_query_ro(query, params)
+        with cls._cache_lock:
+            cls._query_cache[key] = (now, rows)
+            cls._query_cache.move_to_end(key)
+            if len(cls._query_cache) > _QUERY_CACHE_SIZE:
+                cls._query_cache.popitem(last=False)
+        return rows
+
+    @classmethod
+    def _invalidate_cache(cls):
+        """政策数据变更后使查询缓存失效"""
+        with cls._cache_lock:
+            cls._version += 1
+            cls._query_cache.clear()
+
     def create_policy(self, policy_data: Dict[str, Any]) -> int:
         """创建政策记录
         
@@ -115,16 +229,10 @@ class PolicyDAO:
         )
 
         try:
-            # 在同一连接中执行插入和获取ID
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
-                # 在同一连接上获取最后插入的ID
-                cursor.execute("SELECT last_insert_rowid()")
-                policy_id = cursor.fetchone()[0]
-                logger.info(f"创建政策成功: ID={policy_id}, 标题={policy_data.get('title')}, 文号={document_number}")
-                return policy_id
+            policy_id = self.db.execute_insert(query, params)
+            self._invalidate_cache()
+            logger.info(f"创建政策成功: ID={policy_id}, 标题={policy_data.get('title')}, 文号={document_number}")
+            return policy_id
         except Exception as e:
             logger.error(f"创建政策失败: {e}")
             raise
@@ -133,7 +241,7 @@ class PolicyDAO:
         """根据ID获取政策"""
         query = "SELECT * FROM policies WHERE id = ?"
         try:
-            result = self.db.execute_query(query, (policy_id,))
+            result = self.db.execute_query_ro(query, (policy_id,))
             if result:
                 return dict(result[0])
             return None
@@ -145,7 +253,7 @@ class PolicyDAO:
         """根据文号获取政策"""
         query = "SELECT * FROM policies WHERE document_number = ?"
         try:
-            result = self.db.execute_query(query, (document_number,))
+            result = self.db.execute_query_ro(query, (document_number,))
             if result:
                 return dict(result[0])
             return None
@@ -157,7 +265,7 @@ class PolicyDAO:
         """根据RAGFlow ID获取政策"""
         query = "SELECT * FROM policies WHERE ragflow_doc_id = ?"
         try:
-            result = self.db.execute_query(query, (ragflow_doc_id,))
+            result = self.db.execute_query_ro(query, (ragflow_doc_id,))
             if result:
                 return dict(result[0])
             return None
@@ -165,9 +273,22 @@ class PolicyDAO:
             logger.error(f"根据RAGFlow ID获取政策失败: {e}")
             raise
 
-    def get_policies(self, filters: Optional[Dict[str, Any]] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """获取政策列表"""
-        query = "SELECT * FROM policies WHERE 1=1"
+    @staticmethod
+    def _build_list_query(filters: Optional[Dict[str, Any]], limit: int, offset: int,
+                          columns: Optional[Sequence[str]]) -> Tuple[Tuple[str, ...], str, tuple]:
+        """构建政策列表查询
+        
+        Returns:
+            (列名, SQL语句, 参数)
+            
+        Raises:
+            ValueError: 列名不属于policies表时
+        """
+        columns = tuple(columns) if columns else _LIST_COLUMNS
+        unknown = set(columns) - _POLICY_COLUMN_SET
+        if unknown:
+            raise ValueError(f"未知的政策字段: {', '.join(sorted(unknown))}")
+        query = f"SELECT {', '.join(columns)} FROM policies WHERE 1=1"
         params = []
 
         if filters:
@@ -193,10 +314,47 @@ class PolicyDAO:
 
         query += " ORDER BY publish_date DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
+        return columns, query, tuple(params)
 
+    def get_policies(self, filters: Optional[Dict[str, Any]] = None, limit: int = 100, offset: int = 0,
+                     columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """获取政策列表
+        
+        Args:
+            filters: 过滤条件
+            limit: 返回数量上限
+            offset: 偏移量
+            columns: 需要返回的列，默认返回除content（政策全文）外的全部列
+            
+        Returns:
+            政策字典列表
+            
+        Raises:
+            ValueError: 列名不属于policies表时
+        """
+        columns, query, params = self._build_list_query(filters, limit, offset, columns)
         try:
-            result = self.db.execute_query(query, tuple(params))
-            return [dict(row) for row in result]
+            result = self._cached_query(query, params)
+            return [dict(zip(columns, row)) for row in result]
+        except Exception as e:
+            logger.error(f"获取政策列表失败: {e}")
+            raise
+
+    def get_policies_json(self, filters: Optional[Dict[str, Any]] = None, limit: int = 100, offset: int = 0,
+                          columns: Optional[Sequence[str]] = None) -> str:
+        """获取政策列表的JSON数组文本（由SQLite直接生成，可直接作为响应体返回）
+        
+        Args:
+            同get_policies
+            
+        Returns:
+            JSON数组字符串
+        """
+        columns, query, params = self._build_list_query(filters, limit, offset, columns)
+        fields = ", ".join(f"'{column}', {column}" for column in columns)
+        query = f"SELECT json_group_array(json_object({fields})) FROM ({query})"
+        try:
+            return self._cached_query(query, params)[0][0]
         except Exception as e:
             logger.error(f"获取政策列表失败: {e}")
             raise
@@ -220,7 +378,7 @@ class PolicyDAO:
                 params.append(filters['region'])
 
         try:
-            result = self.db.execute_query(query, tuple(params))
+            result = self._cached_query(query, tuple(params))
             return result[0][0] if result else 0
         except Exception as e:
             logger.error(f"获取政策总数失败: {e}")
@@ -231,16 +389,16 @@ class PolicyDAO:
         if not update_data:
             return False
 
-        # 构建动态UPDATE语句
-        set_clauses = [f"{key} = ?" for key in update_data.keys()]
-        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
-        query = f"UPDATE policies SET {', '.join(set_clauses)} WHERE id = ?"
+        # 按排序后的字段名构建UPDATE语句，相同字段组合复用同一条SQL（命中连接的预编译语句缓存）
+        keys = tuple(sorted(update_data))
+        query = _build_update_sql(keys)
 
-        params = list(update_data.values())
+        params = [update_data[key] for key in keys]
         params.append(policy_id)
 
         try:
             rowcount = self.db.execute_update(query, tuple(params))
+            self._invalidate_cache()
             return rowcount > 0
         except Exception as e:
             logger.error(f"更新政策失败: {e}")
@@ -251,6 +409,7 @@ class PolicyDAO:
         query = "DELETE FROM policies WHERE id = ?"
         try:
             rowcount = self.db.execute_update(query, (policy_id,))
+            self._invalidate_cache()
             return rowcount > 0
         except Exception as e:
             logger.error(f"删除政策失败: {e}")
@@ -258,17 +417,32 @@ class PolicyDAO:
 
     def add_policy_tag(self, policy_id: int, tag_id: int, confidence: float = 1.0, source: str = 'auto') -> bool:
         """添加政策标签"""
-        query = """
-        INSERT OR REPLACE INTO policy_tags (policy_id, tag_id, confidence, source)
-        VALUES (?, ?, ?, ?)
-        """
         try:
-            self.db.execute_update(query, (policy_id, tag_id, confidence, source))
+            self.db.execute_update(_SQL_ADD_POLICY_TAG, (policy_id, tag_id, confidence, source))
             return True
         except Exception as e:
             logger.error(f"添加政策标签失败: {e}")
             raise
 
+    def add_policy_tags_bulk(self, policy_id: int, items: Iterable[Tuple[int, float, str]]) -> int:
+        """批量添加政策标签（单个事务内复用同一条预编译语句）
+        
+        Args:
+            policy_id: 政策ID
+            items: (tag_id, confidence, source) 元组序列
+            
+        Returns:
+            写入的行数
+        """
+        rows = [(policy_id, tag_id, confidence, source) for tag_id, confidence, source in items]
+        if not rows:
+            return 0
+        try:
+            return self.db.execute_many(_SQL_ADD_POLICY_TAG, rows)
+        except Exception as e:
+            logger.error(f"批量添加政策标签失败: {e}")
+            raise
+
     def get_policy_tags(self, policy_id: int) -> List[Dict[str, Any]]:
         """获取政策的标签"""
         query = """
@@ -279,7 +453,7 @@ class PolicyDAO:
         ORDER BY t.level, t.display_order
         """
         try:
-            result = self.db.execute_query(query, (policy_id,))
+            result = self.db.execute_query_ro(query, (policy_id,))
             return [dict(row) for row in result]
         except Exception as e:
             logger.error(f"获取政策标签失败: {e}")
@@ -288,18 +462,35 @@ class PolicyDAO:
     def add_policy_relation(self, source_policy_id: int, target_policy_id: int,
                            relation_type: str, description: str = '', confidence: float = 1.0) -> bool:
         """添加政策关系"""
-        query = """
-        INSERT OR REPLACE INTO policy_relations
-        (source_policy_id, target_policy_id, relation_type, description, confidence)
-        VALUES (?, ?, ?, ?, ?)
-        """
         try:
-            self.db.execute_update(query, (source_policy_id, target_policy_id, relation_type, description, confidence))
+            self.db.execute_update(_SQL_ADD_POLICY_RELATION,
+                                   (source_policy_id, target_policy_id, relation_type, description, confidence))
             return True
         except Exception as e:
             logger.error(f"添加政策关系失败: {e}")
             raise
 
+    def add_policy_relations_bulk(self, source_policy_id: int,
+                                  items: Iterable[Tuple[int, str, str, float]]) -> int:
+        """批量添加政策关系（单个事务内复用同一条预编译语句）
+        
+        Args:
+            source_policy_id: 源政策ID
+            items: (target_policy_id, relation_type, description, confidence) 元组序列
+            
+        Returns:
+            写入的行数
+        """
+        rows = [(source_policy_id, target_policy_id, relation_type, description, confidence)
+                for target_policy_id, relation_type, description, confidence in items]
+        if not rows:
+            return 0
+        try:
+            return self.db.execute_many(_SQL_ADD_POLICY_RELATION, rows)
+        except Exception as e:
+            logger.error(f"批量添加政策关系失败: {e}")
+            raise
+
     def get_policy_relations(self, policy_id: int, as_source: bool = True) -> List[Dict[str, Any]]:
         """获取政策关系"""
         if as_source:
@@ -320,7 +511,7 @@ class PolicyDAO:
             """
 
         try:
-            result = self.db.execute_query(query, (policy_id,))
+            result = self.db.execute_query_ro(query, (policy_id,))
             return [dict(row) for row in result]
         except Exception as e:
             logger.error(f"获取政策关系失败: {e}")
@@ -329,18 +520,32 @@ class PolicyDAO:
     def log_processing(self, policy_id: Optional[int], action: str, status: str,
                       message: str = '', error_detail: str = '', duration_ms: int = 0) -> bool:
         """记录处理日志"""
-        query = """
-        INSERT INTO processing_logs
-        (policy_id, action, status, message, error_detail, duration_ms)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """
         try:
-            self.db.execute_update(query, (policy_id, action, status, message, error_detail, duration_ms))
+            self.db.execute_update(_SQL_LOG_PROCESSING,
+                                   (policy_id, action, status, message, error_detail, duration_ms))
             return True
         except Exception as e:
             logger.error(f"记录处理日志失败: {e}")
             raise
 
+    def log_processing_bulk(self, entries: Iterable[Tuple[Optional[int], str, str, str, str, int]]) -> int:
+        """批量记录处理日志（单个事务内复用同一条预编译语句）
+        
+        Args:
+            entries: (policy_id, action, status, message, error_detail, duration_ms) 元组序列
+            
+        Returns:
+            写入的行数
+        """
+        rows = list(entries)
+        if not rows:
+            return 0
+        try:
+            return self.db.execute_many(_SQL_LOG_PROCESSING, rows)
+        except Exception as e:
+            logger.error(f"批量记录处理日志失败: {e}")
+            raise
+
     def get_processing_logs(self, policy_id: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
         """获取处理日志"""
         query = "SELECT * FROM processing_logs WHERE 1=1"
@@ -354,40 +559,37 @@ class PolicyDAO:
         params.append(limit)
 
         try:
-            result = self.db.execute_query(query, tuple(params))
+            result = self.db.execute_query_ro(query, tuple(params))
             return [dict(row) for row in result]
         except Exception as e:
             logger.error(f"获取处理日志失败: {e}")
             raise
 
+    def get_stats_json(self) -> str:
+        """获取统计信息的JSON文本（由SQLite直接生成，可直接作为响应体返回）
+        
+        Returns:
+            JSON对象字符串：{"total": 总数, "by_type": {...}, "by_status": {...}}，
+            类型/状态为空的记录归入"null"（get_stats 中仍归入None键）
+        """
+        try:
+            return self.db.execute_query_ro(_SQL_STATS_JSON)[0][0]
+        except Exception as e:
+            logger.error(f"获取统计信息失败: {e}")
+            raise
+
     def get_stats(self) -> Dict[str, Any]:
-        """获取统计信息"""
+        """获取统计信息（类型/状态为空的记录归入None键）"""
         try:
-            # 按政策类型统计
-            type_stats = {}
-            query = "SELECT policy_type, COUNT(*) as count FROM policies GROUP BY policy_type"
-            result = self.db.execute_query(query)
-            for row in result:
-                type_stats[row[0]] = row[1]
-
-            # 按状态统计
-            status_stats = {}
-            query = "SELECT status, COUNT(*) as count FROM policies GROUP BY status"
-            result = self.db.execute_query(query)
-            for row in result:
-                status_stats[row[0]] = row[1]
-
-            # 总数
-            total = self.db.get_table_count('policies')
-
-            return {
-                'total': total,
-                'by_type': type_stats,
-                'by_status': status_stats
-            }
+            stats = json.loads(self.db.execute_query_ro(_SQL_STATS_PAIRS)[0][0])
         except Exception as e:
             logger.error(f"获取统计信息失败: {e}")
             raise
+        return {
+            'total': stats['total'],
+            'by_type': dict(stats['by_type']),
+            'by_status': dict(stats['by_status'])
+        }
 
     def get_or_create_tag(self, tag_name: str, tag_type: str = "general") -> int:
         """
@@ -418,7 +620,7 @@ class PolicyDAO:
             policy_type_value = tag_type if tag_type in ['special_bonds', 'franchise', 'data_assets'] else None
             params = (tag_name, policy_type_value, description, 3, datetime.now().isoformat())
             
-            return self.db.execute_query(insert_query, params, return_id=True)
+            return self.db.execute_insert(insert_query, params)
             
         except Exception as e:
             logger.error(f"获取或创建标签失败: {e}")
@@ -42,6 +42,9 @@ CREATE INDEX IF NOT EXISTS idx_policies_policy_type ON policies(policy_type);
 CREATE INDEX IF NOT EXISTS idx_policies_status ON policies(status);
 CREATE INDEX IF NOT EXISTS idx_policies_publish_date ON policies(publish_date);
 CREATE INDEX IF NOT EXISTS idx_policies_region ON policies(region);
+-- 按类型/状态过滤并按发布日期倒序分页（get_policies）
+CREATE INDEX IF NOT EXISTS idx_policies_type_pubdate ON policies(policy_type, publish_date DESC);
+CREATE INDEX IF NOT EXISTS idx_policies_status_pubdate ON policies(status, publish_date DESC);
 
 -- 标签表（三级标签体系）
 CREATE TABLE IF NOT EXISTS tags (
@@ -116,3 +119,6 @@ CREATE INDEX IF NOT EXISTS idx_processing_logs_policy_id ON processing_logs(poli
 CREATE INDEX IF NOT EXISTS idx_processing_logs_action ON processing_logs(action);
 CREATE INDEX IF NOT EXISTS idx_processing_logs_status ON processing_logs(status);
 CREATE INDEX IF NOT EXISTS idx_processing_logs_created_at ON processing_logs(created_at);
+-- 按政策查询最近日志（get_processing_logs），只索引关联了政策的日志
+CREATE INDEX IF NOT EXISTS idx_logs_policy_time ON processing_logs(policy_id, created_at DESC)
+    WHERE policy_id IS NOT NULL;
@@ -30,11 +30,58 @@
     graph.add_edge(edge)
 """
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, List, Any, Set, Tuple
+from typing import Optional, Dict, List, Any, Set, Tuple, Iterator
 from enum import Enum
+from itertools import count
 import networkx as nx
 
 
+# 图谱版本号生成器：版本号在进程内全局唯一，重建的图谱对象不会与旧对象的版本号相同
+_version_counter = count(1)
+
+# 直径计算为全源BFS（O(V·(V+E))），仅对小图计算
+DIAMETER_MAX_NODES = 500
+
+
+def fast_connected_components(graph: nx.Graph) -> Iterator[Set[Any]]:
+    """
+    逐个生成连通分量（带提前退出的BFS）
+
+    与 nx.connected_components 结果一致，但在已访问节点覆盖全图时立即停止，
+    避免对剩余节点重复检查；对星形、稀疏不连通图提升明显。
+
+    Args:
+        graph: NetworkX无向图
+
+    Yields:
+        每个连通分量的节点集合
+    """
+    adj = graph.adj
+    n = len(graph)
+    seen: Set[Any] = set()
+
+    for source in graph:
+        if source in seen:
+            continue
+
+        remaining = n - len(seen)
+        component = {source}
+        next_level = [source]
+        while next_level and len(component) < remaining:
+            this_level, next_level = next_level, []
+            for v in this_level:
+                for w in adj[v]:
+                    if w not in component:
+                        component.add(w)
+                        next_level.append(w)
+
+        seen |= component
+        yield component
+
+        if len(seen) >= n:
+            break
+
+
 class NodeType(str, Enum):
     """节点类型"""
     POLICY = "policy"
@@ -55,7 +102,7 @@ class RelationType(str, Enum):
     RELATES_TO = "relates_to"  # 相关...
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphNode:
     """图谱节点"""
     node_id: str
@@ -86,7 +133,7 @@ class GraphNode:
         return self.attributes.get(key, default)
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphEdge:
     """图谱边"""
     source_id: str
@@ -125,6 +172,26 @@ class PolicyGraph:
         self.graph = nx.Graph()
         self.nodes: Dict[str, GraphNode] = {}
         self.edges: List[GraphEdge] = []
+        # 源节点ID -> 以其为源的边列表（用于按节点遍历关联边）
+        self._edges_by_source: Dict[str, List[GraphEdge]] = {}
+        # 节点ID -> [(相邻节点ID, 关系类型), ...]，按边的添加顺序记录两个方向
+        self._adj: Dict[str, List[Tuple[str, RelationType]]] = {}
+        # 已存在的边 (源节点ID, 目标节点ID, 关系类型)，用于O(1)去重
+        self._edge_keys: Set[Tuple[str, str, RelationType]] = set()
+        # 图谱版本号，每次增删节点/边时更新，用于判断统计等缓存是否失效
+        self._version = next(_version_counter)
+        # (版本号, 是否已计算直径, 统计结果)
+        self._stats_cache: Optional[Tuple[int, bool, Dict[str, Any]]] = None
+
+    @property
+    def version(self) -> int:
+        """
+        图谱版本号
+
+        进程内全局唯一，通过 add_node/add_edge/clear 修改图谱后改变，可作为缓存键
+        （直接修改 get_nx_graph() 返回的图不会改变版本号）。
+        """
+        return self._version
 
     def add_node(self, node: GraphNode) -> bool:
         """
@@ -145,6 +212,7 @@ class PolicyGraph:
                     **node.attributes
                 )
                 self.nodes[node.node_id] = node
+                self._version = next(_version_counter)
                 return True
             return False
         except Exception:
@@ -166,11 +234,9 @@ class PolicyGraph:
                 return False
 
             # 避免重复边
-            for existing_edge in self.edges:
-                if (existing_edge.source_id == edge.source_id and
-                    existing_edge.target_id == edge.target_id and
-                    existing_edge.relation_type == edge.relation_type):
-                    return False
+            edge_key = (edge.source_id, edge.target_id, edge.relation_type)
+            if edge_key in self._edge_keys:
+                return False
 
             self.graph.add_edge(
                 edge.source_id,
@@ -180,6 +246,12 @@ class PolicyGraph:
                 **edge.attributes
             )
             self.edges.append(edge)
+            self._edge_keys.add(edge_key)
+            self._edges_by_source.setdefault(edge.source_id, []).append(edge)
+            self._adj.setdefault(edge.source_id, []).append((edge.target_id, edge.relation_type))
+            if edge.target_id != edge.source_id:
+                self._adj.setdefault(edge.target_id, []).append((edge.source_id, edge.relation_type))
+            self._version = next(_version_counter)
             return True
         except Exception:
             return False
@@ -196,6 +268,10 @@ class PolicyGraph:
         neighbor_ids = list(self.graph.neighbors(node_id))
         return [self.nodes[nid] for nid in neighbor_ids if nid in self.nodes]
 
+    def get_edges_from(self, node_id: str) -> List[GraphEdge]:
+        """获取以指定节点为源的所有边"""
+        return self._edges_by_source.get(node_id, [])
+
     def get_related_nodes(self, node_id: str, relation_type: Optional[RelationType] = None) -> List[Tuple[GraphNode, RelationType]]:
         """
         获取指定关系类型的相关节点
@@ -209,20 +285,12 @@ class PolicyGraph:
         """
         result = []
 
-        if node_id not in self.graph:
-            return result
-
-        for edge in self.edges:
-            if edge.source_id == node_id:
-                if relation_type is None or edge.relation_type == relation_type:
-                    target_node = self.nodes.get(edge.target_id)
-                    if target_node:
-                        result.append((target_node, edge.relation_type))
-            elif edge.target_id == node_id:
-                if relation_type is None or edge.relation_type == relation_type:
-                    source_node = self.nodes.get(edge.source_id)
-                    if source_node:
-                        result.append((source_node, edge.relation_type))
+        # 只遍历该节点的关联边（O(度数)），无需扫描全部边
+        for neighbor_id, edge_relation in self._adj.get(node_id, ()):
+            if relation_type is None or edge_relation == relation_type:
+                neighbor = self.nodes.get(neighbor_id)
+                if neighbor:
+                    result.append((neighbor, edge_relation))
 
         return result
 
@@ -286,8 +354,22 @@ class PolicyGraph:
 
         return self.get_subgraph_by_nodes(ego_node_ids)
 
-    def get_stats(self) -> Dict[str, Any]:
-        """获取图谱统计信息"""
+    def get_stats(self, compute_diameter: bool = False) -> Dict[str, Any]:
+        """
+        获取图谱统计信息
+
+        结果按图谱版本缓存，图谱未变化时直接返回缓存。
+
+        Args:
+            compute_diameter: 是否计算直径（全源BFS，开销最大，默认不计算）
+
+        Returns:
+            统计信息字典
+        """
+        cached = self._stats_cache
+        if cached and cached[0] == self._version and (cached[1] or not compute_diameter):
+            return dict(cached[2])
+
         node_count = len(self.nodes)
         edge_count = len(self.edges)
         
@@ -304,23 +386,25 @@ class PolicyGraph:
         try:
             # 计算图谱统计信息
             density = nx.density(self.graph) if self.graph.number_of_nodes() > 0 else 0
-            num_components = nx.number_connected_components(self.graph)
+            num_components = sum(1 for _ in fast_connected_components(self.graph))
             
-            # 计算直径需要图是连通的且有足够节点
+            # 计算直径需要图是连通的、有足够节点，且规模不超过上限
             diameter = None
-            if node_count > 1 and nx.is_connected(self.graph):
+            if compute_diameter and 1 < node_count < DIAMETER_MAX_NODES and num_components == 1:
                 try:
                     diameter = nx.diameter(self.graph)
                 except (nx.NetworkXError, nx.NetworkXNoPath):
                     diameter = None
             
-            return {
+            stats = {
                 'node_count': node_count,
                 'edge_count': edge_count,
                 'density': density,
                 'number_of_connected_components': num_components,
                 'diameter': diameter
             }
+            self._stats_cache = (self._version, compute_diameter, stats)
+            return dict(stats)
         except Exception as e:
             # 如果计算统计信息失败，返回基本信息
             return {
@@ -357,6 +441,10 @@ class PolicyGraph:
         self.graph.clear()
         self.nodes.clear()
         self.edges.clear()
+        self._edges_by_source.clear()
+        self._adj.clear()
+        self._edge_keys.clear()
+        self._version = next(_version_counter)
 
     def get_nx_graph(self) -> nx.Graph:
         """获取NetworkX图对象（用于可视化）"""
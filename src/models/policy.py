@@ -38,7 +38,7 @@ class PolicyStatus(str, Enum):
     EXPIRING_SOON = "expiring_soon"
 
 
-@dataclass
+@dataclass(slots=True)
 class PolicyMetadata:
     """政策元数据"""
     title: str
@@ -54,7 +54,7 @@ class PolicyMetadata:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class PolicyContent:
     """政策内容"""
     content: str
@@ -69,7 +69,7 @@ class PolicyContent:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Policy:
     """政策对象"""
     id: Optional[int] = None
@@ -21,10 +21,40 @@
     tag1.add_child(tag2)
 """
 from dataclasses import dataclass, asdict, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from enum import Enum
 
 
+# 标签树版本号：add_child/add_tag 以及修改标签的索引字段时递增，TagHierarchy据此判断索引是否失效
+_tree_version = 0
+
+# 参与TagHierarchy索引的标签字段，赋值时递增标签树版本号
+_INDEXED_FIELDS = frozenset({'name', 'level', 'policy_type', 'children'})
+
+
+def _bump_tree_version():
+    """标记标签树结构已变化"""
+    global _tree_version
+    _tree_version += 1
+
+
+def _contains_same(tags: List['Tag'], tag: 'Tag') -> bool:
+    """
+    判断标签列表中是否已包含同一个标签对象
+
+    按对象身份（is）比较，不触发dataclass的 __eq__（逐字段并递归比较子标签）；
+    直接读取列表本身，构造参数传入或直接修改列表后结果依然准确。
+
+    Args:
+        tags: 标签列表
+        tag: 待检查的标签
+
+    Returns:
+        是否已包含
+    """
+    return any(existing is tag for existing in tags)
+
+
 class TagLevel(int, Enum):
     """标签级别"""
     LEVEL_1 = 1
@@ -39,7 +69,7 @@ class PolicyTypeCategory(str, Enum):
     DATA_ASSETS = "data_assets"
 
 
-@dataclass
+@dataclass(slots=True)
 class Tag:
     """标签对象"""
     id: Optional[int] = None
@@ -93,93 +123,171 @@ class Tag:
         return bool(self.name and 1 <= self.level <= 3)
 
     def add_child(self, child: 'Tag'):
-        """添加子标签"""
-        if child not in self.children:
+        """添加子标签（按对象身份去重，避免逐个递归比较标签字段）"""
+        if not _contains_same(self.children, child):
             self.children.append(child)
             child.parent_id = self.id
+            _bump_tree_version()
+
+    def __setattr__(self, name: str, value: Any):
+        """赋值名称/级别/政策类型/子标签列表时标记标签树已变化，使相关索引失效"""
+        object.__setattr__(self, name, value)
+        if name in _INDEXED_FIELDS:
+            _bump_tree_version()
 
     def get_path(self) -> str:
         """获取标签路径（用于显示层级关系）"""
         return f"{self.policy_type or ''}/{self.name}".strip('/')
 
 
-@dataclass
+@dataclass(slots=True)
 class TagHierarchy:
-    """标签体系（用于管理三级标签树）"""
+    """
+    标签体系（用于管理三级标签树）
+
+    按名称/级别/政策类型的查询使用首次查询时构建的索引。以下修改后索引自动重建：
+    add_tag/add_child、对标签 name/level/policy_type/children 赋值、增删或替换 root_tags
+    中的顶级标签。原地修改某个标签的 children 列表（append、下标赋值等）无法被感知，
+    之后需调用 invalidate_index()。
+    """
     root_tags: List[Tag] = field(default_factory=list)
+    # 索引构建时的 (标签树版本号, 顶级标签id元组)（None表示尚未构建）
+    _index_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # 名称 -> 标签（同名时保留先序遍历中的第一个）
+    _name_index: Dict[str, Tag] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # 级别 -> 标签列表（先序）
+    _level_index: Dict[int, List[Tag]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # 顶级标签的政策类型 -> 该类型顶级标签及其所有子标签（先序）
+    _policy_type_index: Dict[Optional[str], List[Tag]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
 
     def add_tag(self, tag: Tag):
-        """添加顶级标签"""
-        if tag not in self.root_tags:
+        """添加顶级标签（按对象身份去重）"""
+        if not _contains_same(self.root_tags, tag):
             self.root_tags.append(tag)
+            _bump_tree_version()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """复制/序列化状态（只保留标签树，查询索引在副本中重建）"""
+        return {'root_tags': self.root_tags}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        """恢复复制/序列化状态"""
+        self.root_tags = state['root_tags']
+        self._index_key = None
+        self._name_index = {}
+        self._level_index = {}
+        self._policy_type_index = {}
+
+    def invalidate_index(self):
+        """使查询索引失效，下次查询时重建（原地修改某个标签的 children 列表后调用）"""
+        self._index_key = None
+
+    def _ensure_index(self):
+        """标签树或顶级标签列表变化后重建名称/级别/政策类型索引（一次遍历）"""
+        index_key = (_tree_version, tuple(map(id, self.root_tags)))
+        if self._index_key == index_key:
+            return
+
+        name_index: Dict[str, Tag] = {}
+        level_index: Dict[int, List[Tag]] = {}
+        policy_type_index: Dict[Optional[str], List[Tag]] = {}
+
+        for root_tag in self.root_tags:
+            subtree = [root_tag]
+            subtree.extend(self._iter_descendants(root_tag))
+            for tag in subtree:
+                name_index.setdefault(tag.name, tag)
+                level_index.setdefault(tag.level, []).append(tag)
+            policy_type_index.setdefault(root_tag.policy_type, []).extend(subtree)
+
+        self._name_index = name_index
+        self._level_index = level_index
+        self._policy_type_index = policy_type_index
+        self._index_key = index_key
 
     def find_tag_by_name(self, name: str) -> Optional[Tag]:
-        """按名称查找标签"""
-        for tag in self.root_tags:
-            result = self._search_tag(tag, name)
-            if result:
-                return result
-        return None
+        """
+        按名称查找标签（同名时返回先序遍历中的第一个）
+
+        原地修改某个标签的 children 列表后，需先调用 invalidate_index()。
+
+        Args:
+            name: 标签名称
+
+        Returns:
+            标签对象，不存在时返回None
+        """
+        self._ensure_index()
+        return self._name_index.get(name)
+
+    @staticmethod
+    def _iter_descendants(tag: Tag) -> Iterator[Tag]:
+        """
+        按先序（深度优先）迭代标签的所有子孙标签，不含标签本身
+
+        使用显式栈代替递归，避免每层的函数调用开销和中间列表分配。
+        """
+        stack = list(reversed(tag.children))
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            current = pop()
+            yield current
+            if current.children:
+                extend(reversed(current.children))
 
     @staticmethod
     def _search_tag(tag: Tag, name: str) -> Optional[Tag]:
-        """递归搜索标签"""
+        """搜索标签（含标签本身），找到即返回"""
         if tag.name == name:
             return tag
 
-        for child in tag.children:
-            result = TagHierarchy._search_tag(child, name)
-            if result:
-                return result
+        for child in TagHierarchy._iter_descendants(tag):
+            if child.name == name:
+                return child
 
         return None
 
     def find_tags_by_policy_type(self, policy_type: str) -> List[Tag]:
-        """按政策类型获取所有标签"""
-        tags = []
+        """
+        按政策类型获取所有标签（该类型的顶级标签及其全部子标签）
 
-        for tag in self.root_tags:
-            if tag.policy_type == policy_type:
-                tags.append(tag)
-                tags.extend(self._get_all_children(tag))
+        原地修改某个标签的 children 列表后，需先调用 invalidate_index()。
 
-        return tags
+        Args:
+            policy_type: 政策类型
+
+        Returns:
+            标签列表（先序）
+        """
+        self._ensure_index()
+        return list(self._policy_type_index.get(policy_type, ()))
 
     @staticmethod
     def _get_all_children(tag: Tag) -> List[Tag]:
         """获取标签的所有子标签"""
-        children = []
-
-        for child in tag.children:
-            children.append(child)
-            children.extend(TagHierarchy._get_all_children(child))
-
-        return children
+        return list(TagHierarchy._iter_descendants(tag))
 
     def get_tags_by_level(self, level: int) -> List[Tag]:
-        """按级别获取标签"""
-        tags = []
+        """
+        按级别获取标签
 
-        for tag in self.root_tags:
-            if tag.level == level:
-                tags.append(tag)
+        原地修改某个标签的 children 列表后，需先调用 invalidate_index()。
 
-            tags.extend(self._search_tags_by_level(tag, level))
+        Args:
+            level: 标签级别
 
-        return tags
+        Returns:
+            标签列表（先序）
+        """
+        self._ensure_index()
+        return list(self._level_index.get(level, ()))
 
     @staticmethod
     def _search_tags_by_level(tag: Tag, level: int) -> List[Tag]:
-        """递归搜索指定级别的标签"""
-        tags = []
-
-        for child in tag.children:
-            if child.level == level:
-                tags.append(child)
-
-            tags.extend(TagHierarchy._search_tags_by_level(child, level))
-
-        return tags
+        """搜索子孙标签中指定级别的标签"""
+        return [child for child in TagHierarchy._iter_descendants(tag) if child.level == level]
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -193,12 +301,12 @@ class TagHierarchy:
 
         for root_tag in self.root_tags:
             tags.append(root_tag)
-            tags.extend(self._get_all_children(root_tag))
+            tags.extend(self._iter_descendants(root_tag))
 
         return tags
 
 
-@dataclass
+@dataclass(slots=True)
 class TagAssociation:
     """标签关联（政策与标签的关联）"""
     policy_id: int
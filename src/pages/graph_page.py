@@ -21,6 +21,7 @@ import networkx as nx
 from src.components.graph_ui import (
     render_graph_controls,
     render_network_graph_from_data,
+    compute_graph_stats,
     render_graph_stats,
     render_graph_export
 )
@@ -108,17 +109,10 @@ def show():
         # 图谱统计
         if st.session_state.graph:
             node_count = len(st.session_state.graph.get('nodes', []))
-            edge_count = len(st.session_state.graph.get('edges', []))
             
             if node_count > 0:
-                # 显示基本统计
-                stats = {
-                    'node_count': node_count,
-                    'edge_count': edge_count,
-                    'density': 0,
-                    'number_of_connected_components': 0,
-                    'diameter': None
-                }
+                # 显示图谱统计（按图指纹缓存，图未变化时不重复计算）
+                stats = compute_graph_stats(build_nx_graph(st.session_state.graph))
                 render_graph_stats(stats)
         else:
             st.info("📊 图谱统计信息将在添加数据后显示")
@@ -181,6 +175,20 @@ def load_graph_from_database():
         return None
 
 
+def build_nx_graph(graph_data: dict) -> nx.Graph:
+    """将Pyvis格式的图谱数据转换为NetworkX无向图（用于统计计算）"""
+    nx_graph = nx.Graph()
+    nx_graph.add_nodes_from(
+        node.get('id') for node in graph_data.get('nodes', []) if node.get('id')
+    )
+    nx_graph.add_edges_from(
+        (edge.get('from'), edge.get('to'))
+        for edge in graph_data.get('edges', [])
+        if edge.get('from') and edge.get('to')
+    )
+    return nx_graph
+
+
 def render_edge_browser_from_graph(graph_data: dict):
     """
     基于图谱数据显示关系浏览器
@@ -19,10 +19,11 @@ from src.components.search_ui import (
     render_search_bar,
     render_advanced_search_panel,
     render_search_results,
+    render_result_preview,
     render_search_filters_sidebar,
     render_search_stats
 )
-from src.database.policy_dao import PolicyDAO
+from src.database.policy_dao import PolicyDAO, POLICY_COLUMNS
 
 
 def show():
@@ -92,50 +93,11 @@ def show():
                     if history_item.get('results'):
                         for i, result in enumerate(history_item['results'][:3]):
                             with st.expander(f"📄 {result.get('title', '未知标题')}", expanded=False):
-                                # 基本信息
-                                if result.get('issuing_authority'):
-                                    st.caption(f"🏛️ {result['issuing_authority']}")
-                                if result.get('publish_date'):
-                                    st.caption(f"📅 {result['publish_date']}")
-                                summary = result.get('summary', result.get('content', ''))
-                                if summary:
-                                    summary_text = summary[:200] + '...' if len(summary) > 200 else summary
-                                    st.write(summary_text)
-                                
-                                # 嵌入式知识图谱
-                                if st.session_state.full_graph and st.session_state.full_graph.get_node_count() > 0:
-                                    from src.components.search_ui import (
-                                        extract_entities_from_policy,
-                                        fuzzy_match_entities_to_nodes,
-                                        build_subgraph_for_entities,
-                                        render_highlighted_graph
-                                    )
-                                    
-                                    with st.expander("🔗 知识图谱", expanded=False):
-                                        # 提取实体
-                                        entities = extract_entities_from_policy(result)
-                                        
-                                        if entities:
-                                            # 模糊匹配到节点
-                                            matched_node_ids = fuzzy_match_entities_to_nodes(entities, st.session_state.full_graph)
-                                            
-                                            if matched_node_ids:
-                                                st.caption(f"✅ 匹配到 {len(matched_node_ids)} 个实体节点")
-                                                
-                                                # 构建子图
-                                                subgraph = build_subgraph_for_entities(st.session_state.full_graph, matched_node_ids)
-                                                
-                                                if subgraph.get_node_count() > 0:
-                                                    st.caption(f"📊 图谱包含 {subgraph.get_node_count()} 个节点，{len(subgraph.edges)} 条边")
-                                                    
-                                                    # 渲染高亮图谱
-                                                    render_highlighted_graph(subgraph, matched_node_ids)
-                                                else:
-                                                    st.warning("暂无图谱数据")
-                                            else:
-                                                st.info("暂无匹配的图谱节点")
-                                        else:
-                                            st.info("未提取到实体信息")
+                                # 元数据与摘要一次输出；嵌入式知识图谱点击后才匹配与渲染
+                                render_result_preview(
+                                    result, st.session_state.full_graph,
+                                    f"{idx}_{result.get('id', i)}"
+                                )
                         
                         if result_count > 3:
                             st.caption(f"... 还有 {result_count - 3} 条结果")
@@ -255,8 +217,8 @@ def perform_search():
         query = st.session_state.search_query
         filters = st.session_state.search_filters
 
-        # 获取所有政策
-        results = dao.get_policies()
+        # 获取所有政策（关键词过滤需要政策全文）
+        results = dao.get_policies(columns=POLICY_COLUMNS)
 
         # 应用过滤条件
         if filters.get("policy_type"):
@@ -7,7 +7,11 @@
 测试新的配置加载器和知识库配置系统功能
 """
 
+import ast
+import inspect
+import tempfile
 import unittest
+from unittest import mock
 import os
 import sys
 from pathlib import Path
@@ -84,6 +88,294 @@ class TestConfigSystem(unittest.TestCase):
         self.assertEqual(old_config['graph_retrieval'], new_config['graph_retrieval'])
 
 
+class TestConfigLoaderDefinition(unittest.TestCase):
+    """配置加载器类定义测试类"""
+    
+    def test_no_duplicate_members(self):
+        """测试类中没有重复定义的属性/方法（重复定义时只有最后一个生效）"""
+        tree = ast.parse(inspect.getsource(ConfigLoader))
+        names = [node.name for node in tree.body[0].body if isinstance(node, ast.FunctionDef)]
+        duplicates = {name for name in names if names.count(name) > 1}
+        self.assertEqual(duplicates, set())
+        
+    def test_ragflow_properties(self):
+        """测试RAGFlow相关属性数量"""
+        ragflow_names = {name for name in dir(ConfigLoader) if name.startswith("ragflow_")}
+        self.assertEqual(len(ragflow_names), 14)
+        
+    def test_global_config_singleton(self):
+        """测试全局配置加载器为单例，reset_config后重新创建"""
+        from src.config import get_config, reset_config
+        
+        config = get_config()
+        self.assertIs(get_config(), config)
+        
+        reset_config()
+        self.addCleanup(reset_config)
+        self.assertIsNot(get_config(), config)
+        
+    def test_instance_state_in_slots(self):
+        """测试实例状态存放在槽位中，__dict__ 只用于缓存属性"""
+        config = ConfigLoader()
+        config.get("APP", "name")
+        self.assertNotIn("_flat", config.__dict__)
+        self.assertNotIn("project_root", config.__dict__)
+        
+        config.sqlite_config
+        self.assertIn("sqlite_config", config.__dict__)
+
+
+class TestConfigValueCache(unittest.TestCase):
+    """配置值缓存测试类"""
+    
+    def setUp(self):
+        """测试前设置"""
+        self.config = ConfigLoader()
+        
+    def test_values_cached_until_reload(self):
+        """测试配置值被缓存，reload后重新读取"""
+        original = self.config.get("APP", "name", "默认")
+        self.config.config.set("APP", "name", "已修改")
+        
+        # 缓存命中，不受内存中配置修改影响
+        self.assertEqual(self.config.get("APP", "name", "默认"), original)
+        
+        self.config.reload()
+        self.assertEqual(self.config.get("APP", "name", "默认"), original)
+        
+    def test_missing_option_uses_fallback(self):
+        """测试不存在的配置项每次都返回调用方的默认值"""
+        self.assertEqual(self.config.get_int("APP", "no_such_option", 7), 7)
+        self.assertEqual(self.config.get_int("APP", "no_such_option", 8), 8)
+        self.assertIsNone(self.config.get("NO_SUCH_SECTION", "x"))
+        
+    def test_list_values_cached(self):
+        """测试列表配置解析结果被缓存，调用方拿到的列表互不影响"""
+        formats = self.config.get_list("GRAPH", "export_formats", ["html"])
+        formats.append("pdf")
+        self.assertNotIn("pdf", self.config.get_list("GRAPH", "export_formats", ["html"]))
+        self.assertEqual(self.config.get_list("APP", "no_such_list"), [])
+        self.assertEqual(self.config.get_list("APP", "no_such_list", ["x"]), ["x"])
+        
+        self.assertIsInstance(self.config.graph_export_formats, tuple)
+        self.assertIs(self.config.supported_languages, self.config.supported_languages)
+        
+    def test_paths_resolved_once(self):
+        """测试路径配置只解析一次，相对路径基于项目根目录"""
+        sqlite_path = self.config.sqlite_path
+        self.assertIs(self.config.sqlite_path, sqlite_path)
+        self.assertTrue(sqlite_path.is_absolute())
+        self.assertEqual(self.config.sqlite_path_str, str(sqlite_path))
+        self.assertEqual(self.config.sqlite_config["database"], str(sqlite_path))
+        self.assertIs(self.config.prompts_dir, self.config.prompts_dir)
+        
+    def test_materialize_schema(self):
+        """测试按声明式定义批量读取配置，缺失或非法值使用默认值"""
+        self.config.get("APP", "name")
+        self.config._flat[("DATABASE", "pool_size")] = "abc"
+        self.config._flat.pop(("DATABASE", "max_overflow"), None)
+        
+        pool_config = self.config._materialize("connection_pool_config")
+        self.assertEqual(pool_config["pool_size"], 5)
+        self.assertEqual(pool_config["max_overflow"], 10)
+        
+        formats = self.config._materialize("whisper_file_config")["supported_formats"]
+        self.assertIsInstance(formats, list)
+        self.assertIsNot(formats, self.config._materialize("whisper_file_config")["supported_formats"])
+        
+    def test_flat_lookup(self):
+        """测试扁平字典读取：选项名不区分大小写，原样返回含%的值，布尔值按映射转换"""
+        self.assertEqual(self.config.get("APP", "NAME"), self.config.get("APP", "name"))
+        self.assertEqual(self.config.get("GRAPH", "pyvis_width", "100%"), "100%")
+        
+        self.config._flat[("APP", "flag_on")] = " On "
+        self.config._flat[("APP", "flag_bad")] = "maybe"
+        self.assertTrue(self.config.get_bool("APP", "flag_on"))
+        self.assertEqual(self.config.get_bool("APP", "flag_bad", "默认"), "默认")
+        
+    def test_dict_properties_built_once(self):
+        """测试组合配置字典只构建一次，reload后重建"""
+        sqlite_config = self.config.sqlite_config
+        self.assertIs(self.config.sqlite_config, sqlite_config)
+        
+        self.config.reload()
+        self.assertIsNot(self.config.sqlite_config, sqlite_config)
+        self.assertEqual(self.config.sqlite_config, sqlite_config)
+        
+    def test_scalar_properties_cached(self):
+        """测试标量配置属性只计算一次，reload后重新计算"""
+        self.config.get("APP", "name")
+        self.config._flat[("APP", "name")] = "临时名称"
+        self.assertEqual(self.config.app_name, "临时名称")
+        
+        self.config._flat[("APP", "name")] = "另一个名称"
+        self.assertEqual(self.config.app_name, "临时名称")
+        
+        self.config.reload()
+        self.assertNotEqual(self.config.app_name, "临时名称")
+        
+    def test_connection_configs_read_only(self):
+        """测试数据库连接配置为只读映射"""
+        with self.assertRaises(TypeError):
+            self.config.sqlite_config["timeout"] = 1
+        with self.assertRaises(TypeError):
+            self.config.connection_pool_config["pool_size"] = 1
+        
+        sqlite_config = dict(self.config.sqlite_config)
+        sqlite_config["timeout"] = 1
+        self.assertNotEqual(self.config.sqlite_config["timeout"], 1)
+        
+    def test_available_kb_names_filtering(self):
+        """测试知识库名称过滤默认项和目录项，结果缓存"""
+        # 共享的解析结果在测试后通过reload恢复
+        self.addCleanup(self.config.reload)
+        parser = self.config.config
+        if not parser.has_section("KNOWLEDGE_BASES"):
+            parser.add_section("KNOWLEDGE_BASES")
+        parser.set("KNOWLEDGE_BASES", "default_kb", "policy_demo_kb")
+        parser.set("KNOWLEDGE_BASES", "prompts_dir", "config/prompts")
+        parser.set("KNOWLEDGE_BASES", "extra_kb", "extra_kb.ini")
+        
+        names = self.config.available_kb_names
+        self.assertIn("extra_kb", names)
+        self.assertNotIn("default_kb", names)
+        self.assertNotIn("prompts_dir", names)
+        self.assertIs(self.config.available_kb_names, names)
+        self.assertEqual(self.config.get_available_kb_names(), names)
+        
+    def test_env_overrides_snapshot(self):
+        """测试环境变量覆盖项在构造时快照，reload后重新读取"""
+        with mock.patch.dict(os.environ, {"RAGFLOW_HOST": "env-host", "RAGFLOW_PORT": "9999"}):
+            config = ConfigLoader()
+        self.assertEqual(config.ragflow_base_url, "http://env-host:9999")
+        
+        with mock.patch.dict(os.environ, {"RAGFLOW_HOST": "other-host"}):
+            self.assertEqual(config.ragflow_host, "env-host")
+            config.reload()
+            self.assertEqual(config.ragflow_host, "other-host")
+        
+    def test_parsing_deferred_until_first_access(self):
+        """测试构造时不解析config.ini，首次读取配置时才解析"""
+        config = ConfigLoader()
+        self.assertFalse(config._loaded)
+        
+        config.get("APP", "name")
+        self.assertTrue(config._loaded)
+        
+    def test_directories_resolved_lazily(self):
+        """测试数据/日志目录在首次访问时解析并确保存在"""
+        config = ConfigLoader()
+        self.assertNotIn("data_dir", config.__dict__)
+        
+        self.assertTrue(config.data_dir.is_dir())
+        self.assertTrue(config.logs_dir.is_dir())
+        self.assertIs(config.data_dir, config.data_dir)
+        
+    def test_created_dirs_shared_across_instances(self):
+        """测试已确认存在的目录在实例间共享，不再重复检查"""
+        config = ConfigLoader()
+        config.data_dir
+        self.assertIn(config.project_root / "data" / "database", ConfigLoader._created_dirs)
+        self.assertIn(config.project_root / "logs", ConfigLoader._created_dirs)
+        
+    def test_directory_layout_sentinel(self):
+        """测试首次创建目录后写入哨兵文件，之后的进程只检查哨兵文件"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            config = ConfigLoader()
+            config.project_root = root
+            config._ensure_directories()
+            
+            self.assertTrue((root / "data" / "database").is_dir())
+            self.assertTrue((root / "logs").is_dir())
+            self.assertTrue((root / "data" / ".initialized").exists())
+            
+            # 模拟新进程：清除进程内记录后不再逐个创建目录
+            (root / "logs").rmdir()
+            ConfigLoader._created_dirs.difference_update(
+                {path for path in ConfigLoader._created_dirs if root in path.parents})
+            config._ensure_directories()
+            self.assertFalse((root / "logs").exists())
+        
+    def test_parsed_config_shared_until_file_changes(self):
+        """测试config.ini未变化时新实例复用已解析结果，reload强制重新解析"""
+        first = ConfigLoader()
+        second = ConfigLoader()
+        self.assertIs(first.config, second.config)
+        
+        parser = first.config
+        first.reload()
+        self.assertIsNot(first.config, parser)
+        self.assertIs(ConfigLoader().config, first.config)
+        
+    def test_preload_kb_configs(self):
+        """测试批量预加载知识库配置"""
+        self.config.preload_kb_configs(["policy_demo_kb", "no_such_kb"])
+        self.assertIn("policy_demo_kb", self.config._kb_configs)
+        self.assertNotIn("no_such_kb", self.config._kb_configs)
+        self.assertIs(self.config._load_kb_config("policy_demo_kb"),
+                      self.config._kb_configs["policy_demo_kb"])
+        
+    def test_parsed_cache_concurrent_reads(self):
+        """测试多线程并发读取不同ini文件时解析缓存读写安全"""
+        from concurrent.futures import ThreadPoolExecutor
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for i in range(32):
+                path = Path(tmp_dir) / f"kb{i}.ini"
+                path.write_text(f"[KNOWLEDGE_BASE]\ndescription = 知识库{i}\n", encoding='utf-8')
+                paths.append(path)
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                parsers = list(executor.map(lambda p: ConfigLoader._read_parsed(p, force=True), paths * 4))
+
+            self.assertEqual(parsers[5].get("KNOWLEDGE_BASE", "description"), "知识库5")
+            cached = [key for key in ConfigLoader._PARSED_CACHE if key[0].startswith(tmp_dir)]
+            self.assertEqual(len(cached), 32)
+
+    def test_kb_config_cached_until_reload(self):
+        """测试知识库完整配置及提示词按知识库缓存，reload后重建"""
+        kb_config = self.config.get_kb_config("policy_demo_kb")
+        cached = self.config._kb_full_config["policy_demo_kb"][0]
+        self.assertEqual(self.config.get_kb_config("policy_demo_kb"), kb_config)
+        self.assertIs(self.config._kb_full_config["policy_demo_kb"][0], cached)
+        self.assertTrue(self.config._prompt_cache)
+        
+        self.config.reload()
+        self.assertFalse(self.config._prompt_cache)
+        self.assertEqual(self.config.get_kb_config("policy_demo_kb"), kb_config)
+        self.assertIsNot(self.config._kb_full_config["policy_demo_kb"][0], cached)
+        
+    def test_kb_config_returns_independent_copy(self):
+        """测试修改返回的知识库配置不影响后续调用"""
+        kb_config = self.config.get_kb_config("policy_demo_kb")
+        expected = dict(kb_config)
+        kb_config["kb_name"] = "已修改"
+        kb_config["system_prompt"] = "已修改"
+        kb_config["extra"] = 1
+        
+        self.assertIsNot(self.config.get_kb_config("policy_demo_kb"), kb_config)
+        self.assertEqual(self.config.get_kb_config("policy_demo_kb"), expected)
+        
+    def test_prompt_file_reread_when_changed(self):
+        """测试提示词文件未变化时使用缓存，修改后重新读取"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prompts_dir = Path(tmp_dir) / "config" / "prompts"
+            prompts_dir.mkdir(parents=True)
+            prompt_file = prompts_dir / "demo.txt"
+            prompt_file.write_text("旧提示词", encoding='utf-8')
+            self.config.project_root = Path(tmp_dir)
+            
+            self.assertEqual(self.config._load_prompt_file("demo.txt"), "旧提示词")
+            self.assertIn("demo.txt", self.config._prompt_cache)
+            
+            prompt_file.write_text("新的提示词", encoding='utf-8')
+            self.assertEqual(self.config._load_prompt_file("demo.txt"), "新的提示词")
+            
+            prompt_file.unlink()
+            self.assertIn("智能助手", self.config._load_prompt_file("demo.txt"))
+
+
 class TestConfigFiles(unittest.TestCase):
     """配置文件测试类"""
     
@@ -0,0 +1,237 @@
+"""
+测试数据库管理器的连接复用与初始化
+"""
+import gc
+import sqlite3
+import threading
+import weakref
+import pytest
+from src.database import db_manager
+from src.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """创建使用临时数据库文件的数据库管理器"""
+    monkeypatch.setattr(db_manager, "DATABASE_FILE", str(tmp_path / "test.db"))
+    monkeypatch.setattr(db_manager, "DATABASE_DIR", tmp_path)
+    manager = DatabaseManager()
+    yield manager
+    manager.close_all()
+
+
+class TestConnectionReuse:
+    """测试持久连接"""
+
+    def test_connection_reused_within_thread(self, db):
+        """测试同一线程内复用同一连接"""
+        with db.get_connection() as first:
+            pass
+        with db.get_connection() as second:
+            assert second is first
+
+    def test_connection_per_thread(self, db):
+        """测试不同线程使用不同连接"""
+        with db.get_connection() as main_conn:
+            pass
+        other = []
+
+        def worker():
+            with db.get_connection() as conn:
+                other.append(conn)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert other and other[0] is not main_conn
+
+    def test_connection_closed_when_thread_ends(self, db):
+        """测试线程结束后其持久连接被关闭，短生命周期线程不累积连接"""
+        db.ensure_ready()
+        before = len(db._connections)
+        thread_conns = []
+
+        def worker():
+            with db.get_connection() as conn:
+                conn.execute("SELECT 1")
+                thread_conns.append(conn)
+
+        for _ in range(20):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        assert len(db._connections) == before
+        with pytest.raises(sqlite3.ProgrammingError):
+            thread_conns[0].execute("SELECT 1")
+
+    def test_unused_manager_released(self, tmp_path, monkeypatch):
+        """测试不再使用的管理器可被回收（不被atexit或线程连接常驻），其连接随之关闭"""
+        monkeypatch.setattr(db_manager, "DATABASE_FILE", str(tmp_path / "other.db"))
+        manager = DatabaseManager()
+        with manager.get_connection() as conn:
+            pass
+        with manager.get_reader_connection():
+            pass
+        assert manager in db_manager._live_managers
+
+        manager_ref = weakref.ref(manager)
+        del manager
+        gc.collect()
+        assert manager_ref() is None
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_connection_uses_configured_timeout(self, db, monkeypatch):
+        """测试连接超时取自SQLite配置"""
+        monkeypatch.setattr(db_manager, "_SQLITE_TIMEOUT", 0.5)
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 500
+
+    def test_wal_mode_enabled(self, db):
+        """测试连接启用WAL模式"""
+        assert db.execute_query("PRAGMA journal_mode")[0][0] == "wal"
+
+    def test_last_insert_id_on_same_connection(self, db):
+        """测试插入后在同一连接上获取最后插入ID"""
+        db.execute_update("INSERT INTO policies (title) VALUES (?)", ("测试政策",))
+        policy_id = db.get_last_insert_id()
+        assert db.execute_query("SELECT title FROM policies WHERE id = ?", (policy_id,))[0][0] == "测试政策"
+
+    def test_close_all(self, db):
+        """测试关闭所有连接后重新建立连接"""
+        with db.get_connection() as conn:
+            pass
+        db.close_all()
+        with db.get_connection() as new_conn:
+            assert new_conn is not conn
+        assert db.get_table_count("tags") > 0
+
+
+class TestInitialization:
+    """测试数据库初始化"""
+
+    def test_initialization_deferred_until_first_use(self, db):
+        """测试构造时不访问数据库，首次查询时才初始化"""
+        assert not db._ready
+        assert not db.db_file.exists()
+
+        assert db.table_exists("tags")
+        assert db._ready
+
+    def test_initial_tags_inserted_once(self, db):
+        """测试初始标签批量插入，重复初始化不产生重复数据"""
+        expected = len(DatabaseManager._get_initial_tags())
+        assert db.get_table_count("tags") == expected
+
+        db._init_tags()
+        assert db.get_table_count("tags") == expected
+
+    def test_schema_recreated_only_when_objects_missing(self, db):
+        """测试schema对象齐全时跳过建表，缺失时重新执行建表脚本"""
+        db.ensure_ready()
+        assert str(db.db_file) in DatabaseManager._schema_ready
+
+        db.execute_update("DROP INDEX idx_tags_level")
+        DatabaseManager._schema_ready.discard(str(db.db_file))
+        db._create_tables()
+
+        indexes = db.execute_query("SELECT name FROM sqlite_master WHERE type = 'index'")
+        assert "idx_tags_level" in {row[0] for row in indexes}
+        assert str(db.db_file) in DatabaseManager._schema_ready
+
+
+class TestQueryHelpers:
+    """测试查询辅助方法"""
+
+    def test_execute_scalar(self, db):
+        """测试标量查询返回首行首列，无结果时返回None"""
+        assert db.execute_scalar("SELECT COUNT(*) FROM policies") == 0
+        assert db.execute_scalar("SELECT id FROM tags WHERE name = ?", ("不存在",)) is None
+        assert db.get_table_count("policies") == 0
+
+    def test_execute_insert_returns_row_id(self, db):
+        """测试插入返回新行ID"""
+        first = db.execute_insert("INSERT INTO policies (title) VALUES (?)", ("政策一",))
+        second = db.execute_insert("INSERT INTO policies (title) VALUES (?)", ("政策二",))
+        assert second == first + 1
+        assert db.execute_scalar("SELECT title FROM policies WHERE id = ?", (second,)) == "政策二"
+
+    def test_table_exists_cached(self, db):
+        """测试表存在性缓存，新建/删除表后结果正确"""
+        assert db.table_exists("policies")
+        assert "policies" in db._tables
+        assert not db.table_exists("temp_table")
+
+        db.execute_update("CREATE TABLE temp_table (id INTEGER)")
+        assert db.table_exists("temp_table")
+
+        db.execute_update("DROP TABLE temp_table")
+        assert not db.table_exists("temp_table")
+
+    def test_table_name_validated(self, db):
+        """测试统计/清空表时校验表名"""
+        assert db.get_table_count("policies; DROP TABLE tags") == 0
+        assert db.table_exists("tags")
+        with pytest.raises(ValueError):
+            db.delete_all("no_such_table")
+
+    def test_backup(self, db):
+        """测试分批在线备份"""
+        db.execute_insert("INSERT INTO policies (title) VALUES (?)", ("备份政策",))
+        assert db.backup()
+
+        backup_file = db.db_file.parent / f"{db.db_file.stem}_backup.db"
+        with sqlite3.connect(str(backup_file)) as conn:
+            assert conn.execute("SELECT title FROM policies").fetchone()[0] == "备份政策"
+        conn.close()
+
+    def test_execute_many_in_single_transaction(self, db):
+        """测试批量写入在一个事务中提交，失败时整体回滚"""
+        rows = [(f"政策{i}",) for i in range(5)]
+        assert db.execute_many("INSERT INTO policies (title) VALUES (?)", rows) == 5
+        assert db.get_table_count("policies") == 5
+
+        with pytest.raises(sqlite3.IntegrityError):
+            db.execute_many("INSERT INTO policies (title, document_number) VALUES (?, ?)",
+                            [("政策A", "文号1"), ("政策B", "文号1")])
+        assert db.get_table_count("policies") == 5
+        with db.get_connection() as conn:
+            assert not conn.in_transaction
+
+    def test_reader_pool(self, db, monkeypatch):
+        """测试只读连接池：连接只读、归还后复用、数量不超过上限"""
+        monkeypatch.setattr(db_manager, "_READER_POOL_SIZE", 2)
+        db.execute_insert("INSERT INTO policies (title) VALUES (?)", ("政策",))
+
+        assert db.execute_query_ro("SELECT title FROM policies")[0][0] == "政策"
+        with db.get_reader_connection() as first:
+            with pytest.raises(sqlite3.OperationalError):
+                first.execute("DELETE FROM policies")
+            with db.get_reader_connection() as second:
+                assert second is not first
+        with db.get_reader_connection() as again:
+            assert again in (first, second)
+        assert db._reader_count == 2
+
+    def test_reader_not_returned_after_close_all(self, db):
+        """测试借出期间close_all重置连接池后，旧连接不会归还到新池"""
+        with db.get_reader_connection() as stale:
+            db.close_all()
+
+        with db.get_reader_connection() as conn:
+            assert conn is not stale
+            assert conn.execute("SELECT COUNT(*) FROM policies").fetchone()[0] == 0
+
+    def test_reader_pool_exhausted_times_out(self, db, monkeypatch):
+        """测试连接池耗尽时等待超时后报错而非无限阻塞"""
+        monkeypatch.setattr(db_manager, "_READER_POOL_SIZE", 1)
+        monkeypatch.setattr(db_manager, "_SQLITE_TIMEOUT", 0.1)
+
+        with db.get_reader_connection():
+            with pytest.raises(sqlite3.OperationalError):
+                with db.get_reader_connection():
+                    pass
+        with db.get_reader_connection() as conn:
+            assert conn.execute("SELECT 1").fetchone()[0] == 1
@@ -0,0 +1,251 @@
+"""
+测试知识图谱数据访问对象
+"""
+import sqlite3
+import threading
+import pytest
+from src.database import graph_dao
+from src.database.graph_dao import GraphDAO
+
+
+@pytest.fixture
+def dao(tmp_path):
+    """创建使用临时数据库文件的GraphDAO"""
+    return GraphDAO(str(tmp_path / "graph.db"))
+
+
+def _graph(node_ids, edges=()):
+    """构造测试图谱数据"""
+    return {
+        'nodes': [{'id': node_id, 'label': f"节点{node_id}"} for node_id in node_ids],
+        'edges': [{'from': source, 'to': target} for source, target in edges]
+    }
+
+
+class TestConnection:
+    """测试连接配置"""
+
+    def test_wal_mode_persisted(self, dao):
+        """测试建表后数据库处于WAL模式"""
+        conn = dao._connect()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        finally:
+            conn.close()
+
+    def test_autocommit_with_busy_timeout(self, dao):
+        """测试连接为自动提交模式并设置忙等待"""
+        conn = dao._connect()
+        try:
+            assert conn.isolation_level is None
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+        finally:
+            conn.close()
+
+    def test_write_waits_for_concurrent_writer(self, dao):
+        """测试另一连接持有写锁时，保存操作等待锁释放而非报错"""
+        blocker = sqlite3.connect(dao.db_path, isolation_level=None, check_same_thread=False)
+        blocker.execute("BEGIN IMMEDIATE")
+        timer = threading.Timer(0.2, blocker.commit)
+        timer.start()
+        try:
+            dao.save_graph(_graph(["a"]))
+        finally:
+            timer.join()
+            blocker.close()
+        assert dao.get_stats()['node_count'] == 1
+
+
+class TestSaveAndLoad:
+    """测试图谱保存与加载"""
+
+    def test_full_save_replaces_graph(self, dao):
+        """测试全量保存覆盖旧图谱"""
+        dao.save_graph(_graph(["a", "b"], [("a", "b")]))
+        dao.save_graph(_graph(["c"]))
+
+        loaded = dao.load_graph()
+        assert [node['id'] for node in loaded['nodes']] == ["c"]
+        assert dao.get_stats()['node_count'] == 1
+
+    def test_incremental_save_merges(self, dao):
+        """测试增量保存合并节点和边"""
+        dao.save_graph(_graph(["a", "b"], [("a", "b")]))
+        dao.save_graph(_graph(["b", "c"], [("b", "c")]), is_incremental=True)
+
+        loaded = dao.load_graph()
+        assert sorted(node['id'] for node in loaded['nodes']) == ["a", "b", "c"]
+        assert len(loaded['edges']) == 2
+        assert dao.get_stats()['edge_count'] == 2
+
+    @pytest.mark.parametrize("sql_merge", [True, False])
+    def test_incremental_merge_order_and_override(self, dao, monkeypatch, sql_merge):
+        """测试SQL合并与Python合并结果一致：新数据覆盖旧数据，保持首次出现的顺序"""
+        monkeypatch.setattr(graph_dao, "SQL_MERGE_AVAILABLE", sql_merge)
+        dao.save_graph({
+            'nodes': [{'id': 'a', 'label': '旧A'}, {'id': 'b', 'label': 'B'}, {'id': 1, 'label': '数字'}],
+            'edges': [{'from': 'a', 'to': 'b', 'label': '旧'}, {'from': 'b', 'to': 'a'}]
+        })
+        dao.save_graph({
+            'nodes': [{'id': 'c', 'label': 'C'}, {'id': 'a', 'label': '新A'}, {'id': '1', 'label': '字符'}],
+            'edges': [{'from': 'a', 'to': 'b', 'label': '新'}, {'from': 'c', 'to': 'a'}]
+        }, is_incremental=True)
+
+        loaded = dao.load_graph()
+        assert loaded['nodes'] == [
+            {'id': 'a', 'label': '新A'}, {'id': 'b', 'label': 'B'}, {'id': 1, 'label': '数字'},
+            {'id': 'c', 'label': 'C'}, {'id': '1', 'label': '字符'}
+        ]
+        assert loaded['edges'] == [
+            {'from': 'a', 'to': 'b', 'label': '新'}, {'from': 'b', 'to': 'a'}, {'from': 'c', 'to': 'a'}
+        ]
+        assert dao.get_stats()['node_count'] == 5
+
+    def test_full_save_overwrites_latest_row(self, dao):
+        """测试全量保存原地覆盖最新记录并清理增量历史"""
+        graph_id = dao.save_graph(_graph(["a"]))
+        dao.save_graph(_graph(["b"]), is_incremental=True)
+
+        assert dao.save_graph(_graph(["c"])) != graph_id
+        conn = dao._connect()
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM knowledge_graph").fetchone()[0] == 1
+        finally:
+            conn.close()
+        assert [node['id'] for node in dao.load_graph()['nodes']] == ["c"]
+
+    def test_failed_save_rolls_back(self, dao):
+        """测试保存失败时事务回滚，原图谱保持不变"""
+        dao.save_graph(_graph(["a"]))
+
+        with pytest.raises(Exception):
+            dao.save_graph({'nodes': [{'id': object()}], 'edges': []})
+        assert [node['id'] for node in dao.load_graph()['nodes']] == ["a"]
+
+    def test_empty_database(self, dao):
+        """测试空库加载与统计"""
+        assert dao.load_graph() is None
+        assert dao.get_stats()['node_count'] == 0
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_serialization_keeps_non_ascii(self, dao, monkeypatch, use_orjson):
+        """测试orjson与标准库json序列化结果一致且保留中文"""
+        if use_orjson and not graph_dao.ORJSON_AVAILABLE:
+            pytest.skip("orjson未安装")
+        monkeypatch.setattr(graph_dao, "ORJSON_AVAILABLE", use_orjson)
+        dao.save_graph(_graph(["政策"]))
+
+        conn = dao._connect()
+        try:
+            stored = conn.execute("SELECT json(graph_data) FROM knowledge_graph").fetchone()[0]
+        finally:
+            conn.close()
+        assert "节点政策" in stored
+        assert dao.load_graph()['nodes'][0]['label'] == "节点政策"
+
+    def test_existing_text_rows_readable(self, dao):
+        """测试以文本JSON存储的旧数据仍可加载"""
+        conn = dao._connect()
+        try:
+            conn.execute("INSERT INTO knowledge_graph (graph_data, node_count) VALUES (?, 1)",
+                         ('{"nodes": [{"id": "旧"}], "edges": []}',))
+            conn.commit()
+        finally:
+            conn.close()
+        assert dao.load_graph()['nodes'] == [{'id': "旧"}]
+
+
+class TestRemoveDuplicateNodes:
+    """测试remove_duplicate_nodes（SQL去重与Python去重结果一致）"""
+
+    @pytest.fixture(autouse=True, params=[True, False], ids=["sql", "python"])
+    def dedup_mode(self, request, monkeypatch):
+        """分别在SQL与Python去重路径下运行"""
+        monkeypatch.setattr(graph_dao, "SQL_MERGE_AVAILABLE", request.param)
+
+    def test_duplicates_merged_and_edges_remapped(self, dao):
+        """测试按去后缀label去重，边映射到保留节点并去除重复边"""
+        dao.save_graph({
+            'nodes': [
+                {'id': 'a', 'label': '政策.pdf', 'title': '📄 文档: 政策.pdf'},
+                {'id': 'b', 'label': '政策.docx', 'title': ''},
+                {'id': 'c', 'label': '财政部', 'title': ''},
+            ],
+            'edges': [
+                {'from': 'a', 'to': 'c', 'type': 'issued_by'},
+                {'from': 'b', 'to': 'c', 'type': 'issued_by'},
+                {'from': 'c', 'to': 'x', 'type': 'issued_by'},
+            ]
+        })
+
+        assert dao.remove_duplicate_nodes() == {'removed_nodes': 1, 'removed_edges': 2}
+        loaded = dao.load_graph()
+        assert loaded['nodes'][0]['label'] == '政策'
+        assert loaded['nodes'][0]['title'] == '📄 文档: 政策'
+        assert loaded['edges'] == [{'from': 'a', 'to': 'c', 'type': 'issued_by'}]
+
+    def test_extra_keys_and_edge_cases_preserved(self, dao):
+        """测试保留顶层其他字段，去除首尾空白，丢弃指向缺失节点的边"""
+        dao.save_graph({
+            'nodes': [
+                {'id': 'a', 'label': ' 报告.docx　', 'size': 3},
+                {'id': 'b', 'label': '报告'},
+                {'id': 2, 'label': '数字'},
+            ],
+            'edges': [
+                {'from': 'b', 'to': 2, 'type': 'x'},
+                {'from': 'a', 'to': 2, 'type': 'x'},
+                {'from': 'a', 'to': 2, 'type': 'y'},
+                {'from': 'a'},
+            ],
+            'meta': {'source': '测试'}
+        })
+
+        assert dao.remove_duplicate_nodes() == {'removed_nodes': 1, 'removed_edges': 2}
+        loaded = dao.load_graph()
+        assert loaded['meta'] == {'source': '测试'}
+        assert loaded['nodes'] == [
+            {'id': 'a', 'label': '报告', 'size': 3, 'title': ''},
+            {'id': 2, 'label': '数字', 'title': ''},
+        ]
+        assert loaded['edges'] == [
+            {'from': 'a', 'to': 2, 'type': 'x'},
+            {'from': 'a', 'to': 2, 'type': 'y'},
+        ]
+        assert dao.get_stats()['node_count'] == 2
+
+    def test_edge_key_does_not_collide_with_label(self, dao):
+        """测试边去重与节点label互不干扰"""
+        dao.save_graph({
+            'nodes': [{'id': 'a', 'label': 'a->b-'}, {'id': 'b', 'label': 'b'}],
+            'edges': [{'from': 'a', 'to': 'b'}]
+        })
+
+        assert dao.remove_duplicate_nodes() == {'removed_nodes': 0, 'removed_edges': 0}
+        assert len(dao.load_graph()['edges']) == 1
+
+    def test_skips_parse_when_unchanged_since_last_run(self, dao, monkeypatch):
+        """测试上次去重后图谱未写入时不再解析图谱，写入后重新去重"""
+        dao.save_graph({'nodes': [{'id': 'a', 'label': 'A'}, {'id': 'b', 'label': 'A.pdf'}], 'edges': []})
+        assert dao.remove_duplicate_nodes()['removed_nodes'] == 1
+
+        monkeypatch.setattr(graph_dao, "_loads", lambda text: pytest.fail("不应解析图谱"))
+        assert dao.remove_duplicate_nodes() == {'removed_nodes': 0, 'removed_edges': 0}
+        monkeypatch.undo()
+
+        dao.save_graph({'nodes': [{'id': 'c', 'label': 'A'}], 'edges': []}, is_incremental=True)
+        assert dao.remove_duplicate_nodes()['removed_nodes'] == 1
+
+    def test_adds_flag_column_to_existing_table(self, tmp_path):
+        """测试旧表自动补充去重标记列"""
+        db_path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE knowledge_graph (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "graph_data TEXT NOT NULL, node_count INTEGER DEFAULT 0, edge_count INTEGER DEFAULT 0, "
+                     "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.close()
+
+        dao = GraphDAO(db_path)
+        dao.save_graph(_graph(["a"]))
+        assert dao.remove_duplicate_nodes() == {'removed_nodes': 0, 'removed_edges': 0}
@@ -0,0 +1,133 @@
+"""
+测试知识图谱数据模型
+"""
+import pytest
+from src.models.graph import PolicyGraph, GraphNode, GraphEdge, NodeType, RelationType
+
+
+def _build_graph(node_ids, edges=()):
+    """构造测试图谱，edges为 (源, 目标, 关系类型) 列表"""
+    graph = PolicyGraph()
+    for node_id in node_ids:
+        graph.add_node(GraphNode(node_id=node_id, label=f"节点{node_id}", node_type=NodeType.POLICY))
+    for source, target, relation in edges:
+        graph.add_edge(GraphEdge(source_id=source, target_id=target, relation_type=relation))
+    return graph
+
+
+class TestRelatedNodes:
+    """测试关联节点查询"""
+
+    def test_both_directions_in_edge_order(self):
+        """测试返回出边和入边的相邻节点，按边的添加顺序排列"""
+        graph = _build_graph(["a", "b", "c", "d"], [
+            ("a", "b", RelationType.ISSUED_BY),
+            ("c", "a", RelationType.REFERENCES),
+            ("b", "c", RelationType.REFERENCES),
+            ("a", "d", RelationType.REFERENCES),
+        ])
+
+        related = [(node.node_id, relation) for node, relation in graph.get_related_nodes("a")]
+        assert related == [
+            ("b", RelationType.ISSUED_BY),
+            ("c", RelationType.REFERENCES),
+            ("d", RelationType.REFERENCES),
+        ]
+
+    def test_filter_by_relation_type(self):
+        """测试按关系类型过滤"""
+        graph = _build_graph(["a", "b", "c"], [
+            ("a", "b", RelationType.ISSUED_BY),
+            ("a", "c", RelationType.REFERENCES),
+        ])
+
+        related = graph.get_related_nodes("a", RelationType.REFERENCES)
+        assert [node.node_id for node, _ in related] == ["c"]
+
+    def test_unknown_node_and_clear(self):
+        """测试不存在的节点返回空列表，清空图谱后索引同步清空"""
+        graph = _build_graph(["a", "b"], [("a", "b", RelationType.ISSUED_BY)])
+        assert graph.get_related_nodes("x") == []
+
+        graph.clear()
+        assert graph.get_related_nodes("a") == []
+        graph.add_node(GraphNode(node_id="a", label="A"))
+        graph.add_node(GraphNode(node_id="b", label="B"))
+        assert graph.add_edge(GraphEdge(source_id="a", target_id="b", relation_type=RelationType.ISSUED_BY))
+
+
+def test_duplicate_edges_rejected():
+    """测试相同 (源, 目标, 关系类型) 的边只添加一次"""
+    graph = _build_graph(["a", "b"])
+
+    assert graph.add_edge(GraphEdge(source_id="a", target_id="b", relation_type=RelationType.ISSUED_BY))
+    assert not graph.add_edge(GraphEdge(source_id="a", target_id="b", relation_type=RelationType.ISSUED_BY))
+    assert graph.add_edge(GraphEdge(source_id="a", target_id="b", relation_type=RelationType.REFERENCES))
+    assert graph.add_edge(GraphEdge(source_id="b", target_id="a", relation_type=RelationType.ISSUED_BY))
+    assert graph.get_edge_count() == 3
+    assert len(graph.get_related_nodes("a")) == 3
+
+
+class TestStatsCache:
+    """测试统计信息缓存"""
+
+    def test_cached_until_mutation(self, monkeypatch):
+        """测试图谱未变化时复用统计结果，增加节点/边或清空后重新计算"""
+        graph = _build_graph(["a", "b"], [("a", "b", RelationType.ISSUED_BY)])
+        stats = graph.get_stats()
+        assert stats['number_of_connected_components'] == 1
+
+        monkeypatch.setattr("src.models.graph.fast_connected_components",
+                            lambda g: pytest.fail("不应重新计算"))
+        assert graph.get_stats() == stats
+        monkeypatch.undo()
+
+        graph.add_node(GraphNode(node_id="c", label="C"))
+        assert graph.get_stats()['number_of_connected_components'] == 2
+        graph.add_edge(GraphEdge(source_id="b", target_id="c", relation_type=RelationType.REFERENCES))
+        assert graph.get_stats()['edge_count'] == 2
+        graph.clear()
+        assert graph.get_stats()['node_count'] == 0
+
+    def test_diameter_only_on_request(self):
+        """测试默认不计算直径，显式请求时计算并缓存"""
+        graph = _build_graph(["a", "b", "c"], [
+            ("a", "b", RelationType.ISSUED_BY),
+            ("b", "c", RelationType.ISSUED_BY),
+        ])
+
+        assert graph.get_stats()['diameter'] is None
+        assert graph.get_stats(compute_diameter=True)['diameter'] == 2
+        assert graph.get_stats()['diameter'] == 2
+        assert graph.to_dict()['stats']['node_count'] == 3
+
+    def test_version_unique_across_graphs(self):
+        """测试版本号在不同图谱对象间不重复，修改图谱后改变"""
+        first = _build_graph(["a"])
+        second = _build_graph(["a"])
+        assert first.version != second.version
+
+        version = first.version
+        first.add_node(GraphNode(node_id="b", label="B"))
+        assert first.version != version
+
+        version = first.version
+        assert not first.add_node(GraphNode(node_id="b", label="B"))
+        assert first.version == version
+
+    def test_returned_stats_are_independent(self):
+        """测试修改返回的字典不影响缓存"""
+        graph = _build_graph(["a"])
+        graph.get_stats()['node_count'] = 99
+        assert graph.get_stats()['node_count'] == 1
+
+
+def test_nodes_and_edges_use_slots():
+    """测试节点和边对象不带实例__dict__"""
+    node = GraphNode(node_id="a", label="A")
+    edge = GraphEdge(source_id="a", target_id="b", relation_type=RelationType.ISSUED_BY)
+
+    assert not hasattr(node, "__dict__") and not hasattr(edge, "__dict__")
+    node.set_attribute("policy_id", 1)
+    assert node.get_attribute("policy_id") == 1
+    assert edge.label == RelationType.ISSUED_BY.value
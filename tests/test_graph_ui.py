@@ -0,0 +1,64 @@
+"""
+测试知识图谱UI组件
+"""
+import json
+import re
+import networkx as nx
+from src.components.graph_ui import _build_network_html, _graph_content_sha1, compute_graph_stats
+
+
+def _vis_dataset(html: str, name: str):
+    """从生成的HTML中提取vis.js的节点/边数据"""
+    match = re.search(rf'{name} = new vis.DataSet\((.*?)\);', html)
+    return json.loads(match.group(1))
+
+
+def _graph():
+    """构造带节点类型和边标签的测试图"""
+    graph = nx.Graph()
+    graph.add_node("policy_1", label="政策A", type="policy")
+    graph.add_node("auth_1", label="财政部", type="authority")
+    graph.add_edge("policy_1", "auth_1", label="发布", relation_type="issued_by")
+    return graph
+
+
+class TestBuildNetworkHtml:
+    """测试网络图HTML生成"""
+
+    def test_edge_label_and_attributes_kept(self):
+        """测试边标签显示在边上，关系类型等属性原样传入"""
+        graph = _graph()
+        html = _build_network_html(_graph_content_sha1(graph), graph)
+
+        edge = _vis_dataset(html, "edges")[0]
+        assert edge['label'] == "发布"
+        assert edge['title'] == "发布"
+        assert edge['relation_type'] == "issued_by"
+        assert {edge['from'], edge['to']} == {"policy_1", "auth_1"}
+
+    def test_node_attributes_kept(self):
+        """测试节点类型等额外属性原样传入"""
+        graph = _graph()
+        html = _build_network_html(_graph_content_sha1(graph), graph)
+
+        nodes = {node['id']: node for node in _vis_dataset(html, "nodes")}
+        assert nodes["auth_1"]['label'] == "财政部"
+        assert nodes["auth_1"]['type'] == "authority"
+
+    def test_fingerprint_covers_all_attributes(self):
+        """测试节点/边的任一属性变化都会改变内容指纹"""
+        graph = _graph()
+        fingerprint = _graph_content_sha1(graph)
+
+        graph.edges["policy_1", "auth_1"]['relation_type'] = "references"
+        assert _graph_content_sha1(graph) != fingerprint
+
+
+def test_graph_stats_keyed_on_content():
+    """测试统计结果按图内容缓存，图变化后重新计算"""
+    graph = _graph()
+    stats = compute_graph_stats(graph)
+    assert (stats['node_count'], stats['edge_count'], stats['diameter']) == (2, 1, 1)
+
+    graph.add_edge("auth_1", "region_1")
+    assert compute_graph_stats(graph)['node_count'] == 3
@@ -0,0 +1,196 @@
+"""
+测试政策数据访问对象
+"""
+import json
+import pytest
+from src.database import db_manager
+from src.database.db_manager import DatabaseManager
+from src.database.policy_dao import PolicyDAO, _build_update_sql
+
+
+@pytest.fixture
+def dao(tmp_path, monkeypatch):
+    """创建使用临时数据库文件的PolicyDAO"""
+    monkeypatch.setattr(db_manager, "DATABASE_FILE", str(tmp_path / "test.db"))
+    monkeypatch.setattr(db_manager, "DATABASE_DIR", tmp_path)
+    manager = DatabaseManager()
+    monkeypatch.setattr("src.database.policy_dao.get_db_manager", lambda: manager)
+    yield PolicyDAO()
+    manager.close_all()
+
+
+class TestBulkWrites:
+    """测试批量写入"""
+
+    def test_add_policy_tags_bulk(self, dao):
+        """测试批量添加标签，重复标签按INSERT OR REPLACE覆盖"""
+        policy_id = dao.create_policy({'title': '政策'})
+        first_tag = dao.get_or_create_tag("标签一")
+        second_tag = dao.get_or_create_tag("标签二")
+
+        assert dao.add_policy_tags_bulk(policy_id, [(first_tag, 0.5, 'auto'), (second_tag, 0.8, 'manual')]) == 2
+        assert dao.add_policy_tags_bulk(policy_id, [(first_tag, 0.9, 'manual')]) == 1
+        assert dao.add_policy_tags_bulk(policy_id, []) == 0
+
+        tags = {tag['name']: tag for tag in dao.get_policy_tags(policy_id)}
+        assert tags["标签一"]['confidence'] == 0.9
+        assert tags["标签二"]['source'] == 'manual'
+
+    def test_add_policy_relations_bulk(self, dao):
+        """测试批量添加政策关系"""
+        source = dao.create_policy({'title': '新政策'})
+        targets = [dao.create_policy({'title': f'旧政策{i}'}) for i in range(3)]
+
+        items = [(target, 'replaces', '', 1.0) for target in targets]
+        assert dao.add_policy_relations_bulk(source, items) == 3
+
+        relations = dao.get_policy_relations(source)
+        assert sorted(relation['target_title'] for relation in relations) == ['旧政策0', '旧政策1', '旧政策2']
+
+    def test_get_or_create_tag_returns_id(self, dao):
+        """测试新建标签返回ID，再次获取返回同一ID"""
+        tag_id = dao.get_or_create_tag("新标签", "special_bonds")
+        assert isinstance(tag_id, int)
+        assert dao.get_or_create_tag("新标签") == tag_id
+
+
+class TestGetPolicies:
+    """测试政策列表查询"""
+
+    def test_default_columns_skip_content(self, dao):
+        """测试列表查询默认不返回政策全文"""
+        dao.create_policy({'title': '政策', 'content': '全文', 'expiration_date': '2030-01-01'})
+
+        policy = dao.get_policies()[0]
+        assert 'content' not in policy
+        assert policy['title'] == '政策'
+        assert policy['expiration_date'] == '2030-01-01'
+
+    def test_explicit_columns(self, dao):
+        """测试按指定列返回，未知列报错"""
+        dao.create_policy({'title': '政策', 'content': '全文'})
+
+        assert dao.get_policies(columns=('id', 'content')) == [{'id': 1, 'content': '全文'}]
+        with pytest.raises(ValueError):
+            dao.get_policies(columns=('id', 'content; DROP TABLE policies'))
+
+    def test_filtered_listing_uses_composite_index(self, dao):
+        """测试按类型过滤并按发布日期排序时使用复合索引，无需临时排序"""
+        dao.get_policies()
+        plan = dao.db.execute_query(
+            "EXPLAIN QUERY PLAN SELECT id FROM policies WHERE policy_type = ? "
+            "ORDER BY publish_date DESC LIMIT 10", ('special_bonds',))
+        details = " ".join(row[3] for row in plan)
+        assert "idx_policies_type_pubdate" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestQueryCache:
+    """测试列表/计数查询缓存"""
+
+    def test_repeated_query_served_from_cache(self, dao, monkeypatch):
+        """测试相同查询第二次不访问数据库"""
+        dao.create_policy({'title': '政策', 'policy_type': 'special_bonds'})
+        filters = {'policy_type': 'special_bonds'}
+        assert dao.count_policies(filters) == 1
+        first = dao.get_policies(filters)
+
+        monkeypatch.setattr(dao.db, "execute_query_ro", lambda *args: pytest.fail("缓存未命中"))
+        assert dao.count_policies(filters) == 1
+        assert dao.get_policies(filters) == first
+
+    def test_writes_invalidate_cache(self, dao):
+        """测试创建/更新/删除政策后缓存失效"""
+        policy_id = dao.create_policy({'title': '政策', 'status': 'active'})
+        assert dao.count_policies({'status': 'active'}) == 1
+
+        dao.update_policy(policy_id, {'status': 'expired'})
+        assert dao.count_policies({'status': 'active'}) == 0
+        assert dao.get_policies()[0]['status'] == 'expired'
+
+        dao.delete_policy(policy_id)
+        assert dao.get_policies() == []
+
+    def test_returned_rows_are_independent(self, dao):
+        """测试修改返回的字典不影响缓存"""
+        dao.create_policy({'title': '政策'})
+        dao.get_policies()[0]['title'] = '已修改'
+        assert dao.get_policies()[0]['title'] == '政策'
+
+
+def test_log_processing_bulk(dao):
+    """测试批量记录处理日志"""
+    policy_id = dao.create_policy({'title': '政策'})
+    entries = [(policy_id, 'tag', 'success', f'步骤{i}', '', i) for i in range(3)]
+
+    assert dao.log_processing_bulk(entries) == 3
+    assert dao.log_processing_bulk([]) == 0
+    assert dao.log_processing(None, 'upload', 'failed', error_detail='错误')
+    assert len(dao.get_processing_logs(policy_id)) == 3
+    assert len(dao.get_processing_logs()) == 4
+
+
+class TestJsonOutput:
+    """测试由SQLite直接生成JSON的接口"""
+
+    def test_get_stats_json(self, dao):
+        """测试统计JSON及其字典包装"""
+        dao.create_policy({'title': '政策一', 'policy_type': 'special_bonds'})
+        dao.create_policy({'title': '政策二', 'policy_type': 'special_bonds', 'status': 'expired'})
+        dao.create_policy({'title': '政策三'})
+
+        assert json.loads(dao.get_stats_json()) == {
+            'total': 3,
+            'by_type': {'special_bonds': 2, 'null': 1},
+            'by_status': {'active': 2, 'expired': 1}
+        }
+        assert dao.get_stats() == {
+            'total': 3,
+            'by_type': {'special_bonds': 2, None: 1},
+            'by_status': {'active': 2, 'expired': 1}
+        }
+
+    def test_get_stats_keeps_null_distinct(self, dao):
+        """测试get_stats中空类型归入None键，与字面值'null'分开统计"""
+        dao.create_policy({'title': '政策一'})
+        dao.create_policy({'title': '政策二', 'policy_type': 'null'})
+
+        assert dao.get_stats()['by_type'] == {None: 1, 'null': 1}
+
+    def test_get_policies_json_matches_dicts(self, dao):
+        """测试政策列表JSON与get_policies结果一致"""
+        dao.create_policy({'title': '政策一', 'publish_date': '2024-01-01'})
+        dao.create_policy({'title': '政策二', 'publish_date': '2024-06-01'})
+
+        assert json.loads(dao.get_policies_json()) == dao.get_policies()
+        assert json.loads(dao.get_policies_json(limit=1, columns=('title',))) == [{'title': '政策二'}]
+
+    def test_empty_json(self, dao):
+        """测试空表返回空JSON"""
+        assert dao.get_policies_json() == '[]'
+        assert dao.get_stats() == {'total': 0, 'by_type': {}, 'by_status': {}}
+
+
+def test_update_policy_reuses_sql_for_same_fields(dao):
+    """测试字段组合相同（顺序不同）的更新复用同一条SQL"""
+    policy_id = dao.create_policy({'title': '政策'})
+    _build_update_sql.cache_clear()
+
+    assert dao.update_policy(policy_id, {'status': 'expired', 'region': '北京'})
+    assert dao.update_policy(policy_id, {'region': '上海', 'status': 'active'})
+    assert _build_update_sql.cache_info().misses == 1
+
+    policy = dao.get_policy_by_id(policy_id)
+    assert (policy['region'], policy['status']) == ('上海', 'active')
+    assert not dao.update_policy(policy_id, {})
+
+
+def test_processing_logs_use_policy_time_index(dao):
+    """测试按政策查询日志时使用(policy_id, created_at)索引，无需临时排序"""
+    dao.get_processing_logs(1)
+    plan = dao.db.execute_query(
+        "EXPLAIN QUERY PLAN SELECT * FROM processing_logs WHERE 1=1 AND policy_id = ? "
+        "ORDER BY created_at DESC LIMIT ?", (1, 10))
+    details = " ".join(row[3] for row in plan)
+    assert "idx_logs_policy_time" in details
+    assert "TEMP B-TREE" not in details
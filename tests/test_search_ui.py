@@ -0,0 +1,270 @@
+"""
+测试搜索UI中的实体匹配与子图构建
+"""
+import dataclasses
+import json
+import pytest
+from src.components.search_ui import (
+    fuzzy_match_entities_to_nodes,
+    build_subgraph_for_entities,
+    extract_entities_from_policy,
+    _build_result_card_html,
+    _build_graph_html,
+    _get_norm_index,
+    _match_and_subgraph,
+    _build_result_preview_html
+)
+from src.models.graph import PolicyGraph, GraphNode, GraphEdge, NodeType, RelationType
+
+
+class TestFuzzyMatchEntities:
+    """测试fuzzy_match_entities_to_nodes"""
+
+    @pytest.fixture
+    def graph(self):
+        """创建测试图谱"""
+        graph = PolicyGraph()
+        for node_id, label, node_type in [
+            ("auth_1", "国家发展改革委", NodeType.AUTHORITY),
+            ("auth_2", "财政部", NodeType.AUTHORITY),
+            ("region_1", "北京", NodeType.REGION),
+            ("concept_1", "专项债券", NodeType.CONCEPT),
+            ("concept_2", "Data Assets", NodeType.CONCEPT),
+        ]:
+            graph.add_node(GraphNode(node_id=node_id, label=label, node_type=node_type))
+        return graph
+
+    def test_exact_match(self, graph):
+        """测试精确匹配"""
+        assert fuzzy_match_entities_to_nodes(["财政部"], graph) == ["auth_2"]
+
+    def test_case_insensitive_match(self, graph):
+        """测试大小写不敏感匹配"""
+        assert fuzzy_match_entities_to_nodes(["data assets"], graph) == ["concept_2"]
+
+    def test_prefix_cleaned_match(self, graph):
+        """测试去前缀匹配"""
+        result = fuzzy_match_entities_to_nodes(["中华人民共和国发展改革委"], graph)
+        assert result == ["auth_1"]
+
+    def test_containment_match(self, graph):
+        """测试包含匹配（双向）"""
+        result = fuzzy_match_entities_to_nodes(["北京市专项债券管理办法"], graph)
+        assert sorted(result) == ["concept_1", "region_1"]
+
+        assert fuzzy_match_entities_to_nodes(["专项债"], graph) == ["concept_1"]
+
+    def test_exact_match_skips_containment(self, graph):
+        """测试精确匹配命中后不再进行包含匹配"""
+        graph.add_node(GraphNode(node_id="concept_3", label="专项债券管理", node_type=NodeType.CONCEPT))
+
+        assert fuzzy_match_entities_to_nodes(["专项债券"], graph) == ["concept_1"]
+
+    def test_no_match_and_empty_entities(self, graph):
+        """测试无匹配及空实体"""
+        assert fuzzy_match_entities_to_nodes(["上海"], graph) == []
+        assert fuzzy_match_entities_to_nodes(["", None], graph) == []
+
+    def test_duplicate_matches_are_collapsed(self, graph):
+        """测试多个实体匹配同一节点时只返回一次"""
+        result = fuzzy_match_entities_to_nodes(["财政部", "财政部", "财政"], graph)
+        assert result == ["auth_2"]
+
+    def test_ngram_fallback_consistent(self, graph):
+        """测试未使用自动机（n-gram索引）时包含匹配结果一致"""
+        index = dataclasses.replace(_get_norm_index(graph), label_automaton=None)
+        for entities in (["北京市专项债券管理办法"], ["专项债"], ["Assets", "京"], ["上海"]):
+            assert (sorted(fuzzy_match_entities_to_nodes(entities, graph, index)) ==
+                    sorted(fuzzy_match_entities_to_nodes(entities, graph)))
+
+    def test_norm_index_cached_and_invalidated(self, graph):
+        """测试规范化索引按图缓存，图谱版本变化后重建"""
+        index = _get_norm_index(graph)
+        assert _get_norm_index(graph) is index
+
+        graph.add_node(GraphNode(node_id="region_2", label="上海", node_type=NodeType.REGION))
+        assert _get_norm_index(graph) is not index
+        assert fuzzy_match_entities_to_nodes(["上海"], graph) == ["region_2"]
+
+
+class TestBuildSubgraphForEntities:
+    """测试build_subgraph_for_entities"""
+
+    @pytest.fixture
+    def graph(self):
+        """创建星形测试图谱：hub连接leaf_0..leaf_9，另有一个孤立的远端节点对"""
+        graph = PolicyGraph()
+        graph.add_node(GraphNode(node_id="hub", label="中心", node_type=NodeType.CONCEPT))
+        for i in range(10):
+            graph.add_node(GraphNode(node_id=f"leaf_{i}", label=f"叶子{i}"))
+            graph.add_edge(GraphEdge(source_id="hub", target_id=f"leaf_{i}",
+                                     relation_type=RelationType.RELATES_TO))
+        # leaf_0 与 leaf_1 相连，使其度数更高
+        graph.add_edge(GraphEdge(source_id="leaf_1", target_id="leaf_0",
+                                 relation_type=RelationType.REFERENCES))
+        graph.add_node(GraphNode(node_id="far_a", label="远端A"))
+        graph.add_node(GraphNode(node_id="far_b", label="远端B"))
+        graph.add_edge(GraphEdge(source_id="far_a", target_id="far_b",
+                                 relation_type=RelationType.RELATES_TO))
+        return graph
+
+    def test_includes_neighbors_and_internal_edges(self, graph):
+        """测试包含1跳邻居及子图内部的全部边"""
+        subgraph = build_subgraph_for_entities(graph, ["hub"])
+
+        assert set(subgraph.nodes) == {"hub"} | {f"leaf_{i}" for i in range(10)}
+        edge_keys = {(e.source_id, e.target_id) for e in subgraph.edges}
+        assert ("leaf_1", "leaf_0") in edge_keys
+        assert ("far_a", "far_b") not in edge_keys
+        assert len(subgraph.edges) == 11
+
+    def test_max_nodes_keeps_highest_degree_neighbors(self, graph):
+        """测试超出节点上限时优先保留高度数邻居"""
+        subgraph = build_subgraph_for_entities(graph, ["hub"], max_nodes=3)
+
+        assert set(subgraph.nodes) == {"hub", "leaf_0", "leaf_1"}
+        assert len(subgraph.edges) == 3
+
+    def test_empty_input(self, graph):
+        """测试空实体列表"""
+        assert build_subgraph_for_entities(graph, []).get_node_count() == 0
+
+
+class TestResultCardHtml:
+    """测试_build_result_card_html"""
+
+    def test_fields_are_escaped_and_summary_truncated(self):
+        """测试字段转义及摘要截断"""
+        result = {
+            'title': '<script>alert(1)</script>',
+            'document_number': '财预〔2024〕1号',
+            'summary': '长' * 250,
+            'tags': [{'name': 'a&b'}, 'c', {'name': 'd'}, 'e']
+        }
+        card = _build_result_card_html(2, result)
+
+        assert card.startswith("<h3>2. &lt;script&gt;")
+        assert "<script>" not in card
+        assert "📄 财预〔2024〕1号" in card
+        assert '长' * 200 + '...' in card and '长' * 201 not in card
+        assert "🔹 a&amp;b 🔹 c 🔹 d" in card and "🔹 e" not in card
+
+    def test_optional_fields_omitted(self):
+        """测试缺失字段不输出对应段落"""
+        assert _build_result_card_html(1, {'title': '标题', 'summary': None}) == "<h3>1. 标题</h3>"
+
+
+class TestBuildGraphHtml:
+    """测试_build_graph_html"""
+
+    def _extract_data(self, html_content):
+        """从HTML中取出注入的图谱数据"""
+        start = html_content.index("var data = ") + len("var data = ")
+        end = html_content.index(";\n", start)
+        return json.loads(html_content[start:end])
+
+    def test_injects_data_into_template(self):
+        """测试节点/边/高亮样式注入模板"""
+        html_content = _build_graph_html(
+            (("a", "财政部", "authority"), ("b", "北京", "region")),
+            (("a", "b", "applies_to"),),
+            ("a",)
+        )
+        data = self._extract_data(html_content)
+
+        assert "{{DATA}}" not in html_content
+        assert data['nodes'][0] == {
+            'id': 'a', 'label': '财政部', 'color': '#FF8C00', 'size': 30, 'title': 'authority: 财政部'
+        }
+        assert data['nodes'][1]['color'] == '#4169E1'
+        assert data['edges'] == [{'from': 'a', 'to': 'b', 'title': 'applies_to'}]
+        assert data['options']['physics'] == {'enabled': False}
+
+    def test_physics_iterations_scale_with_size(self):
+        """测试较大图按节点数设置稳定迭代次数"""
+        nodes = tuple((f"n{i}", f"节点{i}", "concept") for i in range(9))
+        data = self._extract_data(_build_graph_html(nodes, (), ()))
+        assert data['options']['physics']['stabilization']['iterations'] == 90
+
+    def test_script_close_tag_escaped(self):
+        """测试标签中的 </script> 不会结束脚本"""
+        html_content = _build_graph_html((("x", "</script><b>", "concept"),), (), ())
+        assert html_content.count("</script>") == 2
+
+
+def test_extract_entities_deduplicated():
+    """测试提取的实体去重且保持顺序"""
+    policy = {
+        'title': '北京',
+        'issuing_authority': '财政部',
+        'region': '北京',
+        'tags': [{'name': '财政部'}, '专项债券', {'name': ''}]
+    }
+    assert extract_entities_from_policy(policy) == ['北京', '财政部', '专项债券']
+
+
+def test_match_cache_keyed_on_graph_content():
+    """测试重建的图谱节点数相同但标签不同时，匹配结果不复用旧图谱的缓存"""
+    policy = {'title': '政策', 'issuing_authority': '财政部'}
+
+    def build(label):
+        graph = PolicyGraph()
+        graph.add_node(GraphNode(node_id="auth_1", label=label, node_type=NodeType.AUTHORITY))
+        return graph
+
+    old_graph = build("财政部")
+    assert _match_and_subgraph(policy, old_graph.version, old_graph)[1] == ["auth_1"]
+
+    new_graph = build("人民银行")
+    assert new_graph.version != old_graph.version
+    assert _match_and_subgraph(policy, new_graph.version, new_graph)[1] == []
+
+
+def test_result_preview_html_escaped():
+    """测试结果预览HTML包含元数据与截断摘要，并转义特殊字符"""
+    preview = _build_result_preview_html({
+        'issuing_authority': '<财政部>',
+        'publish_date': '2024-01-01',
+        'summary': '摘' * 250
+    })
+    assert '&lt;财政部&gt;' in preview
+    assert '2024-01-01' in preview
+    assert '摘' * 200 + '...' in preview and '摘' * 201 not in preview
+    assert _build_result_preview_html({}) == ''
+
+
+def _preview_app():
+    """渲染单条结果预览的测试应用（统计实体匹配调用次数）"""
+    import streamlit as st
+    from src.components import search_ui
+    from src.models.graph import PolicyGraph, GraphNode, NodeType
+
+    calls = st.session_state.setdefault("match_calls", [])
+    original = search_ui._match_and_subgraph
+
+    def counting_match(*args, **kwargs):
+        calls.append(args[0]['id'])
+        return original(*args, **kwargs)
+
+    search_ui._match_and_subgraph = counting_match
+    try:
+        graph = PolicyGraph()
+        graph.add_node(GraphNode(node_id="auth_1", label="财政部", node_type=NodeType.AUTHORITY))
+        search_ui.render_result_preview({'id': 1, 'title': '政策', 'issuing_authority': '财政部'}, graph, "0_1")
+    finally:
+        search_ui._match_and_subgraph = original
+
+
+def test_result_preview_graph_loaded_on_demand():
+    """测试搜索历史中的结果预览只在点击按钮后才匹配实体并渲染图谱"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(_preview_app).run()
+    assert not app.exception
+    assert app.session_state["match_calls"] == []
+    assert [button.label for button in app.button] == ["🔗 显示知识图谱"]
+
+    app.button[0].click().run()
+    assert not app.exception
+    assert app.session_state["match_calls"]
+    assert "✅ 匹配到 1 个实体节点" in [caption.value for caption in app.caption]
@@ -0,0 +1,223 @@
+"""
+测试标签数据模型
+"""
+import copy
+import pickle
+import pytest
+from src.models.tag import Tag, TagHierarchy
+
+
+def _build_hierarchy():
+    """构造测试标签体系：两个政策类型，各含二、三级标签"""
+    bonds = Tag(id=1, name='专项债', level=1, policy_type='special_bonds')
+    issue = Tag(id=2, name='发行管理', level=2, policy_type='special_bonds')
+    quota = Tag(id=3, name='额度', level=3, policy_type='special_bonds')
+    usage = Tag(id=4, name='资金使用', level=2, policy_type='special_bonds')
+    franchise = Tag(id=5, name='特许经营', level=1, policy_type='franchise')
+    bidding = Tag(id=6, name='招标', level=2, policy_type='franchise')
+
+    hierarchy = TagHierarchy()
+    hierarchy.add_tag(bonds)
+    hierarchy.add_tag(franchise)
+    bonds.add_child(issue)
+    issue.add_child(quota)
+    bonds.add_child(usage)
+    franchise.add_child(bidding)
+    return hierarchy
+
+
+class TestTraversal:
+    """测试标签树遍历"""
+
+    def test_flattened_tags_in_preorder(self):
+        """测试扁平化结果按先序排列"""
+        names = [tag.name for tag in _build_hierarchy().get_flattened_tags()]
+        assert names == ['专项债', '发行管理', '额度', '资金使用', '特许经营', '招标']
+
+    def test_find_tag_by_name(self):
+        """测试按名称查找任意层级的标签"""
+        hierarchy = _build_hierarchy()
+        assert hierarchy.find_tag_by_name('额度').id == 3
+        assert hierarchy.find_tag_by_name('特许经营').id == 5
+        assert hierarchy.find_tag_by_name('不存在') is None
+
+    def test_find_tags_by_policy_type(self):
+        """测试按政策类型返回顶级标签及其所有子标签"""
+        tags = _build_hierarchy().find_tags_by_policy_type('special_bonds')
+        assert [tag.id for tag in tags] == [1, 2, 3, 4]
+
+    def test_get_tags_by_level(self):
+        """测试按级别获取标签"""
+        hierarchy = _build_hierarchy()
+        assert [tag.id for tag in hierarchy.get_tags_by_level(1)] == [1, 5]
+        assert [tag.id for tag in hierarchy.get_tags_by_level(2)] == [2, 4, 6]
+        assert [tag.id for tag in hierarchy.get_tags_by_level(3)] == [3]
+
+    def test_deep_tree_without_recursion_limit(self):
+        """测试超过递归深度限制的标签链也能遍历"""
+        root = Tag(id=0, name='根')
+        current = root
+        for i in range(1, 3000):
+            child = Tag(id=i, name=f'标签{i}')
+            current.children.append(child)
+            current = child
+        hierarchy = TagHierarchy(root_tags=[root])
+
+        assert len(hierarchy.get_flattened_tags()) == 3000
+        assert hierarchy.find_tag_by_name('标签2999').id == 2999
+
+
+class TestIndex:
+    """测试名称/级别/政策类型索引"""
+
+    def test_index_rebuilt_after_mutation(self):
+        """测试通过add_tag/add_child修改标签树后查询结果同步更新"""
+        hierarchy = _build_hierarchy()
+        assert hierarchy.find_tag_by_name('数据资产') is None
+
+        data_assets = Tag(id=7, name='数据资产', level=1, policy_type='data_assets')
+        hierarchy.add_tag(data_assets)
+        assert hierarchy.find_tag_by_name('数据资产') is data_assets
+
+        pricing = Tag(id=8, name='定价', level=2, policy_type='data_assets')
+        data_assets.add_child(pricing)
+        assert hierarchy.find_tags_by_policy_type('data_assets') == [data_assets, pricing]
+        assert [tag.id for tag in hierarchy.get_tags_by_level(2)] == [2, 4, 6, 8]
+
+    def test_duplicate_names_return_first_in_preorder(self):
+        """测试同名标签返回先序遍历中的第一个"""
+        hierarchy = _build_hierarchy()
+        hierarchy.find_tag_by_name('额度').add_child(Tag(id=9, name='招标', level=3))
+        assert hierarchy.find_tag_by_name('招标').id == 9
+
+    def test_direct_root_list_edits_detected(self):
+        """测试直接增删或替换顶级标签后索引自动重建"""
+        hierarchy = _build_hierarchy()
+        assert hierarchy.find_tag_by_name('new') is None
+
+        new_root = Tag(id=11, name='new', level=1, policy_type='data_assets')
+        hierarchy.root_tags.append(new_root)
+        assert hierarchy.find_tag_by_name('new') is new_root
+        assert hierarchy.find_tags_by_policy_type('data_assets') == [new_root]
+
+        hierarchy.root_tags.pop(0)
+        assert hierarchy.find_tag_by_name('额度') is None
+        assert [tag.id for tag in hierarchy.get_tags_by_level(1)] == [5, 11]
+
+    def test_field_assignment_detected(self):
+        """测试修改标签名称/级别/政策类型或替换子标签列表后索引自动重建"""
+        hierarchy = _build_hierarchy()
+        quota = hierarchy.find_tag_by_name('额度')
+
+        quota.name = '限额'
+        assert hierarchy.find_tag_by_name('额度') is None
+        assert hierarchy.find_tag_by_name('限额') is quota
+
+        quota.level = 2
+        assert quota in hierarchy.get_tags_by_level(2)
+
+        franchise = hierarchy.find_tag_by_name('特许经营')
+        franchise.policy_type = 'data_assets'
+        assert hierarchy.find_tags_by_policy_type('franchise') == []
+
+        franchise.children = [Tag(id=12, name='新子标签', level=2)]
+        assert hierarchy.find_tag_by_name('招标') is None
+        assert hierarchy.find_tag_by_name('新子标签').id == 12
+
+    def test_invalidate_after_direct_mutation(self):
+        """测试直接修改children列表后调用invalidate_index重建索引"""
+        hierarchy = _build_hierarchy()
+        assert hierarchy.find_tag_by_name('新标签') is None
+
+        hierarchy.root_tags[0].children.append(Tag(id=10, name='新标签', level=2))
+        hierarchy.invalidate_index()
+        assert hierarchy.find_tag_by_name('新标签').id == 10
+
+    def test_returned_lists_are_independent(self):
+        """测试修改返回的列表不影响索引"""
+        hierarchy = _build_hierarchy()
+        hierarchy.get_tags_by_level(1).clear()
+        hierarchy.find_tags_by_policy_type('franchise').clear()
+        assert len(hierarchy.get_tags_by_level(1)) == 2
+        assert len(hierarchy.find_tags_by_policy_type('franchise')) == 2
+
+
+class TestDedup:
+    """测试添加标签时按对象身份去重"""
+
+    def test_same_object_added_once(self):
+        """测试同一标签对象重复添加只保留一次，字段相同的不同对象均保留"""
+        hierarchy = TagHierarchy()
+        parent = Tag(id=1, name='专项债')
+        child = Tag(id=2, name='发行管理', level=2)
+
+        hierarchy.add_tag(parent)
+        hierarchy.add_tag(parent)
+        parent.add_child(child)
+        parent.add_child(child)
+        assert hierarchy.root_tags == [parent]
+        assert parent.children == [child]
+        assert child.parent_id == 1
+
+        hierarchy.add_tag(Tag(id=1, name='专项债'))
+        assert len(hierarchy.root_tags) == 2
+
+    def test_children_from_constructor(self):
+        """测试构造时传入的子标签也参与去重"""
+        child = Tag(id=2, name='发行管理', level=2)
+        parent = Tag(id=1, name='专项债', children=[child])
+        parent.add_child(child)
+        assert parent.children == [child]
+
+        hierarchy = TagHierarchy(root_tags=[parent])
+        hierarchy.add_tag(parent)
+        assert hierarchy.root_tags == [parent]
+
+    def test_same_length_direct_edit(self):
+        """测试直接替换子标签列表（长度不变）后去重仍按当前列表判断"""
+        parent = Tag(id=1, name='父标签')
+        first = Tag(id=2, name='a')
+        second = Tag(id=3, name='b')
+
+        parent.add_child(first)
+        parent.children = [second]
+        parent.add_child(first)
+        parent.add_child(second)
+        assert [tag.name for tag in parent.children] == ['b', 'a']
+
+        hierarchy = TagHierarchy()
+        hierarchy.add_tag(first)
+        hierarchy.root_tags[0] = second
+        hierarchy.add_tag(first)
+        hierarchy.add_tag(second)
+        assert [tag.name for tag in hierarchy.root_tags] == ['b', 'a']
+
+    @pytest.mark.parametrize("clone", [copy.deepcopy, lambda obj: pickle.loads(pickle.dumps(obj))],
+                             ids=["deepcopy", "pickle"])
+    def test_dedup_after_copy(self, clone):
+        """测试复制/序列化后的标签体系按副本中的对象去重，索引同步重建"""
+        hierarchy = clone(_build_hierarchy())
+        bonds = hierarchy.root_tags[0]
+
+        bonds.add_child(bonds.children[0])
+        hierarchy.add_tag(bonds)
+        assert [tag.id for tag in bonds.children] == [2, 4]
+        assert len(hierarchy.root_tags) == 2
+
+        new_tag = Tag(id=20, name='新标签', level=2)
+        bonds.add_child(new_tag)
+        assert bonds.children[-1] is new_tag
+        assert hierarchy.find_tag_by_name('新标签') is new_tag
+        assert hierarchy.find_tag_by_name('额度') is bonds.children[0].children[0]
+
+
+
+def test_tags_use_slots():
+    """测试标签对象不带实例__dict__，内部字段不参与比较"""
+    first = Tag(id=1, name='专项债')
+    second = Tag(id=1, name='专项债')
+    first.add_child(Tag(id=2, name='发行管理'))
+    second.children.append(Tag(id=2, name='发行管理', parent_id=1))
+
+    assert not hasattr(first, "__dict__")
+    assert first == second